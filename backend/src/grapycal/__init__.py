@@ -1,5 +1,6 @@
 __version__ = "0.20.0+dev"
 from grapycal.extension_api.decor import func, param
+from grapycal.extension_api.func_cache import CacheConfig
 from grapycal.extension_api.node_def import (
     SHOW_ALL_PORTS,
     SHOW_ALL_PORTS_T,
@@ -52,6 +53,7 @@ from grapycal.sobjects.node import (
     Node,
     background_task,
     deprecated,
+    run_inline,
     singletonNode,
     task,
 )
@@ -105,12 +107,14 @@ __all__ = [
     "OpenAnotherWorkspaceStrategy",
     "func",
     "param",
+    "CacheConfig",
     "get_resource",
     "is_torch_tensor",
     "InputsTrait",
     "OutputsTrait",
     "ParameterTrait",
     "main_store",
+    "run_inline",
     "ControlPanel",
     "TriggerControl",
     "SliderControl",
@@ -30,9 +30,11 @@ class TaskInfo:
         self,
         task: Callable | Iterator,
         exception_callback: Callable[[Exception], None] | None = None,
+        queued_at: float | None = None,
     ):
         self.task = task
         self.exception_callback = exception_callback
+        self.queued_at = queued_at
 
 
 def on_exception(
@@ -45,6 +47,8 @@ def on_exception(
 
 
 class BackgroundRunner:
+    LATENCY_WINDOW = 1000
+
     def __init__(self):
         self._inputs: Queue[Tuple[TaskInfo, bool]] = Queue()
         self._queue: deque[TaskInfo] = deque()
@@ -53,6 +57,12 @@ class BackgroundRunner:
         self._is_paused = False
         self._step_mode = False
         self._is_idle = True
+        self._generation = 0  # incremented each time the tasks are cleared
+
+        # metrics, see get_metrics()
+        self._n_done = 0
+        self._latencies: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self._durations: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
         signal.signal(RUNNER_INTERRUPT_SIGNAL, self.interrupt_handler)
 
     def push(
@@ -61,21 +71,27 @@ class BackgroundRunner:
         to_queue: bool = True,
         exception_callback: Callable[[Exception], None] | None = None,
     ):
-        self._inputs.put((TaskInfo(task, exception_callback), to_queue))
+        self._inputs.put(
+            (TaskInfo(task, exception_callback, time.perf_counter()), to_queue)
+        )
 
     def push_to_queue(
         self,
         task: Callable,
         exception_callback: Callable[[Exception], None] | None = None,
     ):
-        self._inputs.put((TaskInfo(task, exception_callback), True))
+        self._inputs.put(
+            (TaskInfo(task, exception_callback, time.perf_counter()), True)
+        )
 
     def push_to_stack(
         self,
         task: Callable,
         exception_callback: Callable[[Exception], None] | None = None,
     ):
-        self._inputs.put((TaskInfo(task, exception_callback), False))
+        self._inputs.put(
+            (TaskInfo(task, exception_callback, time.perf_counter()), False)
+        )
 
     def interrupt(self):
         signal.raise_signal(RUNNER_INTERRUPT_SIGNAL)
@@ -83,6 +99,7 @@ class BackgroundRunner:
     def clear_tasks(self):
         self._queue.clear()
         self._stack.clear()
+        self._generation += 1
 
     def exit(self):
         self._exit_flag = True
@@ -137,29 +154,11 @@ class BackgroundRunner:
                 else:
                     taskinfo_to_run = self._stack.pop()
 
-                task, exception_callback = (
-                    taskinfo_to_run.task,
-                    taskinfo_to_run.exception_callback,
-                )
-                if isinstance(task, Iterator):
-                    try:
-                        self._stack.append(TaskInfo(task, exception_callback))
-                        next(task)
-                    except StopIteration:
-                        self._stack.pop()
-                    except Exception as e:
-                        on_exception(e, exception_callback)
-                else:
-                    try:
-                        ret = task()
-                    except Exception as e:
-                        on_exception(e, exception_callback)
-                    else:
-                        # if ret is a generator, push it to stack
-                        if isinstance(ret, Iterator):
-                            self._stack.append(TaskInfo(iter(ret), exception_callback))
+                self._run_task(taskinfo_to_run)
 
             except RunnerInterrupt:
+                # The interrupted task is dropped
+                self._generation += 1
                 logger.info("Runner interrupted")
             except KeyboardInterrupt:
                 signal.signal(
@@ -171,6 +170,54 @@ class BackgroundRunner:
                 self.clear_tasks()
                 orig_print("Runner error", e)
 
+    def _run_task(self, taskinfo_to_run: TaskInfo):
+        task, exception_callback = (
+            taskinfo_to_run.task,
+            taskinfo_to_run.exception_callback,
+        )
+        start = time.perf_counter()
+        if taskinfo_to_run.queued_at is not None:
+            self._latencies.append(start - taskinfo_to_run.queued_at)
+        if isinstance(task, Iterator):
+            try:
+                self._stack.append(TaskInfo(task, exception_callback))
+                next(task)
+            except StopIteration:
+                self._stack.pop()
+            except Exception as e:
+                on_exception(e, exception_callback)
+        else:
+            try:
+                ret = task()
+            except Exception as e:
+                on_exception(e, exception_callback)
+            else:
+                # if ret is a generator, push it to stack
+                if isinstance(ret, Iterator):
+                    self._stack.append(TaskInfo(iter(ret), exception_callback))
+        self._durations.append(time.perf_counter() - start)
+        self._n_done += 1
+
+    def run_until_idle(self):
+        """
+        Runs the tasks in the current thread until none are left, including the ones they push, then returns. For
+        tests, where the workspace is started with run_runner=False.
+        """
+        while True:
+            while not self._inputs.empty():
+                task_info, push_to_queue = self._inputs.get()
+                if push_to_queue:
+                    self._queue.append(task_info)
+                else:
+                    self._stack.append(task_info)
+            if len(self._queue) == 0 and len(self._stack) == 0:
+                return
+            # queue is prioritized
+            if len(self._queue) > 0:
+                self._run_task(self._queue.pop())
+            else:
+                self._run_task(self._stack.pop())
+
     def pause(self):
         self._is_paused = True
         self._step_mode = False
@@ -188,3 +235,50 @@ class BackgroundRunner:
 
     def is_idle(self):
         return self._is_idle
+
+    def get_generation(self) -> int:
+        """
+        Returns a counter that changes whenever tasks are dropped, by clear_tasks() or an interrupt, so callers waiting
+        for a task to run can tell it may never run.
+        """
+        return self._generation
+
+    @staticmethod
+    def get_empty_metrics() -> dict:
+        return {
+            "queue_depth": 0,
+            "stack_depth": 0,
+            "tasks_done": 0,
+            "latency_p50": 0,
+            "latency_p99": 0,
+            "duration_p50": 0,
+            "duration_p99": 0,
+            "is_idle": True,
+            "is_paused": False,
+        }
+
+    def get_metrics(self) -> dict:
+        """
+        Returns the current queue and stack depth, the number of tasks (or generator steps) run so far, and the
+        percentiles of the time tasks waited before running (latency) and of their run time, over the last
+        LATENCY_WINDOW tasks. Can be called from any thread.
+        """
+        latencies = sorted(self._latencies)
+        durations = sorted(self._durations)
+        return {
+            "queue_depth": len(self._queue) + self._inputs.qsize(),
+            "stack_depth": len(self._stack),
+            "tasks_done": self._n_done,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p99": _percentile(latencies, 0.99),
+            "duration_p50": _percentile(durations, 0.5),
+            "duration_p99": _percentile(durations, 0.99),
+            "is_idle": self._is_idle,
+            "is_paused": self._is_paused,
+        }
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if len(sorted_values) == 0:
+        return 0
+    return sorted_values[min(int(len(sorted_values) * q), len(sorted_values) - 1)]
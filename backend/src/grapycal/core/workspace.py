@@ -15,7 +15,10 @@ from grapycal.sobjects.controls.objectControl import ObjectControl
 from grapycal.sobjects.controls.triggerControl import TriggerControl
 import grapycal.utils.logging
 from grapycal.utils.misc import SemVer
+from grapycal.utils.node_profiler import node_profiler
 from grapycal.utils.os_stat import OSStat
+from grapycal.utils.runtime_metrics import RuntimeMetrics
+from grapycal.utils.startup_profile import startup_profile
 import objectsync
 from dacite import from_dict
 from grapycal.core import running_module, stdout_helper
@@ -96,6 +99,8 @@ class Workspace:
         )
         self.slash = SlashCommandManager(self._slash_commands_topic)
         self._os_stat = OSStat()
+        self.metrics = RuntimeMetrics()
+        """Runtime metrics, published on the metrics topic and served by the /metrics route."""
         stdout_helper.enable_proxy(redirect_error=False)
 
     def run(self, ui_thread_event_loop: asyncio.AbstractEventLoop, run_runner=True):
@@ -118,6 +123,7 @@ class Workspace:
         # The store is a global object that holds all the data and functions that are shared across classes.
         main_store.event_loop = ui_thread_event_loop
         self._setup_store()
+        startup_profile.mark("setup")
 
         ui_thread_event_loop.create_task(self.auto_save())
         ui_thread_event_loop.create_task(self._objectsync.serve())
@@ -135,13 +141,27 @@ class Workspace:
 
         ui_thread_event_loop.set_exception_handler(ui_thread_exception_handler)
 
-        main_store.clock.add_listener(self._update_os_stat, 2)
+        # OS stat is sampled in a background thread because psutil and torch.cuda calls can be slow
+        self._os_stat.register_thread("runner")  # the runner runs in this thread
+        ui_thread_event_loop.call_soon_threadsafe(self._os_stat.register_thread, "ui")
+        self._os_stat.start(
+            lambda os_stat: main_store.event_loop.call_soon_threadsafe(
+                self._os_stat_topic.set, os_stat
+            ),
+            get_interval=self._get_os_stat_interval,
+            should_sample=self._is_os_stat_subscribed,
+        )
+        main_store.clock.add_listener(self._update_node_profile, 1)
+        main_store.clock.add_listener(self._update_metrics, 2)
+        ui_thread_event_loop.create_task(self.metrics.probe_loop_lag())
 
         # The extension manager starts searching for all extensions available.
         self._extention_manager.start()
 
         # Make SObject tree present. After this, the workspace is ready to be used. Most of the operations will be done on the tree.
         self._load_or_create_workspace()
+        startup_profile.mark("workspace loaded")
+        startup_profile.stop_profiler()
 
         # ===CHECK_LICENSE=== #
 
@@ -199,6 +219,16 @@ class Workspace:
         self._os_stat_topic = self._objectsync.create_topic(
             "os_stat", objectsync.DictTopic, self._os_stat.get_os_stat()
         )
+        self._node_profile_topic = self._objectsync.create_topic(
+            "node_profile", objectsync.DictTopic, is_stateful=False
+        )
+        self._metrics_topic = self._objectsync.create_topic(
+            "metrics", objectsync.DictTopic, is_stateful=False
+        )
+        self.metrics.add_send_queue(
+            "topicsync",
+            lambda: self._objectsync._topicsync._client_manager._sending_queue.qsize(),
+        )
 
         self._objectsync.register_service("exit", self.exit)
         self._objectsync.register_service("interrupt", self._interrupt)
@@ -217,6 +247,9 @@ class Workspace:
         self.slash.register(
             "save workspace", lambda ctx: self._save_workspace(self.path)
         )
+        self.slash.register("start node profiler", self._start_node_profiler)
+        self.slash.register("stop node profiler", self._stop_node_profiler)
+        self.slash.register("export node profile", self._export_node_profile)
 
     def _setup_store(self):
         """
@@ -225,7 +258,7 @@ class Workspace:
         main_store.node_types = self._objectsync.create_topic(
             "node_types", objectsync.DictTopic, is_stateful=False
         )
-        main_store.clock = Clock(0.01)
+        main_store.clock = Clock(0.001)
         main_store.event_loop.create_task(main_store.clock.run())
         main_store.redirect = stdout_helper.redirect
         main_store.runner = BackgroundRunner()
@@ -471,6 +504,7 @@ class Workspace:
     """
 
     def exit(self):
+        self._os_stat.stop()
         main_store.runner.exit()
 
     def _interrupt(self):
@@ -478,6 +512,7 @@ class Workspace:
         self._clear_edges_and_tasks()
 
     def _client_connected(self, client_id):
+        startup_profile.finish("first client connected")
         self._objectsync.create_topic(
             f"status_message_{client_id}", objectsync.EventTopic
         )
@@ -493,5 +528,38 @@ class Workspace:
             await asyncio.sleep(60)
             self._save_workspace(self.path, send_message=False)
 
-    def _update_os_stat(self):
-        self._os_stat_topic.set(self._os_stat.get_os_stat())
+    def _get_os_stat_interval(self) -> float:
+        if not hasattr(main_store, "settings"):  # the workspace is not loaded yet
+            return 2
+        return main_store.settings.os_stat_interval.get()
+
+    def _is_os_stat_subscribed(self) -> bool:
+        subscriptions = self._objectsync._topicsync._client_manager._subscriptions
+        return len(subscriptions.get("os_stat", ())) > 0
+
+    def _update_metrics(self):
+        self.metrics.update()
+        self._metrics_topic.set(self.metrics.collect())
+
+    def _update_node_profile(self):
+        if node_profiler.enabled:
+            self._node_profile_topic.set(node_profiler.get_summary())
+
+    def _start_node_profiler(self, ctx: CommandCtx):
+        node_profiler.clear()
+        node_profiler.start()
+        self._send_message_to_all("Node profiler started")
+
+    def _stop_node_profiler(self, ctx: CommandCtx):
+        node_profiler.stop()
+        self._node_profile_topic.set(node_profiler.get_summary())
+        self._send_message_to_all("Node profiler stopped")
+        logger.info("Node profile:\n" + node_profiler.report())
+
+    def _export_node_profile(self, ctx: CommandCtx):
+        base = os.path.splitext(self.path)[0]
+        node_profiler.export_chrome_trace(base + ".trace.json")
+        node_profiler.export_speedscope(base + ".speedscope.json")
+        self._send_message_to_all(
+            f"Node profile exported to {base}.trace.json and {base}.speedscope.json"
+        )
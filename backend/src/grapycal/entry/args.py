@@ -22,6 +22,11 @@ def parse_args(sync=True):
         action="store_true",
         help="profile the server with viztracer. The output will be in prof.html",
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print how long each startup phase takes and profile the startup with cProfile. The output will be in startup.prof",
+    )
     args = parser.parse_args()
 
     if isinstance(args.file, str):
@@ -5,21 +5,18 @@ import sys
 import threading
 from contextlib import asynccontextmanager
 import traceback
-from typing import Awaitable, Callable
 
 from grapycal.core.background_runner import RunnerInterrupt
 import uvicorn
 from grapycal.entry.args import parse_args
 from fastapi import FastAPI, HTTPException, WebSocket
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from grapycal import OpenAnotherWorkspaceStrategy
 
 from grapycal.core.workspace import Workspace
-from topicsync.server.client_manager import (
-    ClientCommProtocol,
-    ConnectionClosedException,
-)
+from grapycal.utils.startup_profile import startup_profile
+from grapycal.entry.transport import Client
 
 
 class MyOpenAnotherWorkspaceStrategy(OpenAnotherWorkspaceStrategy):
@@ -31,29 +28,6 @@ class MyOpenAnotherWorkspaceStrategy(OpenAnotherWorkspaceStrategy):
         self.path = path
 
 
-class Client(ClientCommProtocol):
-    def __init__(
-        self,
-        recieve_text: Callable[[], Awaitable[str]],
-        send_text: Callable[[str], Awaitable[None]],
-    ):
-        self._recieve_text = recieve_text
-        self._send_text = send_text
-
-    async def messages(self):
-        try:
-            while True:
-                yield await self._recieve_text()
-        except Exception as e:
-            raise ConnectionClosedException(e)
-
-    async def send(self, message):
-        try:
-            await self._send_text(message)
-        except Exception as e:
-            raise ConnectionClosedException(e)
-
-
 class ThreadingEventWithReturn:
     def __init__(self):
         self._event = threading.Event()
@@ -93,12 +67,17 @@ def make_app(
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
         await websocket.accept()
-        client = Client(websocket.receive_text, websocket.send_text)
+        client = Client(websocket)
         try:
             await workspace._objectsync._topicsync.handle_client(client)
         except SystemExit:
             workspace.exit()
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        """Runtime metrics in the Prometheus text format"""
+        return workspace.metrics.to_prometheus(workspace.metrics.collect())
+
     @app.get("/download/{path:path}")
     async def download(path: str):
         '''Download local file by path'''
@@ -118,13 +97,18 @@ def make_app(
 
 
 def run_uvicorn(app, host, port):
-    uvicorn.run(app, host=host, port=port, log_level="error")
+    uvicorn.run(
+        app, host=host, port=port, log_level="error", ws_per_message_deflate=True
+    )
     print("uvicorn exited")
     sys.exit(1)
 
 
 def main():
     args = parse_args()
+    startup_profile.mark("imports")
+    if args.profile_startup:
+        startup_profile.enable()
 
     # because args.frontend_path and args.extensions_path are NOT relative to the cwd,
     # we need to make them absolute before moving to the cwd
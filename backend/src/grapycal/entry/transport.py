@@ -0,0 +1,28 @@
+from fastapi import WebSocket
+from topicsync.server.client_manager import (
+    ClientCommProtocol,
+    ConnectionClosedException,
+)
+
+
+class Client(ClientCommProtocol):
+    """
+    Adapts a websocket to topicsync. Each message is sent as one JSON text frame, which is easy to inspect in the
+    browser's devtools. Frames are compressed with permessage-deflate when the browser negotiates it (see run_uvicorn).
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self._websocket = websocket
+
+    async def messages(self):
+        try:
+            while True:
+                yield await self._websocket.receive_text()
+        except Exception as e:
+            raise ConnectionClosedException(e)
+
+    async def send(self, message: str):
+        try:
+            await self._websocket.send_text(message)
+        except Exception as e:
+            raise ConnectionClosedException(e)
@@ -1,9 +1,10 @@
+import graphlib
 import importlib
 import inspect
 import logging
 import os
 import sys
-from types import ModuleType
+from types import CodeType, ModuleType
 from typing import Any, Callable, Dict, List, TypeVar
 
 from objectsync import SObject
@@ -103,6 +104,20 @@ class Extension(metaclass=ExtensionMeta):
             if t._is_singleton:
                 self.singletonNodeTypes[name] = t
 
+        self.module_mtimes = get_module_mtimes(extension_name)
+        """Used by the extension manager to find which modules changed since the extension was loaded"""
+
+    def get_changed_modules(self) -> list[str]:
+        """
+        Returns the names of the modules in the extension whose source file changed since they were loaded.
+        """
+        current = get_module_mtimes(self.name)
+        return [
+            name
+            for name, mtime in current.items()
+            if self.module_mtimes.get(name) != mtime
+        ]
+
     def add_extension_name_to_node_type(self, node_type: str) -> str:
         return f"{self.name}.{node_type}"
 
@@ -220,6 +235,201 @@ class Extension(metaclass=ExtensionMeta):
         return []
 
 
+def get_module_mtimes(package_name: str) -> Dict[str, float]:
+    """
+    Returns the modification time of the source file of each loaded module in the package.
+    """
+    mtimes = {}
+    for name, module in list(sys.modules.items()):
+        if name != package_name and not name.startswith(package_name + "."):
+            continue
+        path = getattr(module, "__file__", None)
+        if path is None:
+            continue
+        try:
+            mtimes[name] = os.stat(path).st_mtime
+        except OSError:
+            pass
+    return mtimes
+
+
+BUILD_SPEC_METHODS = (
+    "build_node",
+    "init_node",
+    "define_traits",
+    "define_funcs",
+    "define_params",
+)
+BUILD_SPEC_ATTRIBUTES = (
+    "category",
+    "label",
+    "shape",
+    "icon_path",
+    "search",
+    "_is_singleton",
+)
+
+
+def _code_spec(code: CodeType) -> tuple:
+    # Compare bytecode instead of source, so moving code around in the file (changing line numbers) is not a change.
+    consts = tuple(
+        _code_spec(c) if isinstance(c, CodeType) else repr(c) for c in code.co_consts
+    )
+    return (code.co_code, consts, code.co_names)
+
+
+def _referenced_names(code: CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names |= _referenced_names(const)
+    return names
+
+
+def get_build_spec(node_type: type[Node]) -> tuple:
+    """
+    Returns a value that changes when the code that decides what an instance of the node type builds changes. If the
+    build spec of a node type is unchanged after a reload, existing instances can be patched in place.
+
+    Besides BUILD_SPEC_METHODS, the spec covers the methods of the extension they call (e.g. a helper that adds
+    ports), found by following the names they reference.
+    """
+    package = node_type.__module__.split(".")[0]
+    spec: list = []
+    to_visit = list(BUILD_SPEC_METHODS)
+    visited = set()
+    while len(to_visit) > 0:
+        name = to_visit.pop(0)
+        if name in visited:
+            continue
+        visited.add(name)
+        method = getattr(node_type, name)
+        code = getattr(method, "__code__", None)
+        spec.append(name)
+        spec.append(_code_spec(code) if code is not None else repr(method))
+        if code is None:
+            continue
+        for referenced in sorted(_referenced_names(code)):
+            value = getattr(node_type, referenced, None)
+            if inspect.isfunction(value) and value.__module__.split(".")[0] == package:
+                to_visit.append(referenced)
+    for name in BUILD_SPEC_ATTRIBUTES:
+        spec.append(repr(getattr(node_type, name, None)))
+
+    info = node_type._node_def_info
+    for item in list(info.funcs.values()) + list(info.params.values()):
+        spec.append(item.name)
+        for sign_source in item.sign_source:
+            if isinstance(sign_source, inspect.Parameter):
+                spec.append(repr(sign_source))
+            else:
+                spec.append(str(inspect.signature(sign_source)))
+        spec.append(repr(item.annotation_override))
+        spec.append(repr(item.default_override))
+        spec.append(repr(item.shown_ports))
+        spec.append(repr(getattr(item, "background", None)))
+        spec.append(repr(getattr(item, "create_trigger_port", None)))
+    return tuple(spec)
+
+
+def get_reload_order(module_names: list[str]) -> list[str]:
+    """
+    Sorts modules so each one is reloaded after the modules in the list it imports from, and packages after their
+    submodules. Otherwise a module could bind to the stale version of a class or function it imports.
+    """
+    names = set(module_names)
+    sorter = graphlib.TopologicalSorter()
+    for name in module_names:
+        dependencies = {other for other in names if other.startswith(name + ".")}
+        for value in vars(sys.modules[name]).values():
+            if inspect.ismodule(value):
+                dependency = value.__name__
+            elif inspect.isclass(value) or inspect.isfunction(value):
+                dependency = value.__module__
+            else:
+                continue
+            if dependency in names and dependency != name:
+                dependencies.add(dependency)
+        sorter.add(name, *dependencies)
+    try:
+        return list(sorter.static_order())
+    except graphlib.CycleError:
+        # Circular imports. Fall back to reloading deeper modules first.
+        return sorted(module_names, key=lambda name: name.count("."), reverse=True)
+
+
+def reload_modules(module_names: list[str]) -> None:
+    """
+    Reloads the modules in the order of get_reload_order. If one of them fails to run (e.g. a syntax error), the
+    modules reloaded so far, including the failed one, get their old namespaces back before the exception is raised
+    again. A reload runs the new code in the existing module object, so otherwise they would be left half updated.
+    """
+    snapshots: dict[str, tuple[ModuleType, dict[str, Any]]] = {}
+    try:
+        for name in get_reload_order(module_names):
+            module = sys.modules[name]
+            snapshots[name] = (module, dict(vars(module)))
+            importlib.reload(module)
+    except Exception:
+        for name, (module, namespace) in snapshots.items():
+            vars(module).clear()
+            vars(module).update(namespace)
+            sys.modules[name] = module
+        raise
+
+
+def patch_class(target: type, source: type) -> list[Callable]:
+    """
+    Copies the attributes of source, a reloaded version of the class target, into target. Existing instances and
+    subclasses of target then run the new code, and target stays the class registered and referenced everywhere.
+
+    Returns the functions of target that were removed or replaced by different code. Bound methods of them held
+    elsewhere, such as callbacks given to a trait, an Action or the clock, still run the old code.
+    """
+    replaced = []
+    for name, value in list(vars(target).items()):
+        if inspect.isfunction(value) and name not in vars(source):
+            delattr(target, name)
+            replaced.append(value)
+    for name, value in vars(source).items():
+        if name in ("__dict__", "__weakref__", "_abc_impl"):
+            continue
+        old = vars(target).get(name)
+        if inspect.isfunction(old) and not (
+            inspect.isfunction(value)
+            and _code_spec(old.__code__) == _code_spec(value.__code__)
+        ):
+            replaced.append(old)
+        _rebind_class_cell(value, source, target, set())
+        setattr(target, name, value)
+    return replaced
+
+
+def _rebind_class_cell(obj, source: type, target: type, visited: set[int]) -> None:
+    """
+    Zero-argument super() reads the class from the __class__ cell of the function. Point it to target so the copied
+    functions work on instances of target. Functions wrapped by decorators are followed through their closures.
+    """
+    if id(obj) in visited:
+        return
+    visited.add(id(obj))
+    if isinstance(obj, (staticmethod, classmethod)):
+        _rebind_class_cell(obj.__func__, source, target, visited)
+    elif isinstance(obj, property):
+        for accessor in (obj.fget, obj.fset, obj.fdel):
+            _rebind_class_cell(accessor, source, target, visited)
+    elif inspect.isfunction(obj):
+        for cell in obj.__closure__ or ():
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                continue  # empty cell
+            if contents is source:
+                cell.cell_contents = target
+            else:
+                _rebind_class_cell(contents, source, target, visited)
+
+
 def load_or_reload_module(module_name: str):
     if module_name not in sys.modules:
         module = importlib.import_module(module_name)
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+from grapycal.extension.utils import get_extension_info
+
+logger = logging.getLogger(__name__)
+
+
+def _mtime(path: str | Path) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0
+
+
+class ExtensionIndex:
+    """
+    Finds the extensions (packages named grapycal_*) that can be imported from sys.path.
+
+    Walking every module with pkgutil and reading the version of each extension is slow, so the result is cached on
+    disk. The cache is reused as long as sys.path, the mtimes of its entries (they change when a package is installed
+    or removed) and the mtimes of the extensions' pyproject.toml are unchanged.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_path: str | Path | None = None):
+        if cache_path is None:
+            import appdirs
+
+            cache_path = Path(appdirs.user_cache_dir("Grapycal")) / "extensions.json"
+        self._cache_path = Path(cache_path)
+        self._cache: dict | None = None
+
+    def get(self, force=False) -> list[dict]:
+        """
+        Returns the info of all installed extensions. If force is True, sys.path is scanned again even if the cache is
+        valid.
+        """
+        key = self._get_key()
+        if not force:
+            if self._cache is None:
+                self._cache = self._read_cache()
+            if self._is_valid(self._cache, key):
+                return self._cache["extensions"]  # type: ignore
+
+        extensions = self._scan()
+        self._cache = {
+            "cache_version": self.CACHE_VERSION,
+            "key": key,
+            "extensions": extensions,
+        }
+        self._write_cache(self._cache)
+        return extensions
+
+    def _get_key(self) -> list:
+        return [[entry, _mtime(entry or ".")] for entry in sys.path]
+
+    def _is_valid(self, cache: dict | None, key: list) -> bool:
+        if cache is None:
+            return False
+        if cache.get("cache_version") != self.CACHE_VERSION:
+            return False
+        if cache.get("key") != key:
+            return False
+        for extension in cache["extensions"]:
+            if _mtime(extension["pyproject"]) != extension["pyproject_mtime"]:
+                return False
+        return True
+
+    def _scan(self) -> list[dict]:
+        """
+        Lists the sys.path entries directly instead of using pkgutil.iter_modules, which builds a ModuleInfo for every
+        module in the environment.
+        """
+        found: dict[str, dict] = {}
+        for entry in sys.path:
+            try:
+                names = os.listdir(entry or ".")
+            except OSError:
+                continue  # zip files and missing directories
+            for name in names:
+                if not name.startswith("grapycal_") or name in found:
+                    continue
+                path = Path(entry or ".") / name
+                if name.endswith(".py"):
+                    name = name[:-3]
+                elif not (path / "__init__.py").exists():
+                    continue
+                if not name.isidentifier():
+                    continue
+                pyproject = path / "pyproject.toml"
+                found[name] = {
+                    **get_extension_info(name),
+                    "pyproject": str(pyproject),
+                    "pyproject_mtime": _mtime(pyproject),
+                }
+        return list(found.values())
+
+    def _read_cache(self) -> dict | None:
+        try:
+            with open(self._cache_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, cache: dict) -> None:
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._cache_path, "w") as f:
+                json.dump(cache, f)
+        except OSError as e:
+            logger.debug(f"Cannot write extension index cache: {e}")
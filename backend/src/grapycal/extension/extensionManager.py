@@ -1,23 +1,40 @@
 import asyncio
+import gc
+import inspect
 import logging
-import pkgutil
 import subprocess
-
+import sys
+import time
+from collections import deque
+from types import MethodType
+
+import grapycal
+from grapycal.extension.extensionIndex import ExtensionIndex
+from grapycal.extension.previewCache import PreviewCache
 from grapycal.extension.utils import (
     get_all_dependents,
-    get_extension_info,
     list_to_dict,
     snap_node,
 )
 from grapycal.stores import main_store
+from grapycal.utils.startup_profile import startup_profile
 
 logger = logging.getLogger(__name__)
 
-from typing import TYPE_CHECKING, Dict, List
+from typing import TYPE_CHECKING, Dict, Iterable, List
 
 import objectsync
 
-from grapycal.extension.extension import CommandCtx, Extension, get_extension
+from grapycal.extension.extension import (
+    CommandCtx,
+    Extension,
+    get_build_spec,
+    get_extension,
+    get_module_mtimes,
+    patch_class,
+    reload_modules,
+)
+from grapycal.sobjects.editor import Editor
 from grapycal.sobjects.node import Node
 from grapycal.sobjects.port import Port
 
@@ -26,9 +43,16 @@ if TYPE_CHECKING:
 
 
 class ExtensionManager:
+    PREVIEW_BUILD_BUDGET = 0.01
+    """Seconds spent building previews that are not cached before yielding to the event loop"""
+
     def __init__(self, objectsync_server: objectsync.Server) -> None:
         self._objectsync = objectsync_server
         self._extensions: Dict[str, Extension] = {}
+        self._extension_index = ExtensionIndex()
+        self._preview_cache = PreviewCache()
+        self._preview_queue: deque[tuple[str, type[Node]]] = deque()
+        self._preview_task: asyncio.Task | None = None
 
         # Use this topic to inform the client about the extensions
         self._imported_extensions_topic = self._objectsync.create_topic(
@@ -44,7 +68,8 @@ class ExtensionManager:
         self._objectsync.register_service("unimport_extension", self.unimport_extension)
         self._objectsync.register_service("update_extension", self.update_extension)
         self._objectsync.register_service(
-            "refresh_extensions", self._update_available_extensions_topic
+            "refresh_extensions",
+            lambda: self._update_available_extensions_topic(force_scan=True),
         )
         self._objectsync.register_service("install_extension", self._install_extension)
 
@@ -76,11 +101,7 @@ class ExtensionManager:
         extension = self._load_extension(extension_name)
         main_store.set_stores(extension.provide_stores())
         if create_nodes:
-            try:
-                self.create_preview_nodes(extension_name)
-            except Exception:
-                self._unload_extension(extension_name)  # TODO: prevent unloading fail
-                raise
+            self.create_preview_nodes(extension_name)
             self._instantiate_singletons(extension_name)
         self._update_available_extensions_topic()
         main_store.slash.register(
@@ -97,8 +118,203 @@ class ExtensionManager:
             logger.info(f"Imported extension {extension_name}")
             main_store.send_message_to_all(f"Imported extension {extension_name}")
         self._objectsync.clear_history_inclusive()
+        startup_profile.mark(f"imported {extension_name}")
 
     def update_extension(self, extension_name: str) -> None:
+        """
+        Reload an extension after its source changed. If only submodules defining node classes changed, just those
+        modules are reloaded (see _update_extension_incrementally). Otherwise the extension and all its dependents are
+        reloaded.
+        """
+        if self._update_extension_incrementally(extension_name):
+            return
+        self._reload_extension(extension_name)
+
+    def _update_extension_incrementally(self, extension_name: str) -> bool:
+        """
+        Reload only the changed modules of the extension and patch the node classes defined in them.
+
+        The existing class objects are kept and updated in place with the attributes of the reloaded classes (see
+        patch_class), so existing instances, subclasses and the objectsync registry all run the new code. Instances
+        keep their ports, edges and in-memory state (e.g. a loaded model), unless their build spec (see get_build_spec)
+        changed or they hold a bound method whose code changed (e.g. a callback given to the clock or a topic). Those
+        are serialized and restored like in a full reload.
+
+        Returns False without changing anything if an incremental update is not possible.
+        """
+        extension = self._extensions[extension_name]
+        changed_modules = extension.get_changed_modules()
+        if len(changed_modules) == 0:
+            return False  # maybe the change is not detectable by mtime. Let the full reload handle it.
+        if extension_name in changed_modules:
+            return False  # the package's __init__ decides which node types the extension has
+        if get_all_dependents(
+            extension, list(self._extensions.values()), include_target=False
+        ):
+            return False  # dependents may subclass or import the changed classes
+
+        def node_classes_in(module_name: str) -> dict[str, type[Node]]:
+            return {
+                name: obj
+                for name, obj in inspect.getmembers(sys.modules[module_name])
+                if inspect.isclass(obj)
+                and issubclass(obj, Node)
+                and obj.__module__ == module_name
+            }
+
+        old_classes: dict[str, type[Node]] = {}
+        for module_name in changed_modules:
+            old_classes.update(node_classes_in(module_name))
+
+        # Node types defined in unchanged modules that inherit from a changed class merged its funcs and params when
+        # they were defined
+        for node_type in extension.node_types_d.values():
+            if node_type.__module__ in changed_modules:
+                continue
+            if any(base in old_classes.values() for base in node_type.__mro__):
+                return False
+
+        old_specs = {name: get_build_spec(cls) for name, cls in old_classes.items()}
+
+        # Restores the modules and raises if the new code fails to run, so the extension keeps running the old code
+        reload_modules(changed_modules)
+
+        new_classes: dict[str, type[Node]] = {}
+        for module_name in changed_modules:
+            new_classes.update(node_classes_in(module_name))
+
+        if new_classes.keys() != old_classes.keys():
+            # Node classes were added or removed. The package's exports have to be evaluated again.
+            self._reload_extension(extension_name)
+            return True
+
+        # Point references to the reloaded classes back to the old class objects, which are patched below
+        replacements = {new_classes[name]: old_classes[name] for name in old_classes}
+        for module_name, module in list(sys.modules.items()):
+            if module_name != extension_name and not module_name.startswith(
+                extension_name + "."
+            ):
+                continue
+            for attr_name, value in list(vars(module).items()):
+                if isinstance(value, type) and value in replacements:
+                    setattr(module, attr_name, replacements[value])
+
+        for name, new_cls in new_classes.items():
+            bases = tuple(replacements.get(base, base) for base in new_cls.__bases__)
+            if bases != old_classes[name].__bases__:
+                # The bases of a class object can't be swapped reliably
+                self._reload_extension(extension_name)
+                return True
+
+        replaced_funcs = set()
+        for name, old_cls in old_classes.items():
+            replaced_funcs.update(patch_class(old_cls, new_classes[name]))
+
+        changed_classes = {
+            cls
+            for name, cls in old_classes.items()
+            if get_build_spec(cls) != old_specs[name]
+        }
+        preview_node_types = self._get_preview_node_types(extension_name)
+        rebuilt_previews = [
+            cls
+            for name, cls in old_classes.items()
+            if cls in changed_classes
+            and extension.add_extension_name_to_node_type(name) in preview_node_types
+        ]
+
+        nodes = [
+            obj
+            for obj in self._objectsync.get_objects()
+            if isinstance(obj, tuple(old_classes.values())) and not obj.is_destroyed()
+        ]
+
+        # Bound methods of the instances that still run removed or replaced code
+        stale_nodes = set()
+        if len(replaced_funcs) > 0:
+            for referrer in gc.get_referrers(*nodes):
+                if (
+                    isinstance(referrer, MethodType)
+                    and referrer.__func__ in replaced_funcs
+                ):
+                    stale_nodes.add(referrer.__self__)
+
+        patched: List[Node] = []
+        rebuilt: dict[Editor, List[Node]] = {}
+        for node in nodes:
+            if type(node) not in changed_classes and node not in stale_nodes:
+                patched.append(node)
+            elif node.is_preview.get():
+                self._objectsync.destroy_object(node.get_id())
+            else:
+                editor = (
+                    node.editor if node.editor is not None else main_store.main_editor
+                )
+                rebuilt.setdefault(editor, []).append(node)
+
+        for editor, editor_nodes in rebuilt.items():
+            nodes_to_recover, edges_to_recover = self._serialize_and_destroy(
+                editor_nodes
+            )
+            editor.restore(nodes_to_recover, edges_to_recover)
+
+        for class_name, cls in old_classes.items():
+            type_name = extension.add_extension_name_to_node_type(class_name)
+            if type_name not in extension.node_types_d:
+                continue  # not a node type of the extension, e.g. a base class
+            entry = {
+                "name": type_name,
+                "category": cls.category,
+                "description": cls.get_doc_string(),
+            }
+            if (
+                cls not in rebuilt_previews
+                and "preview" in main_store.node_types[type_name]
+            ):
+                entry["preview"] = main_store.node_types[type_name]["preview"]
+            main_store.node_types.change_value(type_name, entry)
+
+        extension.module_mtimes = get_module_mtimes(extension_name)
+        if len(rebuilt_previews) > 0:
+            self._queue_preview_nodes(extension_name, rebuilt_previews)
+        else:
+            self._save_preview_cache(extension_name)
+
+        n_rebuilt = sum(len(editor_nodes) for editor_nodes in rebuilt.values())
+        logger.info(
+            f"Reloaded {changed_modules} of {extension_name}: patched {len(patched)} nodes in place, rebuilt {n_rebuilt} nodes"
+        )
+        main_store.send_message_to_all(
+            f"Reloaded {', '.join(changed_modules)} in {extension_name}"
+        )
+        self._objectsync.clear_history_inclusive()
+        return True
+
+    def _serialize_and_destroy(
+        self, nodes: List[Node]
+    ) -> tuple[
+        List[objectsync.sobject.SObjectSerialized],
+        List[objectsync.sobject.SObjectSerialized],
+    ]:
+        """
+        Serialize the nodes and their edges, then destroy them so they can be restored with Editor.restore().
+        """
+        nodes_to_recover: List[objectsync.sobject.SObjectSerialized] = []
+        edges_to_recover: List[objectsync.sobject.SObjectSerialized] = []
+        for node in nodes:
+            nodes_to_recover.append(node.serialize())
+            ports: List[Port] = node.in_ports.get() + node.out_ports.get()  # type: ignore
+            for port in ports:
+                for edge in port.edges.copy():
+                    if edge.is_destroyed():
+                        continue  # both ends are rebuilt
+                    edges_to_recover.append(edge.serialize())
+                    self._objectsync.destroy_object(edge.get_id())
+        for node in nodes:
+            self._objectsync.destroy_object(node.get_id())
+        return nodes_to_recover, edges_to_recover
+
+    def _reload_extension(self, extension_name: str) -> None:
         old_exts: list[Extension] = get_all_dependents(
             self._extensions[extension_name], list(self._extensions.values())
         )
@@ -230,16 +446,16 @@ class ExtensionManager:
                     node_type, translation="9999,9999", is_new=True
                 )
 
-    def _update_available_extensions_topic(self) -> None:
+    def _update_available_extensions_topic(self, force_scan=False) -> None:
         main_store.event_loop.create_task(
-            self._update_available_extensions_topic_async()
+            self._update_available_extensions_topic_async(force_scan)
         )
 
-    async def _update_available_extensions_topic_async(self) -> None:
+    async def _update_available_extensions_topic_async(self, force_scan=False) -> None:
         """
         This function is async because it sends requests to get package metadata.
         """
-        available_extensions = self._scan_available_extensions()
+        available_extensions = self._scan_available_extensions(force_scan)
         self._avaliable_extensions_topic.set(list_to_dict(available_extensions, "name"))
         main_store.slash.unregister_source("import_extension")
         for extension in available_extensions:
@@ -265,16 +481,17 @@ class ExtensionManager:
         #     list_to_dict(not_installed_extensions, "name")
         # )
 
-    def _scan_available_extensions(self) -> list[dict]:
+    def _scan_available_extensions(self, force=False) -> list[dict]:
         """
         Returns a list of available extensions that is importable but not imported yet.
+        The installed extensions are cached by ExtensionIndex, so this is cheap unless force is True.
         """
         available_extensions = []
-        for pkg in pkgutil.iter_modules():
-            if pkg.name.startswith("grapycal_") and pkg.name != "grapycal":
-                if pkg.name not in self._extensions:
-                    # find pyproject.toml and get package version
-                    available_extensions.append(get_extension_info(pkg.name))
+        for info in self._extension_index.get(force):
+            if info["name"] not in self._extensions:
+                available_extensions.append(
+                    {"name": info["name"], "version": info["version"]}
+                )
 
         return available_extensions
 
@@ -330,7 +547,7 @@ class ExtensionManager:
         # import extension
         self.import_extension(extension_name)
         # update available extensions
-        await self._update_available_extensions_topic_async()
+        await self._update_available_extensions_topic_async(force_scan=True)
 
     def _load_extension(self, name: str) -> Extension:
         extension = self._extensions[name] = get_extension(
@@ -423,6 +640,7 @@ class ExtensionManager:
             )
 
     def _unload_extension(self, name: str) -> None:
+        self._cancel_preview_nodes(name)
         node_types = self._extensions[name].node_types_d
         for node_type in node_types:
             self._objectsync.unregister(node_type)
@@ -432,17 +650,100 @@ class ExtensionManager:
             main_store.node_types.pop(node_type_name)
 
     def create_preview_nodes(self, name: str) -> None:
-        node_types = self._extensions[name].node_types_d
-        for node_type in node_types.values():
-            if not node_type.category == "hidden" and not node_type._is_singleton:
-                self._objectsync.create_object(
-                    node_type,
-                    parent_id=main_store.node_library.get_id(),
-                    is_preview=True,
-                    is_new=True,
-                )
+        """
+        Show the node types of an extension in the node library. The library is drawn from the preview info in
+        main_store.node_types (see Node.get_preview_info), which is read from the preview cache if possible. Otherwise
+        each node type is instantiated once to get it, in the background a few at a time, because building every node
+        at once blocks the UI thread for seconds with large extensions. Nodes are only kept once they are placed.
+        """
+        node_types = self._get_preview_node_types(name)
+        cached = self._preview_cache.get(name, self._get_preview_key(name))
+        if cached is not None and cached.keys() >= node_types.keys():
+            for type_name in node_types:
+                self._set_preview_info(type_name, cached[type_name])
+            return
+        self._queue_preview_nodes(name, node_types.values())
+
+    def _get_preview_node_types(self, name: str) -> dict[str, type[Node]]:
+        return {
+            type_name: node_type
+            for type_name, node_type in self._extensions[name].node_types_d.items()
+            if not node_type.category == "hidden" and not node_type._is_singleton
+        }
+
+    def _get_preview_key(self, name: str) -> dict:
+        extension = self._extensions[name]
+        return {
+            "version": extension.version,
+            "grapycal_version": grapycal.__version__,
+            "module_mtimes": extension.module_mtimes,
+        }
+
+    def _set_preview_info(self, type_name: str, info: dict) -> None:
+        entry = dict(main_store.node_types[type_name])
+        entry["preview"] = info
+        main_store.node_types.change_value(type_name, entry)
+
+    def _queue_preview_nodes(self, name: str, node_types: Iterable[type[Node]]) -> None:
+        for node_type in node_types:
+            self._preview_queue.append((name, node_type))
+        if len(self._preview_queue) == 0:
+            return
+        if self._preview_task is None or self._preview_task.done():
+            self._preview_task = main_store.event_loop.create_task(
+                self._build_preview_nodes()
+            )
+
+    async def _build_preview_nodes(self) -> None:
+        built_extensions: set[str] = set()
+        while len(self._preview_queue) > 0:
+            deadline = time.perf_counter() + self.PREVIEW_BUILD_BUDGET
+            # Previews are not recorded in the undo history
+            with self._objectsync.record(allow_reentry=True, emit_transition=False):
+                while len(self._preview_queue) > 0 and time.perf_counter() < deadline:
+                    name, node_type = self._preview_queue.popleft()
+                    built_extensions.add(name)
+                    try:
+                        self._build_preview_info(node_type)
+                    except Exception:
+                        logger.exception(
+                            f"Failed to create the preview of {node_type.__name__} in {name}"
+                        )
+            await asyncio.sleep(0)
+
+        for name in built_extensions:
+            if name in self._extensions:
+                self._save_preview_cache(name)
+
+    def _build_preview_info(self, node_type: type[Node]) -> None:
+        node = self._objectsync.create_object(
+            node_type,
+            parent_id=main_store.node_library.get_id(),
+            is_preview=True,
+            is_new=True,
+        )
+        try:
+            info = node.get_preview_info()
+        finally:
+            self._objectsync.destroy_object(node.get_id())
+        self._set_preview_info(node.get_type_name(), info)
+
+    def _save_preview_cache(self, name: str) -> None:
+        previews = {}
+        for type_name in self._get_preview_node_types(name):
+            entry = main_store.node_types[type_name]
+            if "preview" not in entry:
+                return  # failed to build, so don't cache the incomplete previews
+            previews[type_name] = entry["preview"]
+        self._preview_cache.set(name, self._get_preview_key(name), previews)
+
+    def _cancel_preview_nodes(self, name: str) -> None:
+        self._preview_queue = deque(
+            item for item in self._preview_queue if item[0] != name
+        )
 
     def _destroy_nodes(self, name: str) -> None:
+        self._cancel_preview_nodes(name)
         node_types = self._extensions[name].node_types_d
         for obj in main_store.node_library.get_children_of_type(
             Node
@@ -0,0 +1,62 @@
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewCache:
+    """
+    Caches on disk what the node library shows for each node type (see Node.get_preview_info), so the previews don't
+    have to be built by instantiating every node type each time an extension is imported.
+
+    The previews of an extension are reused as long as its key is unchanged. The extension manager uses the version of
+    the extension and grapycal, and the mtimes of the extension's modules, so editing an extension invalidates them.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_path: str | Path | None = None):
+        if cache_path is None:
+            import appdirs
+
+            cache_path = Path(appdirs.user_cache_dir("Grapycal")) / "previews.json"
+        self._cache_path = Path(cache_path)
+        self._cache: dict | None = None
+
+    def get(self, extension_name: str, key) -> dict[str, dict] | None:
+        """
+        Returns the previews of the extension by node type name, or None if they are not cached for the key.
+        """
+        entry = self._load().get(extension_name)
+        if entry is None or entry["key"] != key:
+            return None
+        return entry["previews"]
+
+    def set(self, extension_name: str, key, previews: dict[str, dict]) -> None:
+        cache = self._load()
+        # Round trip through JSON so get() compares the key in the same form as after reading the file
+        cache[extension_name] = json.loads(
+            json.dumps({"key": key, "previews": previews})
+        )
+        self._write(cache)
+
+    def _load(self) -> dict:
+        if self._cache is None:
+            self._cache = {}
+            try:
+                with open(self._cache_path, "r") as f:
+                    data = json.load(f)
+                if data.get("cache_version") == self.CACHE_VERSION:
+                    self._cache = data["extensions"]
+            except (OSError, ValueError, KeyError):
+                pass
+        return self._cache
+
+    def _write(self, cache: dict) -> None:
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._cache_path, "w") as f:
+                json.dump({"cache_version": self.CACHE_VERSION, "extensions": cache}, f)
+        except OSError as e:
+            logger.debug(f"Cannot write preview cache: {e}")
@@ -1,11 +1,13 @@
 import asyncio
+import heapq
+import importlib.metadata
 import importlib.util
 import logging
 from pathlib import Path
+import threading
 import time
 from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, List, TypeVar
 
-import pkg_resources
 from objectsync.sobject import SObjectSerialized
 
 if TYPE_CHECKING:
@@ -140,54 +142,231 @@ class NodeInfo(SObjectInfo):
             self.out_ports[port_info.name] = port_info
 
 
+class _Timer:
+    def __init__(
+        self,
+        callback: Callable[[], Any] | Callable[[float], Any],
+        interval: float,
+        next_time: float,
+        pass_time: bool,
+        on_runner: bool,
+        once: bool = False,
+    ):
+        self.callback = callback
+        self.interval = interval
+        self.next_time = next_time
+        self.pass_time = pass_time
+        self.on_runner = on_runner
+        self.once = once
+        self.cancelled = False
+        # Only used when on_runner is True. busy_generation is the runner generation when the call was pushed, so
+        # the call is known to be dropped if the runner clears its tasks.
+        self.busy = False
+        self.busy_generation = 0
+
+        # statistics
+        self.calls = 0
+        self.overruns = 0
+        self.max_lateness = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+
+    def invoke(self):
+        start = time.perf_counter()
+        try:
+            if self.pass_time:
+                self.callback(time.time())
+            else:
+                self.callback()
+        finally:
+            duration = time.perf_counter() - start
+            self.calls += 1
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+            self.busy = False
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "callback": getattr(self.callback, "__qualname__", repr(self.callback)),
+            "interval": self.interval,
+            "on_runner": self.on_runner,
+            "calls": self.calls,
+            "overruns": self.overruns,
+            "max_lateness": self.max_lateness,
+            "mean_duration": self.total_duration / self.calls if self.calls else 0.0,
+            "max_duration": self.max_duration,
+        }
+
+
 class Clock:
+    """
+    Calls listeners periodically. The timers are kept in a heap, so the clock sleeps until the next deadline instead of
+    polling every listener.
+
+    Periodic timers are drift-compensated: the next deadline is computed from the previous deadline, not from the time
+    the callback actually ran. If a callback takes so long that deadlines are missed, the missed ticks are skipped and
+    counted as overruns.
+
+    Listeners run on the UI event loop by default. With on_runner=True they are pushed to the background runner instead,
+    and a tick is skipped (and counted as an overrun) if the previous call has not finished yet, unless the runner
+    dropped it by clearing its tasks.
+
+    Timers due within `resolution` seconds of each other are fired in the same wakeup.
+
+    call_later() adds a one-shot timer, for nodes that need to act at a specific time instead of polling.
+    """
+
     def __init__(self, resolution: float):
         self.resolution = resolution
-        self.listeners: list[list] = []  # callback, interval, next_time, pass_time
-        self.to_add: dict[Callable, Any] = {}
-        self.to_remove: set[Callable] = set()
+        self._timers: dict[Callable, _Timer] = {}
+        self._heap: list[tuple[float, int, _Timer]] = []
+        self._seq = 0
+        self._pending: list[tuple[Callable, _Timer | None]] = []
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
 
     async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
         while True:
-            for callback in self.to_remove:
-                self.listeners = [l for l in self.listeners if l[0] != callback]
-            self.to_remove = set()
-
-            for to_add in self.to_add.values():
-                self.listeners.append(to_add)
-            self.to_add = {}
-
-            current_time = time.time()
-            await asyncio.sleep(self.resolution)
-            for listener in self.listeners:
-                callback, interval, next_time, pass_time = listener
-                if current_time >= next_time:
-                    if pass_time:
-                        callback(current_time)
-                    else:
-                        callback()
-                    next_time = max(
-                        next_time + interval, current_time
-                    )  # if the callback takes too long, skip the next tick
-                    listener[2] = next_time
+            self._apply_pending()
+
+            if len(self._heap) == 0:
+                timeout = None
+            else:
+                timeout = self._heap[0][0] - time.monotonic()
+
+            if timeout is None or timeout > self.resolution:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._fire_due_timers()
+            # Let other tasks run even if the timers are always due
+            await asyncio.sleep(0)
+
+    def _apply_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for callback, timer in pending:
+            old = self._timers.pop(callback, None)
+            if old is not None:
+                old.cancelled = True
+            if timer is not None:
+                self._timers[callback] = timer
+                self._push(timer)
+
+    def _push(self, timer: _Timer):
+        self._seq += 1
+        heapq.heappush(self._heap, (timer.next_time, self._seq, timer))
+
+    def _fire_due_timers(self):
+        now = time.monotonic()
+        while len(self._heap) > 0 and self._heap[0][0] <= now + self.resolution:
+            deadline, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+
+            timer.max_lateness = max(timer.max_lateness, now - deadline)
+            if timer.once:
+                if self._timers.get(timer.callback) is timer:
+                    del self._timers[timer.callback]
+                self._dispatch(timer)
+                continue
+            self._dispatch(timer)
+
+            timer.next_time = deadline + timer.interval
+            if timer.next_time <= now:
+                missed = int((now - timer.next_time) // timer.interval) + 1
+                timer.overruns += missed
+                timer.next_time += missed * timer.interval
+            self._push(timer)
+
+    def _dispatch(self, timer: _Timer):
+        if not timer.on_runner:
+            try:
+                timer.invoke()
+            except Exception:
+                logger.exception(f"Error in clock listener {timer.callback}")
+            return
+
+        from grapycal.stores import main_store
+
+        generation = main_store.runner.get_generation()
+        if timer.busy and timer.busy_generation == generation:
+            timer.overruns += 1
+            return
+        timer.busy = True
+        timer.busy_generation = generation
+
+        def on_exception(e: Exception):
+            logger.error(f"Error in clock listener {timer.callback}: {e}")
+
+        main_store.runner.push(timer.invoke, exception_callback=on_exception)
+
+    def _wake(self):
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # the event loop is closed
 
     def add_listener(
         self,
-        callback: Callable[[], None] | Callable[[float], None],
+        callback: Callable[[], Any] | Callable[[float], Any],
         interval: float,
         pass_time=False,
+        on_runner=False,
     ):
-        # have to avoid race condition
-        self.to_add[callback] = [callback, interval, time.time() + interval, pass_time]
+        """
+        Call `callback` every `interval` seconds. If `pass_time` is True, the current time is passed to the callback.
+        If `on_runner` is True, the callback runs on the background runner thread instead of the UI event loop.
+        Adding a callback that is already registered replaces it. Thread-safe.
+        """
+        if interval <= 0:
+            raise ValueError(f"Clock interval must be positive, got {interval}")
+        timer = _Timer(
+            callback, interval, time.monotonic() + interval, pass_time, on_runner
+        )
+        with self._lock:
+            self._pending.append((callback, timer))
+        self._wake()
+
+    def call_later(self, callback: Callable[[], Any], delay: float, on_runner=False):
+        """
+        Call `callback` once after `delay` seconds. Calling it again with the same callback before it fires moves the
+        deadline, and remove_listener() cancels it. Thread-safe.
+        """
+        deadline = time.monotonic() + max(delay, 0)
+        timer = _Timer(callback, delay, deadline, False, on_runner, once=True)
+        with self._lock:
+            self._pending.append((callback, timer))
+        self._wake()
 
     def remove_listener(self, callback: Callable):
-        self.to_remove.add(callback)
+        """
+        Stop calling `callback`. Thread-safe.
+        """
+        with self._lock:
+            self._pending.append((callback, None))
+        self._wake()
+
+    def get_stats(self) -> list[dict[str, Any]]:
+        """
+        Returns the call count, overrun count, lateness and duration of each listener.
+        """
+        return [timer.get_stats() for timer in list(self._timers.values())]
 
 
 def get_package_version(package_name: str) -> str:
     """
     Find the version of a package. Considering editable installs, the developer may have changed the version but not installed it.
-    In this case, the new version will not be reflected in pkg_resources. So we first try to find the version in pyproject.toml.
+    In this case, the new version will not be reflected in the package metadata. So we first try to find the version in pyproject.toml.
     """
 
     version = get_package_version_from_pyproject(package_name)
@@ -195,8 +374,9 @@ def get_package_version(package_name: str) -> str:
         return version
 
     try:
-        return pkg_resources.get_distribution(package_name).version
-    except pkg_resources.DistributionNotFound:
+        # importlib.metadata is much cheaper to import than pkg_resources, which scans every installed distribution
+        return importlib.metadata.version(package_name)
+    except importlib.metadata.PackageNotFoundError:
         # the package is not installed
         return "0.0.0"
 
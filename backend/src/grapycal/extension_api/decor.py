@@ -1,6 +1,7 @@
 import inspect
 from typing import Any, Callable
 
+from grapycal.extension_api.func_cache import CacheConfig
 from grapycal.extension_api.node_def import (
     SHOW_ALL_PORTS,
     SHOW_ALL_PORTS_T,
@@ -16,10 +17,16 @@ def func(
     shown_ports: list[str] | SHOW_ALL_PORTS_T = SHOW_ALL_PORTS,
     background: bool = True,
     create_trigger_port: bool | None = None,
+    cache: bool | CacheConfig = False,
 ):
     """
     A decorator to register a node funcion to the Node.
 
+    If cache is True or a CacheConfig, the results are cached by the inputs and the params of the node. When the func
+    is activated with inputs it has seen, the stored result is pushed without running the func again. Only use it for
+    pure funcs, and note that the same result object is pushed on every hit. Each node can turn the cache on or off
+    with its Cache/enabled attribute (see CacheConfig.enabled_by_default).
+
     Example::
 
         class AddNode(Node):
@@ -37,6 +44,7 @@ def func(
             shown_ports=shown_ports,
             background=background,
             create_trigger_port=create_trigger_port,
+            cache=cache,
         )
 
         func._node_func_spec = node_func_spec
@@ -0,0 +1,150 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+from grapycal.extension_api.utils import is_numpy_array, is_torch_tensor
+
+
+class UnhashableInput(Exception):
+    """
+    Raised when a key cannot be made from the inputs. The func is then run without the cache.
+    """
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    """
+    Configures the result cache of a node func. See :func:`grapycal.func`.
+
+    - max_size: The maximum number of results kept.
+    - max_bytes: The maximum estimated size of the results kept.
+    - key: Makes a hashable key from the inputs and params of the func. Defaults to :func:`make_key`.
+    - enabled_by_default: Whether the cache is on for new nodes. Each node can turn it on or off with its Cache/enabled
+      attribute. Leave it off for funcs that are cheap compared to hashing their inputs.
+    """
+
+    max_size: int = 128
+    max_bytes: int = 64 * 1024 * 1024
+    key: Callable[[dict[str, Any]], Hashable] | None = None
+    enabled_by_default: bool = True
+
+
+def _hash_buffer(array) -> Hashable:
+    import numpy as np
+
+    array = np.ascontiguousarray(array)
+    digest = hashlib.blake2b(array.view(np.uint8).data, digest_size=16).digest()
+    return (str(array.dtype), array.shape, digest)
+
+
+def hash_value(value: Any) -> Hashable:
+    """
+    Makes a hashable key that identifies the content of a value. NumPy arrays and torch tensors are hashed by their
+    data, so equal arrays give equal keys. Raises UnhashableInput for objects whose content can't be compared, since
+    keying them by identity would return stale results after they are mutated, and for tensors that require grad,
+    since a shared result would share its autograd graph between calls.
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return (type(value), value)
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(hash_value(item) for item in value))
+    if isinstance(value, dict):
+        return (dict, tuple((hash_value(k), hash_value(v)) for k, v in value.items()))
+    if is_numpy_array(value):
+        if value.dtype.hasobject:
+            raise UnhashableInput("Cannot hash a numpy array of objects")
+        return ("ndarray",) + _hash_buffer(value)
+    if is_torch_tensor(value):
+        import torch
+
+        if value.requires_grad:
+            raise UnhashableInput("Cannot cache results of a tensor that requires grad")
+        tensor = value.detach().cpu()
+        info = ("tensor", str(value.dtype), str(value.device))
+        if tensor.dtype == torch.bfloat16:
+            tensor = tensor.float()  # numpy has no bfloat16
+        return info + _hash_buffer(tensor.numpy())
+    raise UnhashableInput(f"Cannot hash a {type(value).__name__}")
+
+
+def make_key(inputs: dict[str, Any]) -> Hashable:
+    return tuple((name, hash_value(value)) for name, value in inputs.items())
+
+
+def estimate_size(value: Any) -> int:
+    if is_numpy_array(value):
+        return value.nbytes
+    if is_torch_tensor(value):
+        return value.element_size() * value.nelement()
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class FuncCache:
+    """
+    An LRU cache of the results of a node func, evicting by both the number of entries and their estimated size.
+
+    get() is called from the UI thread and put() from the thread that runs the func, so the entries are guarded by a
+    lock.
+    """
+
+    def __init__(self, config: CacheConfig):
+        self.config = config
+        self._make_key = config.key or make_key
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, inputs: dict[str, Any]) -> Hashable | None:
+        """
+        Returns None if the inputs can't be hashed.
+        """
+        try:
+            return self._make_key(inputs)
+        except (UnhashableInput, TypeError):
+            return None
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return True, self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any):
+        size = estimate_size(value)
+        if size > self.config.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.n_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.n_bytes += size
+            while (
+                len(self._entries) > self.config.max_size
+                or self.n_bytes > self.config.max_bytes
+            ):
+                self.n_bytes -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.n_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats_text(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {len(self)} entries, {self.n_bytes / 1024:.1f} KiB"
@@ -2,7 +2,7 @@
 A high-level API for defining nodes in Grapycal.
 """
 
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
 import inspect
 import logging
@@ -20,12 +20,18 @@ from grapycal.sobjects.controls.textControl import TextControl
 from grapycal.sobjects.controls.toggleControl import ToggleControl
 from grapycal.sobjects.controls.triggerControl import TriggerControl
 from grapycal.sobjects.port import UNSPECIFY_CONTROL_VALUE, OutputPort
-from objectsync.topic import ObjDictTopic, ListTopic
+from grapycal.stores import main_store
+from objectsync.topic import ObjDictTopic, ListTopic, StringTopic
+from topicsync.topic import GenericTopic
+from .func_cache import CacheConfig, FuncCache
 from .trait import Trait
 from grapycal.sobjects.port import InputPort
 
 logger = logging.getLogger(__name__)
 
+CACHE_STATS_INTERVAL = 0.5
+"""Seconds between updates of the Cache/stats attribute"""
+
 if TYPE_CHECKING:
     pass
 
@@ -47,6 +53,7 @@ class NodeFuncSpec:
         shown_ports: list[str] | SHOW_ALL_PORTS_T = SHOW_ALL_PORTS,
         background: bool = True,
         create_trigger_port: bool | None = None,
+        cache: bool | CacheConfig = False,
     ):
         self.name = function.__name__
         if sign_source is None:
@@ -60,6 +67,7 @@ class NodeFuncSpec:
         self.shown_ports = shown_ports
         self.background = background
         self.create_trigger_port = create_trigger_port
+        self.cache = CacheConfig() if cache is True else cache or None
 
         # if function is async function, background should be False
         if inspect.iscoroutinefunction(function) and background:
@@ -153,13 +161,6 @@ class NodeParam:
     params: dict[str, ParamItem]
 
 
-@dataclass
-class PortInfo:
-    is_func: bool
-    used_by_funcs: list[NodeFunc]
-    used_by_params: list[NodeParam]
-
-
 class DecorTrait(Trait):
     def __init__(
         self,
@@ -189,6 +190,27 @@ class DecorTrait(Trait):
         self.tr_ports = self.node.add_attribute(
             f"{self.name}.tr_ports", ObjDictTopic[InputPort], restore_from=None
         )
+        cache_configs = [
+            node_func.spec.cache
+            for node_func in self.node_funcs.values()
+            if node_func.spec.cache
+        ]
+        if len(cache_configs) > 0:
+            self.cache_enabled = self.node.add_attribute(
+                f"{self.name}.cache_enabled",
+                GenericTopic[bool],
+                any(config.enabled_by_default for config in cache_configs),
+                editor_type="toggle",
+                display_name="Cache/enabled",
+            )
+            self.cache_stats = self.node.add_attribute(
+                f"{self.name}.cache_stats",
+                StringTopic,
+                is_stateful=False,
+                editor_type="text",
+                display_name="Cache/stats",
+                restore_from=None,
+            )
 
         default_inputs_to_show = [
             input.name for input in self.inputs.values() if input.show_port_by_default
@@ -293,32 +315,63 @@ class DecorTrait(Trait):
             )
 
     def init_node(self):
-        self.port_info_dict: defaultdict[str, PortInfo] = defaultdict(
-            lambda: PortInfo(False, [], [])
-        )
+        # Port objects are looked up once here, so activations don't need to format and parse port names.
+        self._func_in_ports: dict[str, list[InputPort]] = {}
+        self._funcs_of_port: dict[InputPort, list[NodeFunc]] = {}
+        self._func_of_tr_port: dict[InputPort, NodeFunc] = {}
+        self._out_port_of: dict[str, OutputPort] = {
+            name: self.out_ports[f"{self.name}.out.{name}"] for name in self.outputs
+        }
+        self._params_of_port: dict[InputPort, list[NodeParam]] = {}
+        self._param_item_ports: dict[str, dict[str, InputPort]] = {}
+        self._func_caches: dict[str, FuncCache] = {
+            node_func.name: FuncCache(node_func.spec.cache)
+            for node_func in self.node_funcs.values()
+            if node_func.spec.cache
+        }
+        self._cache_stats_scheduled = False
+        if len(self._func_caches) > 0:
+            self.cache_enabled.on_set += self._on_cache_enabled_set
+
         for node_func in self.node_funcs.values():
-            for name in node_func.inputs:
-                self.port_info_dict[f"{self.name}.in.{name}"].is_func = True
-                self.port_info_dict[f"{self.name}.in.{name}"].used_by_funcs.append(
-                    node_func
-                )
+            ports = [
+                self.in_ports[f"{self.name}.in.{name}"] for name in node_func.inputs
+            ]
+            self._func_in_ports[node_func.name] = ports
+            for port in ports:
+                self._funcs_of_port.setdefault(port, []).append(node_func)
+            tr_port_name = f"{self.name}.tr.{node_func.name}"
+            if tr_port_name in self.tr_ports:
+                self._func_of_tr_port[self.tr_ports[tr_port_name]] = node_func
+
+        # Readiness of the func inputs is tracked incrementally. _n_not_ready counts the inputs of each func that are
+        # not known to be ready. Ports whose edges changed are put in _dirty and updated on the next activation,
+        # because the port itself updates use_default only after invoking on_edge_connected/on_edge_disconnected.
+        self._ready: dict[InputPort, bool] = {
+            port: False for port in self._funcs_of_port
+        }
+        self._n_not_ready: dict[str, int] = {
+            name: len(ports) for name, ports in self._func_in_ports.items()
+        }
+        self._dirty: set[InputPort] = set(self._funcs_of_port)
+
+        # The inputs each func last ran with. Only recorded in incremental mode, see _is_incremental().
+        self._last_inputs: dict[str, dict[str, Any]] = {}
+
         for param in self.node_params.values():
-            for name in param.params:
-                self.port_info_dict[f"{self.name}.param.{name}"].is_func = False
-                self.port_info_dict[f"{self.name}.param.{name}"].used_by_params.append(
-                    param
-                )
+            item_ports = {
+                name: self.param_ports[f"{self.name}.param.{name}"]
+                for name in param.params
+            }
+            self._param_item_ports[param.name] = item_ports
+            for port in item_ports.values():
+                self._params_of_port.setdefault(port, []).append(param)
             param_callback = getattr(self.node, param.name)
 
             # Call the param callback once to initialize the param
 
             try:
-                param_callback(
-                    **{
-                        name: self.param_ports[f"{self.name}.param.{name}"].get()
-                        for name in param.params
-                    }
-                )
+                param_callback(**self.collect_params(param))
             except Exception:
                 logger.warning(
                     f"Error when initializing param {param.name} of node {self.node}:"
@@ -334,27 +387,72 @@ class DecorTrait(Trait):
             if name.split(".param.")[-1] not in self.show_params.get():
                 port.set_hidden(True)
 
-        for name, port in self.in_ports.get().items():
-            port.on_edge_connected += lambda _, name=name: self._edge_changed(name)
-            port.on_edge_disconnected += lambda _, name=name: self._edge_changed(name)
+        for port in self.in_ports.get().values():
+            port.on_edge_connected += lambda _, port=port: self._edge_changed(port)
+            port.on_edge_disconnected += lambda _, port=port: self._edge_changed(port)
+            port.default_control.get_value_topic().on_set += lambda *_, port=port: (
+                self._input_control_changed(port)
+            )
 
         self.show_inputs.on_set2.add_auto(self.show_inputs_changed)
         self.show_params.on_set2.add_auto(self.show_params_changed)
 
-    def _edge_changed(self, changed_port_name: str):
-        changed_port_name = changed_port_name.split(".")[-1]
-        for func in self.node_funcs.values():
-            if changed_port_name in func.inputs:
-                if f"{self.name}.tr.{func.name}" in self.tr_ports:
-                    trigger_port = self.tr_ports[f"{self.name}.tr.{func.name}"]
-                    trigger_port.set_hidden(not self.needs_trigger_port(func))
+    def _input_control_changed(self, port: InputPort):
+        if port.use_default and self._is_incremental():
+            port.activated_by_control(port.default_control)
+
+    def _edge_changed(self, changed_port: InputPort):
+        self._dirty.add(changed_port)
+        for func in self._funcs_of_port.get(changed_port, []):
+            if f"{self.name}.tr.{func.name}" in self.tr_ports:
+                trigger_port = self.tr_ports[f"{self.name}.tr.{func.name}"]
+                trigger_port.set_hidden(not self.needs_trigger_port(func))
 
     def needs_trigger_port(self, func: NodeFunc):
-        for input_name in func.inputs:
-            if len(self.in_ports[f"{self.name}.in.{input_name}"].edges) > 0:
+        for port in self._func_in_ports[func.name]:
+            if len(port.edges) > 0:
                 return False
         return True
 
+    def _update_ready(self, port: InputPort):
+        ready = port.is_all_ready()
+        if ready == self._ready[port]:
+            return
+        self._ready[port] = ready
+        delta = -1 if ready else 1
+        for node_func in self._funcs_of_port[port]:
+            self._n_not_ready[node_func.name] += delta
+
+    def _is_incremental(self) -> bool:
+        """
+        In incremental mode (Run/incremental recomputation in the settings), a func reruns with the inputs it last ran
+        with when a param or an input control of the node changes, and inputs that didn't receive new data fall back
+        to their last values. A change then only recomputes the nodes downstream of it, like cells in a spreadsheet.
+        """
+        settings = getattr(main_store, "settings", None)
+        return (
+            settings is not None
+            and settings.incremental.get()
+            and not self.node.is_preview.get()
+        )
+
+    def _is_func_ready(self, node_func: NodeFunc) -> bool:
+        if self._n_not_ready[node_func.name] > 0:
+            if node_func.name not in self._last_inputs or not self._is_incremental():
+                return False
+            last_inputs = self._last_inputs[node_func.name]
+            return all(
+                port.is_all_ready() or name in last_inputs
+                for name, port in zip(
+                    node_func.inputs, self._func_in_ports[node_func.name]
+                )
+            )
+        # Edge data may have been taken by code outside this trait, so confirm before running. This costs the same
+        # as collecting the inputs, which is done right after.
+        for port in self._func_in_ports[node_func.name]:
+            self._update_ready(port)
+        return self._n_not_ready[node_func.name] == 0
+
     def show_inputs_changed(self, old, new):
         old = set(old)
         new = set(new)
@@ -442,35 +540,35 @@ class DecorTrait(Trait):
         return port
 
     def port_activated(self, port: InputPort):
-        port_info = self.port_info_dict[port.get_name()]
+        while self._dirty:
+            self._update_ready(self._dirty.pop())
 
         # If the port is a trigger port, run the corresponding node_func
-        if port.get_name().startswith(f"{self.name}.tr."):
+        if port in self._func_of_tr_port:
             port.clear_edges()
-            func_name = port.get_name().split(".")[-1]
-            node_func = self.node_funcs[func_name]
+            node_func = self._func_of_tr_port[port]
             if not self.needs_trigger_port(node_func):
                 return
             peeked_ports = self.run_node_func(node_func)
             for peeked_port in peeked_ports:
                 peeked_port.clear_edges()
+                self._update_ready(peeked_port)
 
         # If the port is a input port, check if all inputs are ready to run the corresponding node_func
-        elif port_info.is_func:
+        elif port in self._funcs_of_port:
+            self._update_ready(port)
             peeked_ports: set[InputPort] = set()
-            for node_func in port_info.used_by_funcs:
+            for node_func in self._funcs_of_port[port]:
                 # A func requires all its inputs to be ready before it can be executed
-                if all(
-                    self.in_ports[f"{self.name}.in.{name}"].is_all_ready()
-                    for name in node_func.inputs
-                ):
+                if self._is_func_ready(node_func):
                     peeked_ports |= self.run_node_func(node_func)
 
             for peeked_port in peeked_ports:
                 peeked_port.clear_edges()
+                self._update_ready(peeked_port)
 
-        elif not port_info.is_func:  # If the port is a param port
-            for node_param in port_info.used_by_params:
+        elif port in self._params_of_port:  # If the port is a param port
+            for node_param in self._params_of_port[port]:
                 # A param callback is called when any of its input ports are activated
                 param_callback = getattr(self.node, node_param.name)
                 self.node.run(
@@ -481,51 +579,122 @@ class DecorTrait(Trait):
                     background=False,  # assume param callbacks are fast so can be run in the ui thread
                 )
 
+            if self._is_incremental():
+                peeked_ports = set()
+                for node_func in self.node_funcs.values():
+                    if node_func.name in self._last_inputs:
+                        peeked_ports |= self.run_node_func(node_func)
+                for peeked_port in peeked_ports:
+                    peeked_port.clear_edges()
+                    self._update_ready(peeked_port)
+
     def run_node_func(self, node_func: NodeFunc):
-        peeked_ports: set[InputPort] = set()
         func = getattr(self.node, node_func.name)
+        ports = self._func_in_ports[node_func.name]
+        last_inputs = None
+        if self._is_incremental():
+            last_inputs = self._last_inputs.get(node_func.name, {})
+        elif self._last_inputs:
+            self._last_inputs.clear()  # release the data when incremental mode is off
         try:
-            inputs = {
-                input_name: self.in_ports[f"{self.name}.in.{input_name}"].peek()
-                for input_name in node_func.inputs
-            }
+            if last_inputs:
+                inputs = {
+                    input_name: port.peek()
+                    if port.is_all_ready() or input_name not in last_inputs
+                    else last_inputs[input_name]
+                    for input_name, port in zip(node_func.inputs, ports)
+                }
+            else:
+                inputs = {
+                    input_name: port.peek()
+                    for input_name, port in zip(node_func.inputs, ports)
+                }
+            if last_inputs is not None:
+                self._last_inputs[node_func.name] = inputs
         except Exception as e:
             self.node.print_exception(e)
 
-        for name in node_func.inputs:
-            peeked_ports.add(self.in_ports[f"{self.name}.in.{name}"])
-        if node_func.spec.background:
-            self.node.run(
-                lambda func=func,
-                inputs=inputs,
-                node_func=node_func: self.func_finished(  # The node_func=node_func trick is to avoid the late binding problem
-                    func(**inputs), node_func
-                ),
-                background=True,
-            )
-        else:
-            self.node.run(
-                lambda func=func,
-                inputs=inputs,
-                node_func=node_func: self.func_finished(func(**inputs), node_func),
-                background=False,
+        cache = self._func_caches.get(node_func.name)
+        key = None
+        if cache is not None and self.cache_enabled.get():
+            # Params may change the result, so they are part of the key
+            key = cache.make_key(
+                {
+                    **inputs,
+                    **{
+                        f"param.{name}": port.get()
+                        for name, port in self.param_ports.get().items()
+                    },
+                }
             )
-        return peeked_ports
+        if key is not None:
+            hit, outputs = cache.get(key)
+            self._schedule_cache_stats_update()
+            if hit:
+                # Push the stored result directly, without scheduling a task on the runner
+                self.node.flash_running_indicator()
+                self.node.run(
+                    lambda outputs=outputs,
+                    node_func=node_func: self.func_finished(outputs, node_func),
+                    background=False,
+                )
+                return set(ports)
+
+        self.node.run(
+            lambda func=func,
+            inputs=inputs,
+            node_func=node_func,
+            key=key: self.func_finished(  # The node_func=node_func trick is to avoid the late binding problem
+                func(**inputs), node_func, key
+            ),
+            background=node_func.spec.background,
+        )
+        return set(ports)
 
     def collect_params(self, node_param: NodeParam):
-        params = {}
-        for name in node_param.params:
-            params[name] = self.param_ports[f"{self.name}.param.{name}"].get()
-        return params
-
-    def func_finished(self, outputs, node_func: NodeFunc):
+        return {
+            name: port.get()
+            for name, port in self._param_item_ports[node_param.name].items()
+        }
+
+    def func_finished(self, outputs, node_func: NodeFunc, cache_key=None):
+        if cache_key is not None:
+            self._func_caches[node_func.name].put(cache_key, outputs)
         if len(node_func.outputs) == 1:
-            name = f"{self.name}.out.{list(node_func.outputs)[0]}"
-            self.out_ports[name].push(outputs)
+            self._out_port_of[next(iter(node_func.outputs))].push(outputs)
         else:
             for name, output in outputs.items():
                 assert name in node_func.outputs
-                self.out_ports[f"{self.name}.out.{name}"].push(output)
+                self._out_port_of[name].push(output)
+
+    def _on_cache_enabled_set(self, enabled: bool):
+        if not enabled:
+            for cache in self._func_caches.values():
+                cache.clear()
+            self._schedule_cache_stats_update()
+
+    def _schedule_cache_stats_update(self):
+        # The stats change on every activation. They are sent to the frontend at most once per CACHE_STATS_INTERVAL.
+        if self._cache_stats_scheduled:
+            return
+        self._cache_stats_scheduled = True
+        main_store.clock.call_later(self._update_cache_stats, CACHE_STATS_INTERVAL)
+
+    def _update_cache_stats(self):
+        self._cache_stats_scheduled = False
+        if self.node.is_destroyed():
+            return
+        text = self._get_cache_stats_text()
+        if text != self.cache_stats.get():
+            self.cache_stats.set(text)
+
+    def _get_cache_stats_text(self) -> str:
+        if len(self._func_caches) == 1:
+            return next(iter(self._func_caches.values())).get_stats_text()
+        return "\n".join(
+            f"{name}: {cache.get_stats_text()}"
+            for name, cache in self._func_caches.items()
+        )
 
     def set_input(self, name, value):
         self.in_ports[f"{self.name}.in.{name}"].set_control_value(value)
@@ -763,9 +932,36 @@ def reduce(items: list[T]) -> T:
     return items[0]
 
 
-def generate_traits(node_def_info: NodeDefInfo) -> "list[Trait]":
-    traits: "list[Trait]" = []
+@dataclass
+class DecorSpec:
+    """
+    The reduced inputs, outputs and params of a node type. They only depend on the signatures of the funcs and params,
+    so they are computed once and shared by the DecorTraits of all nodes of the type.
+    """
+
+    inputs: dict[str, Input]
+    outputs: dict[str, Output]
+    params: dict[str, ParamItem]
+    func_ports: dict[str, tuple[dict[str, Input], dict[str, Output]]]
+    node_params: dict[str, NodeParam]
+
+    def make_traits(self, funcs: dict[str, NodeFuncSpec]) -> "list[Trait]":
+        # NodeFunc holds the spec, which may be bound to a node, so it's created for each node.
+        node_funcs = {
+            name: NodeFunc(name, inputs, outputs, funcs[name])
+            for name, (inputs, outputs) in self.func_ports.items()
+        }
+        return [
+            DecorTrait(
+                self.inputs, self.outputs, self.params, node_funcs, self.node_params
+            )
+        ]
+
 
+def compute_decor_spec(node_def_info: NodeDefInfo) -> DecorSpec | None:
+    """
+    Returns None if no DecorTrait is needed.
+    """
     inputs_dict_list, outputs_dict_list, params_dict_list, node_funcs, node_params = (
         collect_input_output_params(node_def_info.funcs, node_def_info.params)
     )
@@ -773,23 +969,117 @@ def generate_traits(node_def_info: NodeDefInfo) -> "list[Trait]":
     if not consistent_input_output_params(
         inputs_dict_list, outputs_dict_list, params_dict_list
     ):
-        return []
+        return None
 
     # no need of decortrait if there are no node_funcs and node_params
     if len(node_funcs) == 0 and len(node_params) == 0:
-        return []
+        return None
 
     inputs = {name: reduce(item) for name, item in inputs_dict_list.items()}
     outputs = {name: reduce(item) for name, item in outputs_dict_list.items()}
     params = {name: reduce(item) for name, item in params_dict_list.items()}
 
     # fill in the actual types for node_funcs and node_params
-    for node_func in node_funcs.values():
-        node_func.inputs = {name: inputs[name] for name in node_func.inputs}
-        node_func.outputs = {name: outputs[name] for name in node_func.outputs}
+    func_ports = {
+        node_func.name: (
+            {name: inputs[name] for name in node_func.inputs},
+            {name: outputs[name] for name in node_func.outputs},
+        )
+        for node_func in node_funcs.values()
+    }
 
     for node_param in node_params.values():
         node_param.params = {name: params[name] for name in node_param.params}
 
-    traits.append(DecorTrait(inputs, outputs, params, node_funcs, node_params))
-    return traits
+    return DecorSpec(inputs, outputs, params, func_ports, node_params)
+
+
+def generate_traits(node_def_info: NodeDefInfo) -> "list[Trait]":
+    decor_spec = compute_decor_spec(node_def_info)
+    if decor_spec is None:
+        return []
+    return decor_spec.make_traits(node_def_info.funcs)
+
+
+class DecorSpecCache:
+    """
+    Caches the DecorSpec of a node type, so creating a node doesn't inspect the signatures of its funcs and params again.
+
+    Specs returned by define_funcs() and define_params() are usually created for each node, so they are keyed by what
+    the ports are built from: the functions in sign_source (bound methods by their underlying function), the overrides,
+    shown_ports and the flags. The keyed objects are kept alive by the cache entry, so their ids can't be reused while
+    the entry exists.
+    """
+
+    MAX_SIZE = 16
+
+    def __init__(self, node_def_info: NodeDefInfo):
+        self._node_def_info = node_def_info
+        self._entries: OrderedDict[tuple, tuple[DecorSpec | None, list]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_traits(
+        self,
+        extra_funcs: list[NodeFuncSpec] | None = None,
+        extra_params: list[NodeParamSpec] | None = None,
+    ) -> "list[Trait]":
+        info = self._node_def_info
+        if extra_funcs or extra_params:
+            # Merge into a copy. The class-level info is shared by all nodes of the type.
+            info = NodeDefInfo(info.funcs.copy(), info.params.copy())
+            for func in extra_funcs or []:
+                info.funcs[func.name] = func
+            for param in extra_params or []:
+                info.params[param.name] = param
+
+        refs: list = []
+        key = (
+            tuple(_spec_key(func, refs) for func in info.funcs.values()),
+            tuple(_spec_key(param, refs) for param in info.params.values()),
+        )
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            decor_spec = self._entries[key][0]
+        else:
+            self.misses += 1
+            decor_spec = compute_decor_spec(info)
+            self._entries[key] = (decor_spec, refs)
+            if len(self._entries) > self.MAX_SIZE:
+                self._entries.popitem(last=False)
+
+        if decor_spec is None:
+            return []
+        return decor_spec.make_traits(info.funcs)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _spec_key(spec: NodeFuncSpec | NodeParamSpec, refs: list) -> tuple:
+    def ref(obj) -> int:
+        refs.append(obj)
+        return id(obj)
+
+    sources = tuple(
+        ref(source)
+        if isinstance(source, inspect.Parameter)
+        else ref(getattr(source, "__func__", source))
+        for source in spec.sign_source
+    )
+    shown_ports = (
+        None
+        if isinstance(spec.shown_ports, SHOW_ALL_PORTS_T)
+        else tuple(spec.shown_ports)
+    )
+    return (
+        type(spec),
+        spec.name,
+        sources,
+        ref(spec.annotation_override) if spec.annotation_override else None,
+        ref(spec.default_override) if spec.default_override else None,
+        shown_ports,
+        getattr(spec, "background", None),
+        getattr(spec, "create_trigger_port", None),
+    )
@@ -353,14 +353,18 @@ class ClockTrait(Trait):
         interval: float,
         pass_time=False,
         name="c_lock",
+        on_runner=False,
     ) -> None:
         super().__init__(name)
         self.callback = callback
         self.interval = interval
         self.pass_time = pass_time
+        self.on_runner = on_runner
 
     def init_node(self):
-        main_store.clock.add_listener(self.callback, self.interval, self.pass_time)
+        main_store.clock.add_listener(
+            self.callback, self.interval, self.pass_time, self.on_runner
+        )
 
     def destroy(self):
         main_store.clock.remove_listener(self.callback)
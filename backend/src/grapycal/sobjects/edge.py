@@ -110,12 +110,10 @@ class Edge(SObject):
         self._data = data
         self._activated = True
         self._data_ready = True
-        with self._server.record(
-            allow_reentry=True
-        ):  # aquire a lock to prevent calling set while destroying
-            if self.is_destroyed():
-                return
-            self.editor.is_running_manager.set_running(self, True)
+        if self.is_destroyed():
+            return
+        # No lock needed. The IsRunningManager ignores destroyed edges when it publishes the running state.
+        self.editor.is_running_manager.set_running(self, True)
         if label:
             self.label.set(label)
         else:
@@ -3,7 +3,6 @@ from pathlib import Path
 from grapycal.extension.utils import list_to_dict
 from grapycal.stores import main_store
 from grapycal.utils.httpResource import HttpResource
-from matplotlib.style import available
 from objectsync import IntTopic, SObject, StringTopic
 from grapycal.utils.io import read_workspace
 import logging
@@ -1,47 +1,57 @@
+import asyncio
+import contextvars
+import enum
+import functools
+import io
 import logging
+import time
+import traceback
+from abc import ABCMeta
+from collections import deque
+from contextlib import contextmanager
+from itertools import count
 from pprint import pprint
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    Literal,
+    Self,
+    TypeVar,
+)
 
-from grapycal.core.background_runner import RunnerInterrupt
+from grapycal.core.background_runner import RunnerInterrupt, TaskInfo
 from grapycal.core.client_msg_types import ClientMsgTypes
 from grapycal.core.typing import GType, AnyType
+from grapycal.extension.utils import NodeInfo
 from grapycal.extension_api.node_def import (
+    DecorSpecCache,
     DecorTrait,
     NodeFuncSpec,
     NodeParamSpec,
-    generate_traits,
     get_node_def_info,
 )
 from grapycal.extension_api.trait import Chain, Trait
-from grapycal.sobjects.controls.keyboardControl import KeyboardControl
-from grapycal.sobjects.controls.sliderControl import SliderControl
-from grapycal.sobjects.controls.toggleControl import ToggleControl
-from grapycal.utils.misc import Action, as_type
-
-logger = logging.getLogger(__name__)
-import asyncio
-import enum
-import functools
-import io
-import traceback
-from abc import ABCMeta
-from contextlib import contextmanager
-from itertools import count
-from typing import TYPE_CHECKING, Awaitable, Callable, Literal, Self, TypeVar
-
-from grapycal.extension.utils import NodeInfo
 from grapycal.sobjects.controls.buttonControl import ButtonControl
 from grapycal.sobjects.controls.codeControl import CodeControl
 from grapycal.sobjects.controls.control import Control, ValuedControl
 from grapycal.sobjects.controls.imageControl import ImageControl
+from grapycal.sobjects.controls.keyboardControl import KeyboardControl
 from grapycal.sobjects.controls.linePlotControl import LinePlotControl
 from grapycal.sobjects.controls.nullControl import NullControl
 from grapycal.sobjects.controls.optionControl import OptionControl
+from grapycal.sobjects.controls.sliderControl import SliderControl
 from grapycal.sobjects.controls.textControl import TextControl
+from grapycal.sobjects.controls.toggleControl import ToggleControl
 from grapycal.sobjects.edge import Edge
 from grapycal.sobjects.port import UNSPECIFY_CONTROL_VALUE, InputPort, OutputPort, Port
 from grapycal.stores import main_store
 from grapycal.utils.io import OutputStream
 from grapycal.utils.logging import user_logger, warn_extension
+from grapycal.utils.misc import Action, as_type
+from grapycal.utils.node_profiler import node_profiler
 from objectsync import (
     DictTopic,
     FloatTopic,
@@ -56,6 +66,8 @@ from objectsync import (
 )
 from objectsync.sobject import SObjectSerialized, WrappedTopic
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from grapycal.extension.extension import Extension
 
@@ -153,6 +165,107 @@ def deprecated(message: str, from_version: str, to_version: str):
     return wrapper
 
 
+class _InlineTasks:
+    """
+    The tasks scheduled inside run_inline(). Like in the BackgroundRunner, the queue has priority and both are popped
+    from the end.
+    """
+
+    def __init__(self):
+        self.queue: deque[TaskInfo] = deque()
+        self.stack: deque[TaskInfo] = deque()
+
+    def run_all(self):
+        while len(self.queue) > 0 or len(self.stack) > 0:
+            if len(self.queue) > 0:
+                task_info = self.queue.pop()
+            else:
+                task_info = self.stack.pop()
+            task, exception_callback = task_info.task, task_info.exception_callback
+            if isinstance(task, Iterator):
+                # Stepped like in BackgroundRunner.run(). The tasks a step schedules are pushed above the iterator,
+                # so it is removed by its position when it ends.
+                index = len(self.stack)
+                self.stack.append(task_info)
+                try:
+                    next(task)
+                except StopIteration:
+                    del self.stack[index]
+                except Exception as e:
+                    del self.stack[index]
+                    if exception_callback is None:
+                        raise
+                    exception_callback(e)
+            else:
+                try:
+                    ret = task()
+                except Exception as e:
+                    if exception_callback is None:
+                        raise
+                    exception_callback(e)
+                else:
+                    if isinstance(ret, Iterator):
+                        self.stack.append(TaskInfo(iter(ret), exception_callback))
+
+
+# Set inside run_inline(), where Node.run() collects background tasks instead of scheduling them on the runner
+_inline: contextvars.ContextVar[_InlineTasks | None] = contextvars.ContextVar(
+    "inline", default=None
+)
+
+
+def run_inline(task: Callable[[], Any], on_done: Callable[[], Any] | None = None):
+    """
+    Run a task so that every Node.run() it causes, including in the nodes it pushes data to, runs in the current
+    thread instead of being scheduled on the background runner. This runs a small subgraph in a single task.
+
+    The background tasks are collected and run one after another, in the order the runner would run them, after the
+    task returns. So nodes that schedule themselves again, like a For loop, iterate instead of recursing. Tasks that
+    return an iterator are stepped as the runner steps them. on_done is called after all of them.
+
+    Inside another run_inline(), the task and on_done are added to the tasks of the outer one and run_inline()
+    returns immediately, so nested calls (e.g. a function calling itself) don't grow the Python stack either.
+    """
+    tasks = _inline.get()
+    if tasks is not None:
+        _push_inline(tasks, task, on_done)
+        return
+
+    tasks = _InlineTasks()
+    token = _inline.set(tasks)
+    try:
+        _push_inline(tasks, task, on_done)
+        tasks.run_all()
+    finally:
+        _inline.reset(token)
+
+
+def _push_inline(
+    tasks: _InlineTasks, task: Callable[[], Any], on_done: Callable[[], Any] | None
+):
+    # Pushed to the stack in reverse, so on_done runs after the task and everything it schedules
+    if on_done is not None:
+        tasks.stack.append(
+            TaskInfo(functools.partial(contextvars.copy_context().run, on_done))
+        )
+    tasks.stack.append(
+        TaskInfo(functools.partial(contextvars.copy_context().run, task))
+    )
+
+
+def _in_context(iterator: Iterator, context: contextvars.Context) -> Iterator:
+    """
+    Steps an iterator returned by a task with each step run in the context of the task, so the steps see the same
+    context variables as the call that created the iterator.
+    """
+    while True:
+        try:
+            item = context.run(next, iterator)
+        except StopIteration:
+            return
+        yield item
+
+
 def background_task(func: Callable):
     """
     A decorator to run a task in the background thread.
@@ -211,6 +324,7 @@ class NodeMeta(ABCMeta):
 
         # used to generate traits out of high level node def interface
         self._node_def_info = get_node_def_info(attrs, base_node_def_info)
+        self._decor_spec_cache = DecorSpecCache(self._node_def_info)
 
         return super().__init__(name, bases, attrs)
 
@@ -302,14 +416,10 @@ class Node(SObject, metaclass=NodeMeta):
         super().initialize(serialized, *args, **kwargs)
 
     def define_traits_gen(self) -> list[Trait]:
-        # self._node_def_info.funcs.update(self.define_funcs())
-        # self._node_def_info.params.update(self.define_params())
-        for func in self.define_funcs():
-            self._node_def_info.funcs[func.name] = func
-        for param in self.define_params():
-            self._node_def_info.params[param.name] = param
         try:
-            return generate_traits(self._node_def_info)
+            return self._decor_spec_cache.get_traits(
+                self.define_funcs(), self.define_params()
+            )
         except Exception as e:
             raise RuntimeError(
                 f"Failed to define node type {self.get_type_name()}: {e}"
@@ -601,6 +711,34 @@ class Node(SObject, metaclass=NodeMeta):
             f"drag_created_by{client_id}"
         )  # So the client can find the node it spawned and make it follow the mouse
 
+    def get_preview_info(self) -> dict[str, Any]:
+        """
+        Returns what the node library shows for this node type: the label, shape, icon, css classes and visible ports
+        of the node right after it is built. It is cached on disk, so it must be JSON-serializable.
+        """
+
+        def port_info(port: Port) -> dict[str, Any]:
+            return {
+                "name": port.name.get(),
+                "display_name": port.display_name.get(),
+                "is_param": port.is_param.get(),
+            }
+
+        return {
+            "label": self.label_topic.get(),
+            "shape": self.shape_topic.get(),
+            "icon_path": self.icon_path_topic.get(),
+            "css_classes": list(self.css_classes.get()),
+            "in_ports": [
+                port_info(port) for port in self.in_ports.get() if not port.hidden.get()
+            ],
+            "out_ports": [
+                port_info(port)
+                for port in self.out_ports.get()
+                if not port.hidden.get()
+            ],
+        }
+
     def attach_to_port(self, other_port: Port):
         if isinstance(other_port, InputPort):
             if len(self.out_ports) == 0:
@@ -1178,10 +1316,22 @@ class Node(SObject, metaclass=NodeMeta):
     ):
         """
         Run a task in the background thread.
+
+        The task runs in a copy of the current context, so context variables (e.g. the call frame of a graph-defined
+        function) follow the data from the node that scheduled the task.
         """
 
+        context = contextvars.copy_context()
+        task = functools.partial(context.run, task)
+        queued_at = time.perf_counter() if node_profiler.enabled else None
+
         def wrapped():
             self.incr_n_running_tasks()
+            record = (
+                node_profiler.begin(self, "background", queued_at)
+                if node_profiler.enabled
+                else None
+            )
             try:
                 if redirect_output:
                     with self._redirect_output():
@@ -1189,29 +1339,40 @@ class Node(SObject, metaclass=NodeMeta):
                 else:
                     ret = task()
             except Exception:
+                node_profiler.end(record, failed=True)
                 self.decr_n_running_tasks()
                 raise
+            node_profiler.end(record)
             self.decr_n_running_tasks()
+            if isinstance(ret, Iterator):
+                # The runner steps the iterator later, outside of the context
+                return _in_context(ret, context)
             return ret
 
         main_store.runner.push(
             wrapped, to_queue=to_queue, exception_callback=self._on_exception
         )
 
-    def _run_directly(self, task: Callable[[], None], redirect_output=False):
+    def _run_directly(self, task: Callable[[], Any], redirect_output=False):
         """
-        Run a task in the current thread.
+        Run a task in the current thread. Returns what the task returns, or None if it raised.
         """
         self.incr_n_running_tasks()
+        record = node_profiler.begin(self, "direct") if node_profiler.enabled else None
+        failed = False
+        ret = None
         try:
             if redirect_output:
                 with self._redirect_output():
-                    task()
+                    ret = task()
             else:
-                task()
+                ret = task()
         except Exception as e:
+            failed = True
             self._on_exception(e, truncate=1)
+        node_profiler.end(record, failed)
         self.decr_n_running_tasks()
+        return ret
 
     def _run_async(self, task: Callable[[], Awaitable[None]]):
         """
@@ -1220,10 +1381,16 @@ class Node(SObject, metaclass=NodeMeta):
 
         async def wrapped():
             self.incr_n_running_tasks()
+            record = (
+                node_profiler.begin(self, "async") if node_profiler.enabled else None
+            )
+            failed = False
             try:
                 await task()
             except Exception as e:
+                failed = True
                 self._on_exception(e, truncate=1)
+            node_profiler.end(record, failed)
             self.decr_n_running_tasks()
 
         main_store.event_loop.create_task(wrapped())
@@ -1253,15 +1420,28 @@ class Node(SObject, metaclass=NodeMeta):
         Args:
             - task: The task to run.
 
-            - background: If set to True, the task will be scheduled to run in the background thread. Otherwise, it will be run in the current thread immediately.
+            - background: If set to True, the task will be scheduled to run in the background thread. Otherwise, it will be run in the current thread immediately.\
+            Inside run_inline(), the task is run in the current thread after the task of run_inline().
 
             - to_queue: This argument is used only when `background` is True. If set to True, the task will be pushed to the :class:`.BackgroundRunner`'s queue.\
             If set to False, the task will be pushed to its stack. See :class:`.BackgroundRunner` for more details.
         """
         is_async = asyncio.iscoroutinefunction(task)
         task = functools.partial(task, *args, **kwargs)
+        inline_tasks = _inline.get()
         if is_async:
             self._run_async(task)
+        elif background and inline_tasks is not None:
+            context = contextvars.copy_context()
+
+            def inline_task():
+                ret = context.run(self._run_directly, task)
+                if isinstance(ret, Iterator):
+                    return _in_context(ret, context)
+
+            (inline_tasks.queue if to_queue else inline_tasks.stack).append(
+                TaskInfo(inline_task, self._on_exception)
+            )
         elif background:
             self._run_in_background(task, to_queue, redirect_output=False)
         else:
@@ -1292,15 +1472,10 @@ class Node(SObject, metaclass=NodeMeta):
     def set_running(self, running: bool):
         if self.is_preview.get() == 1:
             return
-        with self._server.record(
-            allow_reentry=True
-        ):  # aquire the lock to prevent setting the attribute while the sobject being deleted
-            if self.is_destroyed():
-                return
-            if running:
-                self.editor.is_running_manager.set_running(self, True)
-            else:
-                self.editor.is_running_manager.set_running(self, False)
+        # No need to lock here. The IsRunningManager ignores destroyed nodes when it publishes the running state.
+        if self.is_destroyed() or self.editor is None:
+            return
+        self.editor.is_running_manager.set_running(self, running)
 
     def get_vars(self):
         """
@@ -1,4 +1,21 @@
+from grapycal.stores import main_store
 from objectsync import SObject
 
+
 class NodeLibrary(SObject):
-    frontend_type = 'NodeLibrary'
\ No newline at end of file
+    frontend_type = "NodeLibrary"
+
+    def init(self):
+        self.on("spawn", self.spawn, is_stateful=False)
+
+    def spawn(self, node_type: str, client_id):
+        """
+        Called when a client drags a node type out of the library. The node library only shows the previews in
+        main_store.node_types, so the node is built here for the first time.
+        """
+        new_node = main_store.main_editor.create_node(node_type, sender=client_id)
+        if new_node is None:  # failed to create node
+            return
+        new_node.add_tag(
+            f"drag_created_by{client_id}"
+        )  # So the client can find the node it spawned and make it follow the mouse
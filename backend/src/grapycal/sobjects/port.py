@@ -7,6 +7,7 @@ from objectsync import IntTopic, SObject, StringTopic
 from grapycal.core.typing import GType, AnyType
 from grapycal.sobjects.controls.control import ValuedControl
 from grapycal.sobjects.controls.nullControl import NullControl
+from grapycal.stores import main_store
 from grapycal.utils.misc import Action
 from topicsync.topic import GenericTopic
 
@@ -60,12 +61,14 @@ class Port(SObject):
         if len(self.edges) >= self.max_edges.get():
             raise Exception("Max edges reached")
         self.edges.append(edge)
+        main_store.graph_version += 1
         self.on_edge_connected.invoke(edge)
 
     def remove_edge(self, edge: "Edge"):
         if edge not in self.edges:
             return
         self.edges.remove(edge)
+        main_store.graph_version += 1
         self.on_edge_disconnected.invoke(edge)
 
     def is_full(self):
@@ -1,4 +1,5 @@
-from objectsync import DictTopic, SObject, StringTopic, Topic
+from objectsync import DictTopic, FloatTopic, SObject, StringTopic, Topic
+from topicsync.topic import GenericTopic
 
 class Settings(SObject):
     frontend_type = 'Settings'
@@ -7,6 +8,10 @@ class Settings(SObject):
         self.entries = self.add_attribute('entries',DictTopic,{})
         self.data_path = self.add_attribute('data_path',StringTopic,'./_data')
         self._add_entry('Data/data path',self.data_path,'text',{})
+        self.incremental = self.add_attribute('incremental',GenericTopic[bool],False)
+        self._add_entry('Run/incremental recomputation',self.incremental,'toggle',{})
+        self.os_stat_interval = self.add_attribute('os_stat_interval',FloatTopic,2.0)
+        self._add_entry('System/resource monitor interval (s)',self.os_stat_interval,'float',{})
 
     def _add_entry(self,name,topic:Topic,editor_type:str,editor_args:dict|None=None):
         if editor_args is None:
@@ -36,6 +36,9 @@ class MainStore:
         # custom stores required by extensions
         self.stores: Dict[str, Any] = {}
 
+        # incremented by Port whenever an edge is connected or disconnected, to invalidate caches of the graph
+        self.graph_version = 0
+
         # set by Workspace
         self.node_types: DictTopic
         self.clock: Clock
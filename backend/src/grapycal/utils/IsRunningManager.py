@@ -1,39 +1,67 @@
+from collections import deque
 from grapycal.extension.utils import Clock
 from grapycal.sobjects.edge import Edge
 from grapycal.sobjects.node import Node
+from grapycal.stores import main_store
 from objectsync import ObjSetTopic
 
 
-import threading
+class IsRunningManager:
+    """
+    Keeps track of running nodes and edges so the frontend can animate them.
 
+    set_running() can be called from any thread at a high rate, so it only appends the event to a deque, which is
+    thread-safe without a lock. The events are drained on the UI thread every 0.1 s, where repeated events for the same
+    object are coalesced, and only the difference from the last published state is sent to the frontend.
+    """
 
-class IsRunningManager:
     def __init__(self, running_nodes_topic: ObjSetTopic, clock: Clock):
         self._running_nodes_topic = running_nodes_topic
-        self._set_running_true = set()
-        self._set_running_true_2 = set()
-        self._running = set()
-        self._set_running_lock = threading.Lock()
+        self._events: deque[tuple[Node | Edge, bool]] = deque()
+        self._running: set[Node | Edge] = set()
+        self._flashed: set[Node | Edge] = set()  # set running in the last tick
+        self._published: set[Node | Edge] = set()
 
         clock.add_listener(self.check_running_nodes, 0.1)
         self.clock = clock
 
     def check_running_nodes(self):
-        with self._set_running_lock:
-            running_nodes = list(
-                self._running | self._set_running_true | self._set_running_true_2
-            )
-            self._set_running_true_2 = self._set_running_true
-            self._set_running_true = set()
-        self._running_nodes_topic.set(running_nodes)
-
-    def set_running(self, node: Node | Edge, running: bool):
-        with self._set_running_lock:
+        # Objects that were set running in the last two ticks are shown, so short tasks are visible as a flash.
+        flashed: set[Node | Edge] = set()
+        # Only drain the events that are already there, so a busy producer can't keep this loop going
+        for _ in range(len(self._events)):
+            obj, running = self._events.popleft()
             if running:
-                self._set_running_true.add(node)
-                self._running.add(node)
+                self._running.add(obj)
+                flashed.add(obj)
+            else:
+                self._running.discard(obj)
+
+        self._running = {obj for obj in self._running if not obj.is_destroyed()}
+        shown = self._running | {
+            obj for obj in flashed | self._flashed if not obj.is_destroyed()
+        }
+        self._flashed = flashed
+
+        added = shown - self._published
+        removed = self._published - shown
+        if len(added) == 0 and len(removed) == 0:
+            self._published = shown
+            return
+
+        with main_store.record(allow_reentry=True):
+            if len(added) + len(removed) > len(shown):
+                self._running_nodes_topic.set(list(shown))
             else:
-                self._running.discard(node)
+                for obj in removed:
+                    if obj in self._running_nodes_topic:
+                        self._running_nodes_topic.remove(obj)
+                for obj in added:
+                    self._running_nodes_topic.append(obj)
+        self._published = shown
+
+    def set_running(self, node: Node | Edge, running: bool):
+        self._events.append((node, running))
 
     def destroy(self):
         self.clock.remove_listener(self.check_running_nodes)
@@ -0,0 +1,290 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from grapycal.sobjects.node import Node
+
+RunKind = Literal["background", "direct", "async"]
+
+
+@dataclass
+class NodeStats:
+    calls: int = 0
+    sampled: int = 0  # calls that were timed
+    exceptions: int = 0
+    wall_time: float = 0
+    cpu_time: float = 0
+    queue_wait: float = 0
+    max_wall_time: float = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Record:
+    node_id: int
+    node_name: str
+    kind: RunKind
+    thread_id: int
+    start: float
+    cpu_start: float
+    queue_wait: float
+
+
+class _ThreadCounts(threading.local):
+    """
+    Call counts of the current thread, so begin() doesn't take the lock for calls that are not sampled.
+    """
+
+    def __init__(self, profiler: "NodeProfiler"):
+        self.counter = 0
+        self.calls: dict[int, int] = {}
+        profiler._register_thread_counts(self)
+
+
+@dataclass
+class _Span:
+    node_id: int
+    node_name: str
+    kind: RunKind
+    thread_id: int
+    start: float
+    end: float
+    failed: bool
+
+
+class NodeProfiler:
+    """
+    Records how long each node spends running its tasks: call counts, wall and CPU time, how long background tasks
+    waited in the runner, and exceptions. Node.run() reports to the profiler through begin() and end().
+
+    When disabled, the only overhead is checking `enabled`. With sample_every=n, every call is counted but only one
+    call in n (per thread) is timed. Calls are counted per thread without a lock, and the lock is only taken for timed
+    calls. The timed calls are also kept as spans (up to MAX_SPANS) that can be exported as a Chrome
+    trace (chrome://tracing, Perfetto) or a speedscope file.
+    """
+
+    MAX_SPANS = 200_000
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_every = 1
+        self._stats: dict[int, NodeStats] = {}
+        self._spans: deque[_Span] = deque(maxlen=self.MAX_SPANS)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._all_thread_counts: list[dict[int, int]] = []
+        self._thread_counts = _ThreadCounts(self)
+
+    def _register_thread_counts(self, thread_counts: _ThreadCounts):
+        # Called once per thread, the first time the thread accesses _thread_counts
+        with self._lock:
+            self._all_thread_counts.append(thread_counts.calls)
+
+    def start(self, sample_every: int = 1):
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.sample_every = sample_every
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+            self._spans.clear()
+            for calls in self._all_thread_counts:
+                calls.clear()
+
+    def begin(
+        self, node: "Node", kind: RunKind, queued_at: float | None = None
+    ) -> _Record | None:
+        """
+        Returns None if the call is not sampled. Pass the return value to end().
+        """
+        node_id = node.get_id()
+        counts = self._thread_counts
+        counts.calls[node_id] = counts.calls.get(node_id, 0) + 1
+        counts.counter += 1
+        if counts.counter % self.sample_every != 0:
+            return None
+        start = time.perf_counter()
+        return _Record(
+            node_id,
+            f"{type(node).__name__} {node_id}",
+            kind,
+            threading.get_ident(),
+            start,
+            time.thread_time() if kind != "async" else 0,
+            start - queued_at if queued_at is not None else 0,
+        )
+
+    def end(self, record: _Record | None, failed=False):
+        if record is None:
+            return
+        end = time.perf_counter()
+        wall_time = end - record.start
+        # An async task yields to other tasks, so its thread time is not its own.
+        cpu_time = (
+            time.thread_time() - record.cpu_start if record.kind != "async" else 0
+        )
+        with self._lock:
+            stats = self._stats.setdefault(record.node_id, NodeStats())
+            stats.sampled += 1
+            stats.wall_time += wall_time
+            stats.cpu_time += cpu_time
+            stats.queue_wait += record.queue_wait
+            stats.max_wall_time = max(stats.max_wall_time, wall_time)
+            if failed:
+                stats.exceptions += 1
+            self._spans.append(
+                _Span(
+                    record.node_id,
+                    record.node_name,
+                    record.kind,
+                    record.thread_id,
+                    record.start,
+                    end,
+                    failed,
+                )
+            )
+
+    def get_stats(self) -> dict[int, NodeStats]:
+        with self._lock:
+            result = {
+                node_id: NodeStats(**asdict(stats))
+                for node_id, stats in self._stats.items()
+            }
+            all_thread_counts = list(self._all_thread_counts)
+        for calls in all_thread_counts:
+            # copy() is atomic, while the thread may add to the dict
+            for node_id, n in calls.copy().items():
+                result.setdefault(node_id, NodeStats()).calls += n
+        return result
+
+    def get_summary(self) -> dict[str, dict]:
+        """
+        Per-node stats for the frontend. "heat" is the node's share of the wall time of the busiest node, from 0 to 1,
+        for coloring the graph.
+        """
+        stats = self.get_stats()
+        busiest = max((s.wall_time for s in stats.values()), default=0)
+        return {
+            str(node_id): {
+                **s.to_dict(),
+                "heat": s.wall_time / busiest if busiest > 0 else 0,
+            }
+            for node_id, s in stats.items()
+        }
+
+    def report(self, top=10) -> str:
+        stats = sorted(
+            self.get_stats().items(), key=lambda item: item[1].wall_time, reverse=True
+        )
+        lines = ["node        calls  wall(s)   cpu(s)  wait(s)  max(ms)  exc"]
+        for node_id, s in stats[:top]:
+            lines.append(
+                f"{node_id:<10} {s.calls:>6} {s.wall_time:>8.3f} {s.cpu_time:>8.3f} "
+                f"{s.queue_wait:>8.3f} {s.max_wall_time * 1000:>8.1f} {s.exceptions:>4}"
+            )
+        return "\n".join(lines)
+
+    def _get_spans(self) -> list[_Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def export_chrome_trace(self, path: str):
+        """
+        Writes the spans in the Chrome trace event format. Open it with chrome://tracing or https://ui.perfetto.dev.
+        Async tasks are put on their own track because they interleave on the event loop thread.
+        """
+        pid = os.getpid()
+        events = []
+        for span in self._get_spans():
+            events.append(
+                {
+                    "name": span.node_name,
+                    "cat": span.kind,
+                    "ph": "X",
+                    "ts": (span.start - self._origin) * 1e6,
+                    "dur": (span.end - span.start) * 1e6,
+                    "pid": pid,
+                    "tid": "async" if span.kind == "async" else span.thread_id,
+                    "args": {"node_id": span.node_id, "failed": span.failed},
+                }
+            )
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_speedscope(self, path: str):
+        """
+        Writes the spans as a speedscope evented profile (https://www.speedscope.app), one profile per thread.
+        Spans of a thread are nested because a node run directly runs inside the node that pushed to it. Async spans
+        are not nested, so they are left out.
+        """
+        frames: list[dict] = []
+        frame_index: dict[str, int] = {}
+        by_thread: dict[int, list[_Span]] = {}
+        for span in self._get_spans():
+            if span.kind == "async":
+                continue
+            if span.node_name not in frame_index:
+                frame_index[span.node_name] = len(frames)
+                frames.append({"name": span.node_name})
+            by_thread.setdefault(span.thread_id, []).append(span)
+
+        profiles = []
+        for thread_id, spans in by_thread.items():
+            # Spans are recorded when they end, so inner spans come first. Sorting by start (outer first on ties)
+            # restores the nesting order.
+            spans.sort(key=lambda span: (span.start, -span.end))
+            events = []
+            stack: list[_Span] = []
+            for span in spans:
+                while stack and stack[-1].end <= span.start:
+                    closed = stack.pop()
+                    events.append(self._speedscope_event("C", closed, closed.end))
+                if stack and span.end > stack[-1].end:
+                    continue  # overlaps its parent, can't be drawn in a call tree
+                stack.append(span)
+                events.append(self._speedscope_event("O", span, span.start))
+            while stack:
+                closed = stack.pop()
+                events.append(self._speedscope_event("C", closed, closed.end))
+            for event in events:
+                event["frame"] = frame_index[event.pop("name")]
+            profiles.append(
+                {
+                    "type": "evented",
+                    "name": f"thread {thread_id}",
+                    "unit": "microseconds",
+                    "startValue": events[0]["at"],
+                    "endValue": events[-1]["at"],
+                    "events": events,
+                }
+            )
+
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "$schema": "https://www.speedscope.app/file-format-schema.json",
+                    "shared": {"frames": frames},
+                    "profiles": profiles,
+                    "name": "Grapycal nodes",
+                    "exporter": "grapycal",
+                },
+                f,
+            )
+
+    def _speedscope_event(self, type: str, span: _Span, t: float) -> dict:
+        return {"type": type, "name": span.node_name, "at": (t - self._origin) * 1e6}
+
+
+node_profiler = NodeProfiler()
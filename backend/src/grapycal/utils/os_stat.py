@@ -1,18 +1,49 @@
+import logging
 import os
+import threading
+import time
+from typing import Callable
+
 import psutil
 from grapycal.extension_api.utils import has_lib_checker
 
+logger = logging.getLogger(__name__)
+
 
 class OSStat:
+    """
+    Samples the RAM, CPU and GPU memory usage of the machine and this process, and the CPU usage of named threads.
+
+    Static values (total RAM, CPU count, GPU total memory) are read once. start() samples in a background thread, so
+    the psutil and torch calls don't run on the UI event loop.
+    """
+
     def __init__(self):
         self.process = psutil.Process(os.getpid())
+        self._ram_total = psutil.virtual_memory().total
+        self._cpu_count = psutil.cpu_count() or 1
+        self._gpu_total: int | None = None
+        self._gpu_checked = False
+        self._threads: dict[str, int] = {}  # name -> native thread id
+        self._thread_times: dict[int, float] = {}
+        self._last_sample_time: float | None = None
+        self._stop_event = threading.Event()
+
+    def register_thread(self, name: str, native_id: int | None = None):
+        """
+        Reports the CPU usage of a thread under the given name. native_id defaults to the calling thread.
+        """
+        if native_id is None:
+            native_id = threading.get_native_id()
+        self._threads[name] = native_id
 
     def get_os_stat(self):
-        ram_total = psutil.virtual_memory().total
+        virtual_memory = psutil.virtual_memory()
+        ram_total = self._ram_total
         ram_this = self.process.memory_info().rss
-        ram_used = psutil.virtual_memory().used
+        ram_used = virtual_memory.used
 
-        cpu_this = self.process.cpu_percent() / psutil.cpu_count()
+        cpu_this = self.process.cpu_percent() / self._cpu_count
         cpu_used = psutil.cpu_percent()
 
         res = {
@@ -32,20 +63,82 @@ class OSStat:
             },
         }
 
-        if has_lib_checker.has_lib("torch"):
+        threads = self._get_thread_cpu()
+        if threads:
+            res["threads"] = threads
+
+        gpu_total = self._get_gpu_total()
+        if gpu_total is not None:
             import torch
 
+            gpu_this = torch.cuda.memory_allocated()
+            free, total = torch.cuda.mem_get_info()
+            gpu_used = total - free
+
+            res["gpu_mem"] = {
+                "total": gpu_total,
+                "this": gpu_this,
+                "used": gpu_used,
+                "other": gpu_used - gpu_this,  # "other" means "other process"
+                "remain": gpu_total - gpu_used,
+            }
+
+        return res
+
+    def _get_gpu_total(self) -> int | None:
+        # Only check after torch is imported by someone else, so sampling doesn't import torch.
+        if not self._gpu_checked and has_lib_checker.imported("torch"):
+            import torch
+
+            self._gpu_checked = True
             if torch.cuda.is_available():
-                gpu_this = torch.cuda.memory_allocated()
-                gpu_used = torch.cuda.mem_get_info()[1] - torch.cuda.mem_get_info()[0]
-                gpu_total = torch.cuda.get_device_properties(0).total_memory
-
-                res["gpu_mem"] = {
-                    "total": gpu_total,
-                    "this": gpu_this,
-                    "used": gpu_used,
-                    "other": gpu_used - gpu_this,  # "other" means "other process"
-                    "remain": gpu_total - gpu_used,
-                }
+                self._gpu_total = torch.cuda.get_device_properties(0).total_memory
+        return self._gpu_total
+
+    def _get_thread_cpu(self) -> dict[str, float]:
+        """
+        Returns the CPU usage (percent of one core) of each registered thread since the last call.
+        """
+        if len(self._threads) == 0:
+            return {}
+        now = time.perf_counter()
+        try:
+            times = {t.id: t.user_time + t.system_time for t in self.process.threads()}
+        except psutil.Error:
+            return {}
 
+        res = {}
+        if self._last_sample_time is not None:
+            elapsed = now - self._last_sample_time
+            for name, native_id in self._threads.items():
+                if native_id in times and native_id in self._thread_times:
+                    used = times[native_id] - self._thread_times[native_id]
+                    res[name] = 100 * used / elapsed if elapsed > 0 else 0
+        self._thread_times = times
+        self._last_sample_time = now
         return res
+
+    def start(
+        self,
+        callback: Callable[[dict], None],
+        get_interval: Callable[[], float],
+        should_sample: Callable[[], bool] = lambda: True,
+    ):
+        """
+        Samples in a background thread and passes the result to callback, which is called in that thread.
+        get_interval is called before each sample so the rate can be changed at runtime. When should_sample returns
+        False (e.g. no client is watching), the sample is skipped.
+        """
+
+        def loop():
+            while not self._stop_event.wait(max(get_interval(), 0.1)):
+                try:
+                    if should_sample():
+                        callback(self.get_os_stat())
+                except Exception:
+                    logger.warning("Failed to sample OS stat", exc_info=True)
+
+        threading.Thread(target=loop, daemon=True, name="os_stat").start()
+
+    def stop(self):
+        self._stop_event.set()
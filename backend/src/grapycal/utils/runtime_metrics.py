@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable
+
+from grapycal.core.background_runner import BackgroundRunner
+from grapycal.stores import main_store
+
+logger = logging.getLogger(__name__)
+
+
+class RuntimeMetrics:
+    """
+    Collects metrics of the running workspace: the background runner's queue, stack, throughput and latency, the lag
+    of the UI event loop, the sizes of websocket send queues and the number of nodes of each extension.
+
+    The workspace publishes collect() on the metrics topic, and the /metrics route serves it in the Prometheus text
+    format with to_prometheus().
+    """
+
+    LOOP_LAG_INTERVAL = 0.25
+    LOOP_LAG_WINDOW = 40  # samples, 10 seconds
+
+    def __init__(self):
+        self._loop_lags: deque[float] = deque([0.0], maxlen=self.LOOP_LAG_WINDOW)
+        self._last_tasks_done: int | None = None
+        self._last_update = time.perf_counter()
+        self._tasks_per_second = 0.0
+        self._send_queues: dict[str, Callable[[], int]] = {}
+
+    def add_send_queue(self, name: str, get_size: Callable[[], int]):
+        """
+        Registers a queue of outgoing websocket messages to report its size.
+        """
+        self._send_queues[name] = get_size
+
+    async def probe_loop_lag(self):
+        """
+        Measures how late the event loop wakes up a sleeping task. Runs forever.
+        """
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.LOOP_LAG_INTERVAL)
+            lag = max(time.perf_counter() - start - self.LOOP_LAG_INTERVAL, 0)
+            self._loop_lags.append(lag)
+
+    def update(self):
+        """
+        Updates the throughput. Called periodically by the workspace.
+        """
+        now = time.perf_counter()
+        tasks_done = self._get_runner_metrics()["tasks_done"]
+        if self._last_tasks_done is not None and now > self._last_update:
+            self._tasks_per_second = (tasks_done - self._last_tasks_done) / (
+                now - self._last_update
+            )
+        self._last_tasks_done = tasks_done
+        self._last_update = now
+
+    def collect(self) -> dict:
+        send_queues = {}
+        for name, get_size in self._send_queues.items():
+            try:
+                send_queues[name] = get_size()
+            except Exception:
+                logger.debug(f"Cannot get the size of send queue {name}", exc_info=True)
+
+        return {
+            "runner": {
+                **self._get_runner_metrics(),
+                "tasks_per_second": self._tasks_per_second,
+            },
+            "event_loop": {
+                "lag": self._loop_lags[-1],
+                "max_lag": max(self._loop_lags),
+            },
+            "send_queues": send_queues,
+            "nodes": self._count_nodes(),
+        }
+
+    def _get_runner_metrics(self) -> dict:
+        runner = getattr(main_store, "runner", None)
+        if runner is None:  # the workspace is not set up yet
+            return BackgroundRunner.get_empty_metrics()
+        return runner.get_metrics()
+
+    def _count_nodes(self) -> dict[str, int]:
+        from grapycal.sobjects.node import Node
+
+        counts: dict[str, int] = {}
+        editor = getattr(main_store, "main_editor", None)
+        if editor is None:
+            return counts
+        for node in editor.get_children_of_type(Node):
+            extension_name = node.get_type_name().split(".")[0]
+            counts[extension_name] = counts.get(extension_name, 0) + 1
+        return counts
+
+    def to_prometheus(self, metrics: dict) -> str:
+        runner = metrics["runner"]
+        lines: list[str] = []
+
+        def add(name: str, type: str, help: str, samples: list[tuple[str, float]]):
+            lines.append(f"# HELP grapycal_{name} {help}")
+            lines.append(f"# TYPE grapycal_{name} {type}")
+            for labels, value in samples:
+                lines.append(f"grapycal_{name}{labels} {float(value)}")
+
+        add(
+            "runner_queue_depth",
+            "gauge",
+            "Tasks waiting in the runner queue.",
+            [("", runner["queue_depth"])],
+        )
+        add(
+            "runner_stack_depth",
+            "gauge",
+            "Tasks waiting in the runner stack.",
+            [("", runner["stack_depth"])],
+        )
+        add(
+            "runner_tasks_total",
+            "counter",
+            "Tasks run by the runner.",
+            [("", runner["tasks_done"])],
+        )
+        add(
+            "runner_tasks_per_second",
+            "gauge",
+            "Tasks run by the runner per second.",
+            [("", runner["tasks_per_second"])],
+        )
+        add(
+            "runner_task_latency_seconds",
+            "gauge",
+            "Time tasks waited before running, over the last tasks.",
+            [
+                ('{quantile="0.5"}', runner["latency_p50"]),
+                ('{quantile="0.99"}', runner["latency_p99"]),
+            ],
+        )
+        add(
+            "runner_task_duration_seconds",
+            "gauge",
+            "Run time of tasks, over the last tasks.",
+            [
+                ('{quantile="0.5"}', runner["duration_p50"]),
+                ('{quantile="0.99"}', runner["duration_p99"]),
+            ],
+        )
+        add(
+            "event_loop_lag_seconds",
+            "gauge",
+            "Delay of the UI event loop waking up a task.",
+            [("", metrics["event_loop"]["lag"])],
+        )
+        add(
+            "event_loop_max_lag_seconds",
+            "gauge",
+            "Maximum delay of the UI event loop in the last 10 seconds.",
+            [("", metrics["event_loop"]["max_lag"])],
+        )
+        add(
+            "send_queue_size",
+            "gauge",
+            "Messages waiting to be sent to clients.",
+            [
+                (f'{{queue="{name}"}}', size)
+                for name, size in metrics["send_queues"].items()
+            ],
+        )
+        add(
+            "nodes",
+            "gauge",
+            "Nodes in the workspace by extension.",
+            [(f'{{extension="{name}"}}', n) for name, n in metrics["nodes"].items()],
+        )
+        return "\n".join(lines) + "\n"
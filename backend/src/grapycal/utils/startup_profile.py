@@ -0,0 +1,76 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """
+    Records when each startup phase finishes, measured from the start of the process.
+
+    Marks are always recorded because they are cheap. With the --profile-startup command line flag, the summary is
+    printed when the first client connects, and the main thread is profiled with cProfile until the workspace is
+    loaded. The cProfile output is saved to startup.prof, which can be viewed with snakeviz or pstats.
+    """
+
+    def __init__(self):
+        try:
+            self._process_start = psutil.Process().create_time()
+        except psutil.Error:
+            self._process_start = time.time()
+        self._marks: list[tuple[str, float]] = []
+        self._profiler: cProfile.Profile | None = None
+        self.enabled = False
+        self._finished = False
+
+    def enable(self):
+        self.enabled = True
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def mark(self, phase: str):
+        if self._finished:
+            return
+        self._marks.append((phase, time.time() - self._process_start))
+
+    def stop_profiler(self, output_path="startup.prof"):
+        """
+        Stop the cProfile profiler. Must be called from the thread that called enable().
+        """
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        self._profiler.dump_stats(output_path)
+        stream = io.StringIO()
+        pstats.Stats(self._profiler, stream=stream).sort_stats(
+            "cumulative"
+        ).print_stats(25)
+        self._profiler = None
+        logger.info(f"Startup profile saved to {output_path}\n{stream.getvalue()}")
+
+    def finish(self, phase: str):
+        """
+        Mark the last phase and print the summary.
+        """
+        if self._finished:
+            return
+        self.mark(phase)
+        self._finished = True
+        log = logger.info if self.enabled else logger.debug
+        log(self.summary())
+
+    def summary(self) -> str:
+        lines = ["Startup phases (seconds since process start):"]
+        last = 0.0
+        for phase, t in self._marks:
+            lines.append(f"  {t:7.3f}  (+{t - last:.3f})  {phase}")
+            last = t
+        return "\n".join(lines)
+
+
+startup_profile = StartupProfile()
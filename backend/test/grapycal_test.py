@@ -1,4 +1,4 @@
-from grapycal import Node,IntTopic
+from grapycal import Node,IntTopic,func,param
 from objectsync import StringTopic
 
 class Test1Node(Node):
@@ -8,4 +8,73 @@ class Test1Node(Node):
         self.add_out_port('out')
         self.int_topic = self.add_attribute('some_int_topic',IntTopic)
         self.string_topic = self.add_attribute('some_string_topic',StringTopic)
-        
\ No newline at end of file
+        
+class AddOneNode(Node):
+    category = 'test'
+    def build_node(self):
+        self.add_in_port('in', 1)
+        self.out_port = self.add_out_port('out')
+
+    def edge_activated(self, edge, port):
+        value = edge.get()
+        self.run(lambda: self.out_port.push(value + 1))
+
+class SumStepsNode(Node):
+    '''
+    Sums range(n) in a task that returns a generator, one step per item, and pushes the sum.
+    '''
+    category = 'test'
+    def build_node(self):
+        self.add_in_port('in', 1)
+        self.out_port = self.add_out_port('out')
+
+    def edge_activated(self, edge, port):
+        self.run(self.task, n=edge.get())
+
+    def task(self, n):
+        total = 0
+        for i in range(n):
+            total += i
+            yield
+        self.out_port.push(total)
+
+class CollectNode(Node):
+    '''
+    Records the values it receives, each in a task.
+    '''
+    category = 'test'
+    def build_node(self):
+        self.add_in_port('in')
+
+    def init_node(self):
+        self.values = []
+
+    def edge_activated(self, edge, port):
+        value = edge.get()
+        self.run(lambda: self.values.append(value))
+
+class AddFuncNode(Node):
+    '''
+    Adds a and b with a @func, and counts how many times it ran.
+    '''
+    category = 'test'
+
+    def init_node(self):
+        self.calls = 0
+
+    @param()
+    def params(self, scale: int = 1):
+        self.scale = scale
+
+    @func()
+    def add(self, a: int, b: int = 2) -> int:
+        self.calls += 1
+        return (a + b) * self.scale
+
+class CachedAddNode(AddFuncNode):
+    category = 'test'
+
+    @func(cache=True)
+    def add(self, a: int, b: int = 2) -> int:
+        self.calls += 1
+        return (a + b) * self.scale
@@ -0,0 +1,147 @@
+import os
+
+import numpy as np
+import pytest
+from grapycal_builtin.container.accumulator import Accumulator
+
+try:
+    import torch
+
+    HAS_TORCH = True
+except ImportError:
+    HAS_TORCH = False
+
+
+def fill(accumulator: Accumulator, items) -> Accumulator:
+    for item in items:
+        accumulator.append(item)
+    return accumulator
+
+
+def test_list_storage():
+    accumulator = fill(Accumulator(), ["a", 1, None])
+
+    assert accumulator.get() == ["a", 1, None]
+    assert len(accumulator) == 3
+
+
+def test_array_grows_by_doubling():
+    accumulator = fill(Accumulator(use_array=True), range(100))
+
+    result = accumulator.get()
+    assert isinstance(result, np.ndarray)
+    np.testing.assert_array_equal(result, np.arange(100))
+    assert len(accumulator._buffer) == 128
+
+
+def test_arrays_are_stacked():
+    items = [np.full((2, 3), i, dtype=np.float32) for i in range(20)]
+    accumulator = fill(Accumulator(use_array=True), items)
+
+    result = accumulator.get()
+    assert result.shape == (20, 2, 3)
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, np.stack(items))
+
+
+@pytest.mark.parametrize("use_array", [False, True])
+def test_max_length_keeps_last_items(use_array):
+    accumulator = fill(Accumulator(use_array=use_array, max_length=5), range(12))
+
+    assert list(accumulator.get()) == [7, 8, 9, 10, 11]
+    assert len(accumulator) == 5
+
+
+def test_ring_buffer_does_not_grow():
+    accumulator = fill(Accumulator(use_array=True, max_length=40), range(100))
+
+    assert len(accumulator._buffer) == 40
+    np.testing.assert_array_equal(accumulator.get(), np.arange(60, 100))
+
+
+def test_dtype_is_promoted():
+    accumulator = fill(Accumulator(use_array=True), [1, 2, 2.5])
+
+    result = accumulator.get()
+    assert result.dtype.kind == "f"
+    np.testing.assert_array_equal(result, [1, 2, 2.5])
+
+
+def test_dtype_is_promoted_in_wrapped_ring_buffer():
+    accumulator = fill(Accumulator(use_array=True, max_length=4), range(6))
+    accumulator.append(0.5)
+
+    np.testing.assert_array_equal(accumulator.get(), [3, 4, 5, 0.5])
+
+
+@pytest.mark.parametrize(
+    "items",
+    [
+        [np.zeros(2), np.zeros(3)],  # different shapes
+        [1, "a"],  # not numeric
+        ["a", 1],
+    ],
+)
+def test_falls_back_to_list(items):
+    accumulator = fill(Accumulator(use_array=True, max_length=10), items)
+
+    result = accumulator.get()
+    assert isinstance(result, list)
+    assert len(result) == 2
+
+
+def test_get_returns_a_copy():
+    accumulator = fill(Accumulator(use_array=True, max_length=4), range(3))
+    before = accumulator.get()
+
+    fill(accumulator, range(10, 20))
+
+    np.testing.assert_array_equal(before, [0, 1, 2])
+    np.testing.assert_array_equal(accumulator.get(), [16, 17, 18, 19])
+
+    accumulator = fill(Accumulator(), [1])
+    before = accumulator.get()
+    accumulator.append(2)
+    assert before == [1]
+
+
+def test_spill_to_disk():
+    accumulator = fill(Accumulator(use_array=True, spill_to_disk=True), range(40))
+    path = accumulator._file.name
+
+    assert isinstance(accumulator._buffer, np.memmap)
+    assert os.path.exists(path)
+    result = accumulator.get()
+    assert not isinstance(result, np.memmap)
+    np.testing.assert_array_equal(result, np.arange(40))
+
+    # Promoting the dtype rewrites the file
+    accumulator.append(0.5)
+    np.testing.assert_array_equal(accumulator.get(), list(range(40)) + [0.5])
+
+    accumulator.close()
+
+    assert not os.path.exists(path)
+
+
+def test_spill_to_disk_ring_buffer():
+    accumulator = fill(
+        Accumulator(use_array=True, max_length=20, spill_to_disk=True), range(50)
+    )
+
+    np.testing.assert_array_equal(accumulator.get(), np.arange(30, 50))
+    accumulator.close()
+
+
+@pytest.mark.skipif(not HAS_TORCH, reason="torch is not installed")
+def test_torch_tensors():
+    items = [torch.full((2,), float(i), requires_grad=True) for i in range(20)]
+    accumulator = fill(Accumulator(use_array=True, max_length=10), items)
+
+    result = accumulator.get()
+    assert isinstance(result, torch.Tensor)
+    assert not result.requires_grad
+    assert torch.equal(result, torch.stack(items[10:]).detach())
+
+    accumulator.append(torch.zeros(2))
+    assert torch.equal(result, torch.stack(items[10:]).detach())
@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+from grapycal_builtin.data.aggregators import RingBuffer, RunningMoments, TDigest
+
+
+def test_running_moments_matches_numpy():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(1e6, 3, size=10_000)
+    moments = RunningMoments()
+    for batch in np.array_split(samples, 37):
+        moments.add(batch)
+    assert moments.n == len(samples)
+    assert moments.mean == pytest.approx(samples.mean(), rel=1e-12)
+    assert moments.variance == pytest.approx(samples.var(), rel=1e-9)
+
+
+def test_running_moments_remove():
+    rng = np.random.default_rng(1)
+    samples = rng.uniform(-5, 5, size=1000)
+    moments = RunningMoments()
+    moments.add(samples[:600])
+    moments.add(samples[600:])
+    moments.remove(samples[:600])
+    assert moments.n == 400
+    assert moments.mean == pytest.approx(samples[600:].mean(), rel=1e-9)
+    assert moments.variance == pytest.approx(samples[600:].var(), rel=1e-9)
+
+
+def test_running_moments_empty():
+    moments = RunningMoments()
+    assert math.isnan(moments.variance)
+    moments.add(np.array([1.0, 2.0]))
+    moments.remove(np.array([1.0, 2.0]))
+    assert moments.n == 0
+
+
+def test_ring_buffer_evicts_oldest_first():
+    ring = RingBuffer(4)
+    assert ring.extend(np.array([1.0, 2.0, 3.0])).tolist() == []
+    assert ring.extend(np.array([4.0, 5.0])).tolist() == [1.0]
+    assert ring.values().tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert ring.extend(np.arange(6.0, 12.0)).tolist() == [2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    assert ring.values().tolist() == [8.0, 9.0, 10.0, 11.0]
+
+
+@pytest.mark.parametrize("q", [0.001, 0.01, 0.1, 0.5, 0.9, 0.99, 0.999])
+def test_tdigest_quantiles(q):
+    rng = np.random.default_rng(2)
+    samples = rng.normal(size=100_000)
+    digest = TDigest(compression=100)
+    for batch in np.array_split(samples, 100):
+        digest.add(batch)
+    # The error is bounded in rank, and smaller at the tails
+    rank_error = abs(np.mean(samples <= digest.quantile(q)) - q)
+    assert rank_error < 0.01 * min(1, 10 * q * (1 - q) + 0.1)
+
+
+def test_tdigest_centroid_count_is_bounded():
+    rng = np.random.default_rng(3)
+    digest = TDigest(compression=100)
+    for _ in range(50):
+        digest.add(rng.exponential(size=2000))
+    digest.quantile(0.5)
+    assert digest.n == 100_000
+    assert len(digest.weights) <= 100
+    assert digest.weights.sum() == 100_000
+
+
+def test_tdigest_k1_size_bound():
+    # Each centroid spans at most one unit of the k1 scale, except single samples
+    rng = np.random.default_rng(4)
+    digest = TDigest(compression=50)
+    digest.add(rng.uniform(size=20_000))
+    digest.quantile(0.5)
+    q_right = np.cumsum(digest.weights) / digest.weights.sum()
+    q_left = q_right - digest.weights / digest.weights.sum()
+
+    def k(q):
+        return 50 / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+
+    spans = k(q_right) - k(q_left)
+    assert np.all((spans <= 1 + 1e-9) | (digest.weights == 1))
+
+
+def test_tdigest_extremes_and_empty():
+    digest = TDigest()
+    assert math.isnan(digest.quantile(0.5))
+    digest.add(np.array([3.0, -2.0, 7.0]))
+    assert digest.quantile(0) == -2.0
+    assert digest.quantile(1) == 7.0
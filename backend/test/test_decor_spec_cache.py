@@ -0,0 +1,95 @@
+from grapycal import Node, func, param
+from grapycal.extension_api.node_def import NodeFuncSpec
+
+
+class CachedNode(Node):
+    @param()
+    def mode(self, scale: int = 1) -> None:
+        self.scale = scale
+
+    @func()
+    def add(self, a: int, b: int = 2) -> int:
+        return (a + b) * self.scale
+
+
+def extra_func(x: float = 0.5) -> float:
+    return x
+
+
+def get_trait(*extra_funcs: NodeFuncSpec):
+    (trait,) = CachedNode._decor_spec_cache.get_traits(list(extra_funcs))
+    return trait
+
+
+def test_nodes_of_a_type_share_the_spec():
+    CachedNode._decor_spec_cache.clear()
+    first = get_trait()
+    hits = CachedNode._decor_spec_cache.hits
+    second = get_trait()
+
+    assert CachedNode._decor_spec_cache.hits == hits + 1
+    assert second.inputs is first.inputs
+    assert second.node_params is first.node_params
+    # NodeFunc is per node, as its spec may be bound to the node
+    assert second.node_funcs is not first.node_funcs
+    assert list(second.inputs) == ["a", "b"]
+    assert second.inputs["b"].default == 2
+    assert list(second.params) == ["scale"]
+
+
+def test_extra_funcs_do_not_change_the_shared_spec():
+    CachedNode._decor_spec_cache.clear()
+    plain = get_trait()
+
+    extended = get_trait(NodeFuncSpec(extra_func))
+
+    assert "x" in extended.inputs
+    assert "extra_func" in extended.node_funcs
+    # The class-level info and the spec of nodes without the extra func are as before
+    assert "extra_func" not in CachedNode._node_def_info.funcs
+    assert list(plain.inputs) == ["a", "b"]
+    assert list(get_trait().inputs) == ["a", "b"]
+
+
+def test_specs_created_per_node_are_keyed_by_content():
+    cache = CachedNode._decor_spec_cache
+    cache.clear()
+
+    # define_funcs() usually creates new specs on every call
+    get_trait(NodeFuncSpec(extra_func))
+    misses = cache.misses
+    trait = get_trait(NodeFuncSpec(extra_func))
+
+    assert cache.misses == misses
+    assert trait.inputs["x"].default == 0.5
+
+    trait = get_trait(NodeFuncSpec(extra_func, default_override={"x": 1.5}))
+
+    assert cache.misses == misses + 1
+    assert trait.inputs["x"].default == 1.5
+
+
+def test_bound_methods_share_an_entry():
+    class Holder:
+        def f(self, y: str) -> str:
+            return y
+
+    cache = CachedNode._decor_spec_cache
+    cache.clear()
+
+    get_trait(NodeFuncSpec(Holder().f))
+    misses = cache.misses
+    trait = get_trait(NodeFuncSpec(Holder().f))
+
+    assert cache.misses == misses
+    assert "y" in trait.inputs
+
+
+def test_cache_size_is_bounded():
+    cache = CachedNode._decor_spec_cache
+    cache.clear()
+
+    for i in range(cache.MAX_SIZE + 5):
+        get_trait(NodeFuncSpec(extra_func, default_override={"x": float(i)}))
+
+    assert len(cache._entries) == cache.MAX_SIZE
@@ -0,0 +1,102 @@
+from utils import main_editor, run_tasks, setup_workspace
+
+
+def create_add(editor):
+    """
+    Creates an AddFuncNode with a source connected to each input and a collector on its output.
+    """
+    node = editor.create_node("grapycal_test.AddFuncNode")
+    sources = {}
+    edges = {}
+    for name in ["a", "b"]:
+        sources[name] = editor.create_node("grapycal_test.Test1Node")
+        edges[name] = editor.create_edge(
+            sources[name].get_out_port("out"), node.get_in_port(f"_decor.in.{name}")
+        )
+    collector = editor.create_node("grapycal_test.CollectNode")
+    editor.create_edge(node.get_out_port("_decor.out.add"), collector.get_in_port("in"))
+    return node, sources, edges, collector
+
+
+def push(source, value):
+    source.get_out_port("out").push(value)
+    run_tasks()
+
+
+def test_func_runs_when_all_inputs_are_ready(setup_workspace, main_editor):
+    node, sources, _, collector = create_add(main_editor)
+    trait = node.traits["_decor"]
+    a, b = node.get_in_port("_decor.in.a"), node.get_in_port("_decor.in.b")
+
+    # Ports whose edges changed are updated on the next activation
+    assert {a, b} <= trait._dirty
+
+    push(sources["a"], 1)
+
+    assert trait._dirty == set()
+    assert trait._ready == {a: True, b: False}
+    assert trait._n_not_ready["add"] == 1
+    assert collector.values == []
+
+    push(sources["b"], 10)
+
+    assert collector.values == [11]
+    # The inputs were taken by the run
+    assert trait._ready == {a: False, b: False}
+    assert trait._n_not_ready["add"] == 2
+
+
+def test_repeated_activation_of_one_input(setup_workspace, main_editor):
+    node, sources, _, collector = create_add(main_editor)
+    trait = node.traits["_decor"]
+
+    push(sources["a"], 1)
+    push(sources["a"], 2)
+
+    assert trait._n_not_ready["add"] == 1
+    assert collector.values == []
+
+    push(sources["b"], 10)
+
+    assert collector.values == [12]
+    assert node.calls == 1
+
+
+def test_removed_edge_falls_back_to_default(setup_workspace, main_editor):
+    node, sources, edges, collector = create_add(main_editor)
+    trait = node.traits["_decor"]
+    b = node.get_in_port("_decor.in.b")
+    push(sources["a"], 1)
+
+    main_editor._delete([edges["b"].get_id()])
+
+    assert b in trait._dirty
+    assert trait._n_not_ready["add"] == 1  # not updated until the next activation
+
+    push(sources["a"], 5)
+
+    # b uses its control now, which holds the default value
+    assert collector.values == [7]
+    assert trait._ready[b] is True
+    assert trait._n_not_ready["add"] == 1
+
+
+def test_added_edge_replaces_default(setup_workspace, main_editor):
+    node, sources, edges, collector = create_add(main_editor)
+    trait = node.traits["_decor"]
+    main_editor._delete([edges["b"].get_id()])
+    push(sources["a"], 1)
+    assert collector.values == [3]
+
+    main_editor.create_edge(
+        sources["b"].get_out_port("out"), node.get_in_port("_decor.in.b")
+    )
+    push(sources["a"], 1)
+
+    # b waits for data on the new edge
+    assert collector.values == [3]
+    assert trait._n_not_ready["add"] == 1
+
+    push(sources["b"], 10)
+
+    assert collector.values == [3, 11]
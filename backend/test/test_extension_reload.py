@@ -0,0 +1,186 @@
+import os
+import sys
+import textwrap
+
+import pytest
+from grapycal import Node
+from grapycal.extension.extension import get_build_spec, patch_class, reload_modules
+from utils import main_editor, setup_workspace
+
+
+def define(source: str, name: str, module: str = "grapycal_fake.nodes", **namespace):
+    """
+    Runs the source like a module and returns the class it defines, as if the module were loaded again.
+    """
+    namespace = {"__name__": module, "Node": Node, **namespace}
+    exec(compile(textwrap.dedent(source), module, "exec"), namespace)
+    return namespace[name]
+
+
+class Base:
+    def who(self):
+        return "base"
+
+
+def test_patch_class_updates_existing_instances():
+    old = define(
+        """
+        class A(Base):
+            def f(self):
+                return 1
+            def removed(self):
+                return 1
+            def who(self):
+                return "old " + super().who()
+        """,
+        "A",
+        Base=Base,
+    )
+    new = define(
+        """
+        class A(Base):
+            def f(self):
+                return 2
+            def added(self):
+                return 3
+            def who(self):
+                return "new " + super().who()
+        """,
+        "A",
+        Base=Base,
+    )
+    instance = old()
+    old_f, old_removed = old.f, old.removed
+
+    replaced = patch_class(old, new)
+
+    assert instance.f() == 2
+    assert instance.added() == 3
+    assert not hasattr(instance, "removed")
+    # super() in the copied method refers to the patched class
+    assert instance.who() == "new base"
+    assert set(replaced) >= {old_f, old_removed}
+
+
+def test_patch_class_keeps_moved_functions():
+    source = """
+        class A:
+            def f(self):
+                return 1
+    """
+    old = define(source, "A")
+    # Only the line numbers change
+    new = define("\n\n\n" + source, "A")
+    old_f = old.f
+
+    assert old_f not in patch_class(old, new)
+
+
+def test_build_spec_follows_build_code():
+    source = """
+        class ANode(Node):
+            def build_node(self):
+                self.add_in_port("a")
+                self.add_ports()
+
+            def add_ports(self):
+                self.add_out_port("{port}")
+
+            def task(self):
+                return {value}
+    """
+    spec = get_build_spec(define(source.format(port="x", value=1), "ANode"))
+
+    # Code that doesn't build the node can change
+    assert get_build_spec(define(source.format(port="x", value=2), "ANode")) == spec
+    # A helper called while building can't
+    assert get_build_spec(define(source.format(port="y", value=1), "ANode")) != spec
+
+
+@pytest.fixture
+def package(tmp_path):
+    """
+    An importable package, grapycal_reload_test, with the modules a and b. b imports from a.
+    """
+    root = tmp_path / "grapycal_reload_test"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "a.py").write_text("def f():\n    return 1\n")
+    (root / "b.py").write_text("from .a import f\n\ndef g():\n    return f() + 10\n")
+    sys.path.insert(0, str(tmp_path))
+    yield root
+    sys.path.remove(str(tmp_path))
+    for name in list(sys.modules):
+        if name.split(".")[0] == "grapycal_reload_test":
+            del sys.modules[name]
+
+
+def write(path, source: str):
+    path.write_text(source)
+    # Make sure the new source is not taken for the cached bytecode
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_modules_in_dependency_order(package):
+    from grapycal_reload_test import b
+
+    write(package / "a.py", "def f():\n    return 2\n")
+    reload_modules(["grapycal_reload_test.b", "grapycal_reload_test.a"])
+
+    assert b.g() == 12
+
+
+def test_failed_reload_restores_modules(package):
+    from grapycal_reload_test import a, b
+
+    old_f, old_g = a.f, b.g
+    write(package / "a.py", "def f():\n    return 2\n")
+    write(package / "b.py", "from .a import f\n\ndef g(:\n")
+
+    with pytest.raises(SyntaxError):
+        reload_modules(["grapycal_reload_test.a", "grapycal_reload_test.b"])
+
+    # Both keep running the old code, even a, which reloaded successfully
+    assert a.f is old_f
+    assert b.g is old_g
+    assert b.g() == 11
+
+
+NODES_SOURCE = """
+from grapycal import Node
+
+class ReloadTestNode(Node):
+    category = "test"
+
+    def build_node(self):
+        self.add_in_port("in")
+{extra_ports}
+    def init_node(self):
+        self.state = []
+"""
+
+
+def test_changed_build_spec_rebuilds_nodes(package, setup_workspace, main_editor):
+    (package / "__init__.py").write_text("from .nodes import ReloadTestNode\n")
+    (package / "nodes.py").write_text(NODES_SOURCE.format(extra_ports=""))
+    setup_workspace._extention_manager.import_extension("grapycal_reload_test")
+    node = main_editor.create_node("grapycal_reload_test.ReloadTestNode")
+    source = main_editor.create_node("grapycal_test.Test1Node")
+    main_editor.create_edge(source.get_out_port("out"), node.get_in_port("in"))
+
+    write(
+        package / "nodes.py",
+        NODES_SOURCE.format(extra_ports='        self.add_out_port("out")\n'),
+    )
+    setup_workspace._extention_manager.update_extension("grapycal_reload_test")
+
+    # The node is serialized and restored with the new ports, and keeps its edge
+    assert node.is_destroyed()
+    (restored,) = [
+        child
+        for child in main_editor.get_children()
+        if child.get_type_name() == "grapycal_reload_test.ReloadTestNode"
+    ]
+    assert restored.get_out_port("out") is not None
+    assert len(restored.get_in_port("in").edges) == 1
@@ -0,0 +1,136 @@
+import pytest
+from grapycal.extension_api.func_cache import (
+    CacheConfig,
+    FuncCache,
+    UnhashableInput,
+    hash_value,
+)
+from utils import main_editor, run_tasks, setup_workspace
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import torch
+
+    HAS_TORCH = True
+except ImportError:
+    HAS_TORCH = False
+
+
+def test_hit_and_miss_counters():
+    cache = FuncCache(CacheConfig())
+    key = cache.make_key({"a": 1, "b": "x"})
+
+    assert cache.get(key) == (False, None)
+    cache.put(key, 3)
+    assert cache.get(cache.make_key({"a": 1, "b": "x"})) == (True, 3)
+    assert cache.get(cache.make_key({"a": 2, "b": "x"})) == (False, None)
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.get_stats_text().startswith("1 hits, 2 misses, 1 entries")
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = FuncCache(CacheConfig(max_size=2))
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="numpy is not installed")
+def test_evicts_by_bytes():
+    array = np.zeros(1000, dtype=np.uint8)
+    cache = FuncCache(CacheConfig(max_bytes=2500))
+    for key in "abc":
+        cache.put(key, array)
+
+    assert len(cache) == 2
+    assert cache.n_bytes == 2000
+    assert cache.get("a") == (False, None)
+
+    # A result larger than the whole cache is not stored and doesn't evict others
+    cache.put("d", np.zeros(3000, dtype=np.uint8))
+
+    assert len(cache) == 2
+    assert cache.get("d") == (False, None)
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.n_bytes == 0
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="numpy is not installed")
+def test_numpy_arrays_are_hashed_by_content():
+    array = np.arange(6, dtype=np.float32).reshape(2, 3)
+
+    assert hash_value(array) == hash_value(array.copy())
+    # Non-contiguous views are hashed like their contiguous copies
+    assert hash_value(array.T) == hash_value(np.ascontiguousarray(array.T))
+    assert hash_value(array) != hash_value(array + 1)
+    assert hash_value(array) != hash_value(array.astype(np.float64))
+    assert hash_value(array) != hash_value(array.reshape(3, 2))
+    with pytest.raises(UnhashableInput):
+        hash_value(np.array([object()]))
+
+
+def test_unhashable_inputs_bypass_the_cache():
+    cache = FuncCache(CacheConfig())
+
+    assert cache.make_key({"a": object()}) is None
+    assert cache.make_key({"a": [1, {"b": (2.0, None)}]}) is not None
+
+
+@pytest.mark.skipif(not HAS_TORCH, reason="torch is not installed")
+def test_torch_tensors_are_hashed_by_content():
+    tensor = torch.arange(6, dtype=torch.float32)
+
+    assert hash_value(tensor) == hash_value(tensor.clone())
+    assert hash_value(tensor) != hash_value(tensor + 1)
+    assert hash_value(tensor) != hash_value(tensor.numpy())
+    assert hash_value(tensor.bfloat16()) != hash_value(tensor)
+    with pytest.raises(UnhashableInput):
+        hash_value(tensor.clone().requires_grad_())
+
+
+def test_cached_node_pushes_stored_result(setup_workspace, main_editor):
+    node = main_editor.create_node("grapycal_test.CachedAddNode")
+    source = main_editor.create_node("grapycal_test.Test1Node")
+    main_editor.create_edge(source.get_out_port("out"), node.get_in_port("_decor.in.a"))
+    collector = main_editor.create_node("grapycal_test.CollectNode")
+    main_editor.create_edge(
+        node.get_out_port("_decor.out.add"), collector.get_in_port("in")
+    )
+
+    for value in [1, 1, 2, 1]:
+        source.get_out_port("out").push(value)
+        run_tasks()
+
+    assert collector.values == [3, 3, 4, 3]
+    assert node.calls == 2
+
+    # Params are part of the key
+    node.get_in_port("_decor.param.scale").set_control_value(10)
+    source.get_out_port("out").push(1)
+    run_tasks()
+
+    assert collector.values[-1] == 30
+    assert node.calls == 3
+
+    node.traits["_decor"].cache_enabled.set(False)
+    source.get_out_port("out").push(1)
+    run_tasks()
+
+    assert node.calls == 4
@@ -0,0 +1,122 @@
+import pytest
+from utils import builtin_ext, main_editor, run_tasks, setup_workspace
+
+
+@pytest.fixture(params=[False, True], ids=["scheduled", "inline"])
+def inline(request):
+    return request.param
+
+
+def create_function(editor, body: tuple[str, str, str] | None):
+    """
+    Creates the function f(x) -> y with the body (node type, input port, output port) between x and y. Without a body,
+    x and y are not connected.
+    """
+    func_in = editor.create_node("grapycal_builtin.FuncInNode", name="f")
+    func_out = editor.create_node("grapycal_builtin.FuncOutNode", name="f")
+    if body is not None:
+        node_type, in_port, out_port = body
+        node = editor.create_node(node_type)
+        editor.create_edge(func_in.get_out_port("x"), node.get_in_port(in_port))
+        editor.create_edge(node.get_out_port(out_port), func_out.get_in_port("y"))
+    return func_in, func_out
+
+
+def create_call(editor, inline: bool):
+    """
+    Creates a call to f. Returns the node to push the argument from and the collectors of the outputs.
+    """
+    call = editor.create_node("grapycal_builtin.FuncCallNode", name="f")
+    call.inline.set(inline)
+    source = editor.create_node("grapycal_test.Test1Node")
+    editor.create_edge(source.get_out_port("out"), call.get_in_port("x"))
+    results = {}
+    for port in call.out_ports:
+        results[port.name.get()] = editor.create_node("grapycal_test.CollectNode")
+        editor.create_edge(port, results[port.name.get()].get_in_port("in"))
+    return source, results
+
+
+def call(source, value):
+    source.get_out_port("out").push(value)
+    run_tasks()
+
+
+def errors(node) -> list[str]:
+    return [message for kind, message in node.output_topic.get() if kind == "error"]
+
+
+def test_call_returns_result(builtin_ext, main_editor, inline):
+    create_function(main_editor, ("grapycal_test.AddOneNode", "in", "out"))
+    source, results = create_call(main_editor, inline)
+
+    call(source, 1)
+    call(source, 10)
+
+    assert results["y"].values == [2, 11]
+
+
+def test_two_callers_get_their_own_results(builtin_ext, main_editor, inline):
+    create_function(main_editor, ("grapycal_test.AddOneNode", "in", "out"))
+    source_1, results_1 = create_call(main_editor, inline)
+    source_2, results_2 = create_call(main_editor, inline)
+
+    # Both invocations are in flight before either returns
+    source_1.get_out_port("out").push(1)
+    source_2.get_out_port("out").push(10)
+    run_tasks()
+
+    assert results_1["y"].values == [2]
+    assert results_2["y"].values == [11]
+
+
+def test_generator_in_body(builtin_ext, main_editor, inline):
+    create_function(main_editor, ("grapycal_test.SumStepsNode", "in", "out"))
+    source, results = create_call(main_editor, inline)
+
+    call(source, 4)
+
+    assert results["y"].values == [0 + 1 + 2 + 3]
+
+
+def test_branch_not_firing_reports_missing_output(builtin_ext, main_editor, inline):
+    _, func_out = create_function(
+        main_editor, ("grapycal_builtin.IfNode", "if", "then")
+    )
+    source, results = create_call(main_editor, inline)
+
+    call(source, False)
+
+    assert results["y"].values == []
+    assert any("Output data missing for y" in message for message in errors(func_out))
+
+    # The next invocation is not affected
+    call(source, True)
+
+    assert results["y"].values == [None]
+
+
+def test_unconnected_output_reports_missing_output(builtin_ext, main_editor, inline):
+    _, func_out = create_function(main_editor, None)
+    source, results = create_call(main_editor, inline)
+
+    call(source, 1)
+
+    assert results["y"].values == []
+    assert any("Output data missing for y" in message for message in errors(func_out))
+
+
+def test_output_from_outside_body(builtin_ext, main_editor, inline):
+    _, func_out = create_function(
+        main_editor, ("grapycal_test.AddOneNode", "in", "out")
+    )
+    func_out.ins.insert("z")
+    outside = main_editor.create_node("grapycal_test.Test1Node")
+    main_editor.create_edge(outside.get_out_port("out"), func_out.get_in_port("z"))
+    outside.get_out_port("out").push("outside")
+    source, results = create_call(main_editor, inline)
+
+    call(source, 1)
+
+    assert results["y"].values == [2]
+    assert results["z"].values == ["outside"]
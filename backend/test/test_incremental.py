@@ -0,0 +1,92 @@
+import pytest
+from grapycal.stores import main_store
+from utils import main_editor, run_tasks, setup_workspace
+
+
+@pytest.fixture
+def incremental(setup_workspace):
+    main_store.settings.incremental.set(True)
+
+
+def create_diamond(editor):
+    """
+    Creates left(a=s1) and right(a=s2), both adding their b, and sum(a=left, b=right) with a collector. Returns the
+    nodes by name.
+    """
+    nodes = {}
+    for name in ["left", "right", "sum"]:
+        nodes[name] = editor.create_node("grapycal_test.AddFuncNode")
+    for name, node in [("s1", nodes["left"]), ("s2", nodes["right"])]:
+        nodes[name] = editor.create_node("grapycal_test.Test1Node")
+        editor.create_edge(
+            nodes[name].get_out_port("out"), node.get_in_port("_decor.in.a")
+        )
+    for name, port in [("left", "a"), ("right", "b")]:
+        editor.create_edge(
+            nodes[name].get_out_port("_decor.out.add"),
+            nodes["sum"].get_in_port(f"_decor.in.{port}"),
+        )
+    nodes["collector"] = editor.create_node("grapycal_test.CollectNode")
+    editor.create_edge(
+        nodes["sum"].get_out_port("_decor.out.add"),
+        nodes["collector"].get_in_port("in"),
+    )
+    return nodes
+
+
+def push(source, value):
+    source.get_out_port("out").push(value)
+    run_tasks()
+
+
+def calls(nodes):
+    return {name: nodes[name].calls for name in ["left", "right", "sum"]}
+
+
+def test_new_input_reruns_only_its_branch(incremental, main_editor):
+    nodes = create_diamond(main_editor)
+    push(nodes["s1"], 1)
+    push(nodes["s2"], 1)
+    assert nodes["collector"].values == [(1 + 2) + (1 + 2)]
+
+    push(nodes["s1"], 5)
+
+    # sum reuses the value right last sent it
+    assert nodes["collector"].values[-1] == (5 + 2) + (1 + 2)
+    assert calls(nodes) == {"left": 2, "right": 1, "sum": 2}
+
+
+def test_param_change_reruns_with_last_inputs(incremental, main_editor):
+    nodes = create_diamond(main_editor)
+    push(nodes["s1"], 1)
+    push(nodes["s2"], 1)
+
+    nodes["right"].get_in_port("_decor.param.scale").set_control_value(10)
+    run_tasks()
+
+    assert nodes["collector"].values[-1] == (1 + 2) + (1 + 2) * 10
+    assert calls(nodes) == {"left": 1, "right": 2, "sum": 2}
+
+
+def test_input_control_change_reruns_with_last_inputs(incremental, main_editor):
+    nodes = create_diamond(main_editor)
+    push(nodes["s1"], 1)
+    push(nodes["s2"], 1)
+
+    nodes["left"].get_in_port("_decor.in.b").set_control_value(4)
+    run_tasks()
+
+    assert nodes["collector"].values[-1] == (1 + 4) + (1 + 2)
+    assert calls(nodes) == {"left": 2, "right": 1, "sum": 2}
+
+
+def test_funcs_wait_for_all_inputs_when_off(setup_workspace, main_editor):
+    nodes = create_diamond(main_editor)
+    push(nodes["s1"], 1)
+    push(nodes["s2"], 1)
+
+    push(nodes["s1"], 5)
+
+    assert nodes["collector"].values == [6]
+    assert calls(nodes) == {"left": 2, "right": 1, "sum": 1}
+    assert nodes["left"].traits["_decor"]._last_inputs == {}
@@ -0,0 +1,107 @@
+import contextlib
+import threading
+
+import pytest
+from grapycal.stores import main_store
+from grapycal.utils.IsRunningManager import IsRunningManager
+
+
+class FakeObject:
+    def __init__(self):
+        self.destroyed = False
+
+    def is_destroyed(self):
+        return self.destroyed
+
+
+class FakeTopic(list):
+    def set(self, value):
+        self[:] = value
+
+
+class FakeClock:
+    def add_listener(self, callback, period):
+        pass
+
+    def remove_listener(self, callback):
+        pass
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(
+        main_store,
+        "record",
+        lambda allow_reentry=False: contextlib.nullcontext(),
+        raising=False,
+    )
+    return IsRunningManager(FakeTopic(), FakeClock())
+
+
+def shown(manager):
+    return set(manager._running_nodes_topic)
+
+
+def test_running_object_is_shown_until_stopped(manager):
+    obj = FakeObject()
+
+    manager.set_running(obj, True)
+    manager.check_running_nodes()
+    assert shown(manager) == {obj}
+
+    manager.check_running_nodes()
+    assert shown(manager) == {obj}
+
+    manager.set_running(obj, False)
+    manager.check_running_nodes()
+    assert shown(manager) == set()
+
+
+def test_short_run_flashes_for_two_ticks(manager):
+    obj = FakeObject()
+
+    for _ in range(1000):
+        manager.set_running(obj, True)
+        manager.set_running(obj, False)
+    manager.check_running_nodes()
+    assert shown(manager) == {obj}
+
+    manager.check_running_nodes()
+    assert shown(manager) == {obj}
+
+    manager.check_running_nodes()
+    assert shown(manager) == set()
+
+
+def test_destroyed_objects_are_not_shown(manager):
+    obj = FakeObject()
+
+    manager.set_running(obj, True)
+    obj.destroyed = True
+    manager.check_running_nodes()
+
+    assert shown(manager) == set()
+
+
+def test_set_running_from_many_threads(manager):
+    objects = [FakeObject() for _ in range(8)]
+
+    def run(obj):
+        for _ in range(10_000):
+            manager.set_running(obj, True)
+            manager.set_running(obj, False)
+        manager.set_running(obj, True)
+
+    threads = [threading.Thread(target=run, args=(obj,)) for obj in objects]
+    for thread in threads:
+        thread.start()
+    # Ticks run while the threads are setting states
+    while any(thread.is_alive() for thread in threads):
+        manager.check_running_nodes()
+    for thread in threads:
+        thread.join()
+    manager.check_running_nodes()
+    manager.check_running_nodes()
+
+    # The last state of each object wins
+    assert shown(manager) == set(objects)
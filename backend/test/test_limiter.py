@@ -0,0 +1,101 @@
+import pytest
+
+from grapycal_builtin.procedural.limiterNode import (
+    Debouncer,
+    TokenBucket,
+    TokenBucketGate,
+)
+
+
+def make_bucket(rate, capacity=1, now=0.0):
+    bucket = TokenBucket(rate, capacity)
+    bucket.last_time = now
+    return bucket
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = make_bucket(rate=10, capacity=3)
+    assert [bucket.try_take(0.0) for _ in range(4)] == [True, True, True, False]
+    assert bucket.time_until_token(0.0) == pytest.approx(0.1)
+    assert not bucket.try_take(0.05)
+    assert bucket.try_take(0.1)
+
+
+def test_token_bucket_refill_is_capped():
+    bucket = make_bucket(rate=10, capacity=2)
+    bucket.try_take(0.0)
+    bucket.try_take(0.0)
+    assert [bucket.try_take(100.0) for _ in range(3)] == [True, True, False]
+
+
+def test_token_bucket_capacity_is_at_least_one():
+    bucket = make_bucket(rate=1, capacity=0)
+    assert bucket.try_take(0.0)
+    assert bucket.time_until_token(0.0) == pytest.approx(1)
+
+
+def test_throttle_leading_and_trailing():
+    gate = TokenBucketGate(make_bucket(rate=10), leading=True, trailing=True)
+    assert gate.offer("a", 0.0) == (True, None)
+    push, delay = gate.offer("b", 0.01)
+    assert not push and delay == pytest.approx(0.09)
+    # Only the latest value of the burst is kept, and only one timer is scheduled
+    assert gate.offer("c", 0.02) == (False, None)
+    assert gate.fire(0.1) == (True, "c", None)
+    assert gate.fire(0.2) == (False, None, None)
+
+
+def test_throttle_timer_firing_early_reschedules():
+    gate = TokenBucketGate(make_bucket(rate=10), leading=True, trailing=True)
+    gate.offer("a", 0.0)
+    gate.offer("b", 0.0)
+    push, value, delay = gate.fire(0.099)
+    assert not push and delay == pytest.approx(0.001)
+    assert gate.fire(0.1) == (True, "b", None)
+
+
+def test_throttle_leading_only_drops():
+    gate = TokenBucketGate(make_bucket(rate=10), leading=True, trailing=False)
+    assert gate.offer("a", 0.0) == (True, None)
+    assert gate.offer("b", 0.05) == (False, None)
+    assert gate.offer("c", 0.1) == (True, None)
+
+
+def test_throttle_trailing_only_waits_a_full_interval():
+    gate = TokenBucketGate(make_bucket(rate=10), leading=False, trailing=True)
+    push, delay = gate.offer("a", 0.0)
+    assert not push and delay == pytest.approx(0.1)
+    assert gate.offer("b", 0.05) == (False, None)
+    assert gate.fire(0.1) == (True, "b", None)
+
+
+# The debounce tests use times that are exact in binary, so deadlines compare exactly
+
+
+def test_debounce_trailing():
+    debouncer = Debouncer(0.25, leading=False, trailing=True)
+    assert debouncer.offer("a", 0.0) == (False, 0.25)
+    assert debouncer.offer("b", 0.125) == (False, None)
+    # The deadline moved to 0.375 when "b" arrived
+    assert debouncer.fire(0.25) == (False, None, 0.125)
+    assert debouncer.fire(0.375) == (True, "b", None)
+    # A new burst starts a new timer
+    assert debouncer.offer("c", 1.0) == (False, 0.25)
+
+
+def test_debounce_leading():
+    debouncer = Debouncer(0.25, leading=True, trailing=False)
+    assert debouncer.offer("a", 0.0) == (True, 0.25)
+    assert debouncer.offer("b", 0.125) == (False, None)
+    assert debouncer.fire(0.375) == (False, None, None)
+    assert debouncer.offer("c", 0.5) == (True, 0.25)
+
+
+def test_debounce_leading_and_trailing():
+    debouncer = Debouncer(0.25, leading=True, trailing=True)
+    assert debouncer.offer("a", 0.0) == (True, 0.25)
+    # A burst of one value is not pushed twice
+    assert debouncer.fire(0.25) == (False, None, None)
+    debouncer.offer("b", 1.0)
+    debouncer.offer("c", 1.125)
+    assert debouncer.fire(1.375) == (True, "c", None)
@@ -0,0 +1,91 @@
+from grapycal import run_inline
+from grapycal.stores import main_store
+from utils import builtin_ext, main_editor, setup_workspace
+
+
+def create_chain(editor, *node_types: tuple[str, str, str]):
+    """
+    Creates nodes of the given types (node type, input port, output port), each connected to the next, after a source
+    node and before a CollectNode. Returns the source and the collector.
+    """
+    source = editor.create_node("grapycal_test.Test1Node")
+    tail = source.get_out_port("out")
+    for node_type, in_port, out_port in node_types:
+        node = editor.create_node(node_type)
+        editor.create_edge(tail, node.get_in_port(in_port))
+        tail = node.get_out_port(out_port)
+    collector = editor.create_node("grapycal_test.CollectNode")
+    editor.create_edge(tail, collector.get_in_port("in"))
+    return source, collector
+
+
+def assert_nothing_scheduled():
+    metrics = main_store.runner.get_metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["stack_depth"] == 0
+
+
+def test_for_loop_in_inline_body(builtin_ext, main_editor):
+    source, collector = create_chain(
+        main_editor, ("grapycal_builtin.ForNode", "iterable", "item")
+    )
+
+    run_inline(lambda: source.get_out_port("out").push(range(3)))
+
+    assert collector.values == [0, 1, 2]
+    assert_nothing_scheduled()
+
+
+def test_long_for_loop_in_inline_body_does_not_recurse(builtin_ext, main_editor):
+    source, collector = create_chain(
+        main_editor, ("grapycal_builtin.ForNode", "iterable", "item")
+    )
+
+    run_inline(lambda: source.get_out_port("out").push(range(20_000)))
+
+    assert collector.values == list(range(20_000))
+
+
+def test_generator_task_in_inline_body_is_stepped(setup_workspace, main_editor):
+    source, collector = create_chain(
+        main_editor,
+        ("grapycal_test.SumStepsNode", "in", "out"),
+        ("grapycal_test.AddOneNode", "in", "out"),
+    )
+    log = []
+
+    run_inline(
+        lambda: source.get_out_port("out").push(5),
+        on_done=lambda: log.append(list(collector.values)),
+    )
+
+    # All the steps, and the tasks they schedule, run before on_done
+    assert log == [[0 + 1 + 2 + 3 + 4 + 1]]
+    assert_nothing_scheduled()
+
+
+def test_nested_run_inline_does_not_recurse():
+    log = []
+
+    def call(n):
+        # Like an inline function call that calls itself
+        if n > 0:
+            run_inline(lambda: call(n - 1), on_done=lambda: log.append(n))
+
+    run_inline(lambda: call(5000), on_done=lambda: log.append("outer"))
+
+    # The innermost call finishes first
+    assert log == list(range(1, 5001)) + ["outer"]
+
+
+def test_direct_tasks_run_immediately(setup_workspace, main_editor):
+    log = []
+    node = main_editor.create_node("grapycal_test.Test1Node")
+
+    def task():
+        node.run(lambda: log.append("direct"), background=False)
+        log.append("after")
+
+    run_inline(task)
+
+    assert log == ["direct", "after"]
@@ -1,4 +1,6 @@
 
+import asyncio
+
 import pytest
 from grapycal.core.workspace import Workspace
 from grapycal.sobjects.editor import Editor
@@ -7,11 +9,22 @@ from grapycal.stores import main_store
 
 @pytest.fixture
 def setup_workspace():
-    workspace = Workspace(port=8766, host="localhost", path="workspace.grapycal")
-    workspace.run(run_runner=False)
+    workspace = Workspace(path="workspace.grapycal")
+    workspace.run(asyncio.new_event_loop(), run_runner=False)
 
     # Import test extension, so we can create test nodes
     workspace._extention_manager.import_extension('grapycal_test')
+    return workspace
+
+@pytest.fixture
+def builtin_ext(setup_workspace):
+    setup_workspace._extention_manager.import_extension('grapycal_builtin')
+
+def run_tasks():
+    '''
+    The runner doesn't run in tests. Runs the tasks the nodes scheduled, until none are left.
+    '''
+    main_store.runner.run_until_idle()
 
 @pytest.fixture
 def main_editor() -> Editor:
@@ -1,27 +1,97 @@
-from grapycal import Node, Edge, InputPort
+from threading import Lock
+
+from grapycal import (
+    Node,
+    Edge,
+    InputPort,
+    StringTopic,
+    IntTopic,
+    GenericTopic,
+    main_store,
+)
+
+from .accumulator import Accumulator
 
 
 class ListAccumulatorNode(Node):
+    """
+    Collects the items sent to ``append`` and outputs all of them when ``trigger`` is activated.
+
+    With ``storage`` set to array, numbers, numpy arrays and torch tensors of the same shape are stacked into one
+    array, which uses much less memory than a list of many small objects. ``max_length`` keeps only the latest items
+    (0 means no limit), and ``spill to disk`` keeps a numpy array in a temporary file instead of RAM.
+    """
+
     category = "data"
 
+    LABEL_UPDATE_INTERVAL = 0.5
+
     def build_node(self):
         self.label_topic.set("List Accum (0)")
         self.trigger_port = self.add_in_port("trigger")
         self.reset_port = self.add_in_port("reset")
         self.append_port = self.add_in_port("append")
         self.get_port = self.add_out_port("get")
+        self.storage = self.add_attribute(
+            "storage",
+            StringTopic,
+            "list",
+            editor_type="options",
+            options=["list", "array"],
+        )
+        self.max_length = self.add_attribute(
+            "max_length", IntTopic, 0, editor_type="int"
+        )
+        self.spill_to_disk = self.add_attribute(
+            "spill to disk", GenericTopic[bool], False, editor_type="toggle"
+        )
 
     def init_node(self):
-        self.data = []
+        # reset() is called from attribute changes on the UI thread while the runner may be appending
+        self.lock = Lock()
+        self.data = self._new_accumulator()
+        self.storage.on_set += lambda _: self.reset()
+        self.max_length.on_set += lambda _: self.reset()
+        self.spill_to_disk.on_set += lambda _: self.reset()
+        if not self.is_preview.get():
+            # The label is updated periodically instead of on every append, which would flood the clients
+            main_store.clock.add_listener(self.update_label, self.LABEL_UPDATE_INTERVAL)
+
+    def _new_accumulator(self):
+        return Accumulator(
+            use_array=self.storage.get() == "array",
+            max_length=self.max_length.get(),
+            spill_to_disk=self.spill_to_disk.get(),
+        )
+
+    def reset(self):
+        with self.lock:
+            self.data.close()
+            self.data = self._new_accumulator()
+        self.update_label()
+
+    def update_label(self):
+        label = f"List Accum ({len(self.data)})"
+        if self.label_topic.get() != label:
+            self.label_topic.set(label)
 
     def edge_activated(self, edge: Edge, port: InputPort):
         if port == self.trigger_port:
             edge.get()
-            self.get_port.push(self.data)
+            with self.lock:
+                items = self.data.get()
+            self.get_port.push(items)
         elif port == self.reset_port:
             edge.get()
-            self.data = []
-            self.label_topic.set("List Accum (0)")
+            self.reset()
         elif port == self.append_port:
-            self.data.append(edge.get())
-            self.label_topic.set(f"List Accum ({len(self.data)})")
+            item = edge.get()
+            with self.lock:
+                self.data.append(item)
+
+    def destroy(self):
+        if not self.is_preview.get():
+            main_store.clock.remove_listener(self.update_label)
+        with self.lock:
+            self.data.close()
+        return super().destroy()
@@ -0,0 +1,219 @@
+import os
+import tempfile
+from collections import deque
+from typing import Any
+
+import numpy as np
+
+from grapycal import is_torch_tensor
+
+_NUMERIC_KINDS = "biufc"
+
+
+class Accumulator:
+    """
+    Collects appended items in order.
+
+    With use_array=False, the items are kept in a Python list. With use_array=True, numbers, numpy arrays and torch
+    tensors of the same shape are stacked into a preallocated array that grows by doubling, so appending doesn't
+    create a Python object per item and get() returns a single array. If an item doesn't fit the array (a different
+    shape, device or a non-numeric type), the accumulator falls back to a list.
+
+    With max_length > 0, only the last max_length items are kept, like a ring buffer. With spill_to_disk=True, numpy
+    storage is a memory-mapped temporary file instead of RAM.
+    """
+
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, use_array=False, max_length=0, spill_to_disk=False):
+        self.use_array = use_array
+        self.max_length = max(max_length, 0)
+        self.spill_to_disk = spill_to_disk
+        self._items: list | deque | None = None
+        self._buffer: Any = None  # np.ndarray, np.memmap or torch.Tensor
+        self._start = 0
+        self._count = 0
+        self._file = None
+        if not use_array:
+            self._use_list([])
+
+    def __len__(self):
+        if self._items is not None:
+            return len(self._items)
+        return self._count
+
+    def append(self, item):
+        if self._items is not None:
+            self._items.append(item)
+            return
+        if self._buffer is None:
+            if not self._allocate(item):
+                self._use_list([item])
+                return
+        elif not self._fits(item):
+            self._use_list(list(self._view()) + [item])
+            return
+
+        capacity = len(self._buffer)
+        if self._count == capacity:
+            if self.max_length == 0 or capacity < self.max_length:
+                self._grow()
+                capacity = len(self._buffer)
+            else:
+                # Full ring buffer: overwrite the oldest item
+                self._buffer[self._start] = self._convert(item)
+                self._start = (self._start + 1) % capacity
+                return
+        self._buffer[(self._start + self._count) % capacity] = self._convert(item)
+        self._count += 1
+
+    def get(self):
+        """
+        Returns a copy of the items, oldest first: a list, or an array stacked along the first axis. Later appends
+        don't change it. A memory-mapped storage is copied into RAM.
+        """
+        if self._items is not None:
+            return list(self._items)
+        items = self._view()
+        if self._buffer is None or self._start + self._count > len(self._buffer):
+            return items  # not a view of the storage
+        if is_torch_tensor(items):
+            return items.clone()
+        return np.array(items)
+
+    def _view(self):
+        """
+        Like get(), but the items may share memory with the storage, so they are overwritten by later appends.
+        """
+        if self._items is not None:
+            return self._items if isinstance(self._items, list) else list(self._items)
+        if self._buffer is None:
+            return []
+        end = self._start + self._count
+        if end <= len(self._buffer):
+            return self._buffer[self._start : end]
+        wrapped = (self._buffer[self._start :], self._buffer[: end - len(self._buffer)])
+        if is_torch_tensor(self._buffer):
+            import torch
+
+            return torch.cat(wrapped)
+        return np.concatenate(wrapped)
+
+    def close(self):
+        """
+        Releases the storage, including the spill file.
+        """
+        self._buffer = None
+        self._items = None
+        if self._file is not None:
+            name = self._file.name
+            self._file.close()
+            try:
+                os.remove(name)
+            except OSError:
+                pass
+            self._file = None
+
+    def _use_list(self, items: list):
+        if self._buffer is not None:
+            self.close()
+        if self.max_length > 0:
+            self._items = deque(items, maxlen=self.max_length)
+        else:
+            self._items = items
+
+    def _initial_capacity(self) -> int:
+        if self.max_length > 0:
+            return min(self.INITIAL_CAPACITY, self.max_length)
+        return self.INITIAL_CAPACITY
+
+    def _allocate(self, item) -> bool:
+        """
+        Creates the storage from the first item. Returns False if the item can't be stored in an array.
+        """
+        capacity = self._initial_capacity()
+        if is_torch_tensor(item):
+            import torch
+
+            self._buffer = torch.empty(
+                (capacity, *item.shape), dtype=item.dtype, device=item.device
+            )
+            return True
+        value = np.asarray(item)
+        if value.dtype.kind not in _NUMERIC_KINDS:
+            return False
+        self._buffer = self._new_array(capacity, value.shape, value.dtype)
+        return True
+
+    def _new_array(self, capacity: int, shape: tuple, dtype: np.dtype) -> np.ndarray:
+        if not self.spill_to_disk:
+            return np.empty((capacity, *shape), dtype=dtype)
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(
+                prefix="grapycal_accumulator_", suffix=".bin", delete=False
+            )
+        # Extending the file keeps the items already written to it
+        n_bytes = capacity * int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        self._file.truncate(max(n_bytes, 1))
+        self._file.flush()
+        return np.memmap(
+            self._file.name, dtype=dtype, mode="r+", shape=(capacity, *shape)
+        )
+
+    def _fits(self, item) -> bool:
+        if is_torch_tensor(self._buffer):
+            return (
+                is_torch_tensor(item)
+                and item.shape == self._buffer.shape[1:]
+                and item.dtype == self._buffer.dtype
+                and item.device == self._buffer.device
+            )
+        if is_torch_tensor(item):
+            return False
+        value = np.asarray(item)
+        if value.dtype.kind not in _NUMERIC_KINDS:
+            return False
+        if value.shape != self._buffer.shape[1:]:
+            return False
+        dtype = np.result_type(self._buffer.dtype, value.dtype)
+        if dtype != self._buffer.dtype:
+            # e.g. a float after ints: promote the stored items instead of truncating the new one
+            self._buffer = self._resize(len(self._buffer), dtype)
+        return True
+
+    def _convert(self, item):
+        if is_torch_tensor(item):
+            return item.detach()  # prevent memory leak from the autograd graph
+        return item
+
+    def _grow(self):
+        capacity = len(self._buffer) * 2
+        if self.max_length > 0:
+            capacity = min(capacity, self.max_length)
+        self._buffer = self._resize(capacity, self._buffer.dtype)
+
+    def _resize(self, capacity: int, dtype):
+        """
+        Moves the items to new storage of the given capacity, oldest first.
+        """
+        items = self._view()
+        if is_torch_tensor(self._buffer):
+            import torch
+
+            new = torch.empty(
+                (capacity, *self._buffer.shape[1:]),
+                dtype=dtype,
+                device=self._buffer.device,
+            )
+        elif self.spill_to_disk and dtype == self._buffer.dtype and self._start == 0:
+            # The file is extended in place, so the items don't have to be copied
+            self._buffer.flush()
+            return self._new_array(capacity, self._buffer.shape[1:], dtype)
+        else:
+            if self.spill_to_disk:
+                # Read into memory before the file is rewritten
+                items = np.array(items, dtype=dtype)
+            new = self._new_array(capacity, self._buffer.shape[1:], dtype)
+        new[: self._count] = items
+        self._start = 0
+        return new
@@ -2,6 +2,7 @@ import re
 
 from grapycal import (
     ButtonControl,
+    CacheConfig,
     Edge,
     FloatTopic,
     GenericTopic,
@@ -18,6 +19,13 @@ from grapycal import (
     is_torch_tensor,
 )
 
+from .aggregators import (
+    WindowMeanNode as WindowMeanNode,
+    WindowMinMaxNode as WindowMinMaxNode,
+    WindowQuantileNode as WindowQuantileNode,
+    WindowVarianceNode as WindowVarianceNode,
+)
+
 
 class VariableNode(SourceNode):
     """
@@ -187,7 +195,7 @@ class RegexFindAllNode(Node):
     def build_node(self):
         self.css_classes.append("fit-content")
 
-    @func(background=False)
+    @func(background=False, cache=CacheConfig(enabled_by_default=False))
     def matches(self, string: str = "123ouo456", pattern: str = "[0-9]+") -> list:
         return re.findall(pattern, string)
 
@@ -372,7 +380,7 @@ class MeanNode(Node):
         self.num += 1
         if self.num % self.output_interval.get() == 0:
             self.out_port.push(self.sum / self.num)
-            if self.reset_when_output.get() == "Yes":
+            if self.reset_when_output.get():
                 self.sum = 0
                 self.num = 0
 
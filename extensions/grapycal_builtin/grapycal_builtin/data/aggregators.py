@@ -0,0 +1,404 @@
+import abc
+import math
+
+import numpy as np
+
+from grapycal import (
+    Edge,
+    FloatTopic,
+    InputPort,
+    IntTopic,
+    Node,
+    StringTopic,
+    is_torch_tensor,
+)
+
+
+def to_samples(data) -> np.ndarray:
+    """
+    Flattens a number, a list, a numpy array or a torch tensor into a 1D float array of samples.
+    """
+    if is_torch_tensor(data):
+        data = data.detach().cpu().numpy()
+    return np.asarray(data, dtype=np.float64).reshape(-1)
+
+
+class RunningMoments:
+    """
+    The count, mean and sum of squared deviations of a stream, updated a batch at a time with Chan's parallel
+    form of Welford's algorithm, which stays numerically stable for long streams and large means.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, samples: np.ndarray):
+        n_b = len(samples)
+        if n_b == 0:
+            return
+        mean_b = float(samples.mean())
+        m2_b = float(((samples - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+    def remove(self, samples: np.ndarray):
+        """
+        Removes samples that were added before, for sliding windows.
+        """
+        n_b = len(samples)
+        if n_b == 0:
+            return
+        n = self.n - n_b
+        if n <= 0:
+            self.reset()
+            return
+        mean_b = float(samples.mean())
+        m2_b = float(((samples - mean_b) ** 2).sum())
+        mean_a = (self.n * self.mean - n_b * mean_b) / n
+        delta = mean_b - mean_a
+        self.m2 = max(self.m2 - m2_b - delta * delta * n * n_b / self.n, 0.0)
+        self.mean = mean_a
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.n if self.n > 0 else math.nan
+
+
+class TDigest:
+    """
+    A merging t-digest (Dunning & Ertl) that estimates quantiles of a stream with at most about ``compression``
+    centroids, accurate at the tails. Samples are buffered and merged into the centroids in batches.
+    """
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.reset()
+
+    def reset(self):
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[np.ndarray] = []
+        self._n_buffered = 0
+
+    @property
+    def n(self) -> float:
+        return float(self.weights.sum()) + self._n_buffered
+
+    def add(self, samples: np.ndarray):
+        if len(samples) == 0:
+            return
+        self.min = min(self.min, float(samples.min()))
+        self.max = max(self.max, float(samples.max()))
+        self._buffer.append(samples)
+        self._n_buffered += len(samples)
+        if self._n_buffered > 5 * self.compression:
+            self._merge()
+
+    def _merge(self):
+        if self._n_buffered == 0:
+            return
+        means = np.concatenate([self.means, *self._buffer])
+        weights = np.concatenate([self.weights, np.ones(self._n_buffered)])
+        self._buffer = []
+        self._n_buffered = 0
+
+        order = np.argsort(means, kind="stable")
+        means = means[order].tolist()
+        weights = weights[order].tolist()
+        total = sum(weights)
+
+        # The k1 scale function. Neighbouring centroids are merged while the merged centroid spans at most one unit
+        # of k, so centroids are small near the tails (q close to 0 or 1) and large near the median.
+        def k(q: float) -> float:
+            return (
+                self.compression / (2 * math.pi) * math.asin(min(max(2 * q - 1, -1), 1))
+            )
+
+        new_means = []
+        new_weights = []
+        q_left = 0.0
+        k_left = k(q_left)
+        mean, weight = means[0], weights[0]
+        for next_mean, next_weight in zip(means[1:], weights[1:]):
+            q_right = q_left + (weight + next_weight) / total
+            if k(q_right) - k_left <= 1:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                new_means.append(mean)
+                new_weights.append(weight)
+                q_left += weight / total
+                k_left = k(q_left)
+                mean, weight = next_mean, next_weight
+        new_means.append(mean)
+        new_weights.append(weight)
+        self.means = np.array(new_means)
+        self.weights = np.array(new_weights)
+
+    def quantile(self, q: float) -> float:
+        self._merge()
+        if len(self.weights) == 0:
+            return math.nan
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0], centers, [centers[-1] + self.weights[-1] / 2]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * self.weights.sum(), positions, values))
+
+
+class RingBuffer:
+    """
+    The last ``size`` samples of a stream in a preallocated array.
+    """
+
+    def __init__(self, size: int):
+        self.buffer = np.empty(size)
+        self.start = 0
+        self.count = 0
+
+    def values(self) -> np.ndarray:
+        size = len(self.buffer)
+        return self.buffer[(self.start + np.arange(self.count)) % size]
+
+    def extend(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Appends samples and returns the samples pushed out, oldest first.
+        """
+        size = len(self.buffer)
+        if len(samples) >= size:
+            evicted = np.concatenate([self.values(), samples[:-size]])
+            self.buffer[:] = samples[-size:]
+            self.start = 0
+            self.count = size
+            return evicted
+        n_evicted = max(self.count + len(samples) - size, 0)
+        evicted = self.values()[:n_evicted]
+        indices = (self.start + self.count + np.arange(len(samples))) % size
+        self.buffer[indices] = samples
+        self.start = (self.start + n_evicted) % size
+        self.count = min(self.count + len(samples), size)
+        return evicted
+
+
+class WindowAggregatorNode(Node):
+    """
+    Base class of nodes that aggregate a stream of numbers over a window. Each input can be a single number or a
+    batch (a list, numpy array or torch tensor), which is added in one call.
+
+    - tumbling: The result is output each time ``window_size`` samples are collected, then the window restarts.
+    - sliding: The result over the last ``window_size`` samples is output after every input.
+    - running: The result over all samples since the last reset is output after every input.
+
+    Subclasses implement _add(), _remove(), _reset() and _output().
+    """
+
+    category = "hidden"
+    needs_ring_buffer = False  # whether _output() reads the samples of a sliding window
+
+    def build_node(self):
+        super().build_node()
+        self.reset_port = self.add_in_port("reset")
+        self.in_port = self.add_in_port("input")
+        self.window = self.add_attribute(
+            "window",
+            StringTopic,
+            "tumbling",
+            editor_type="options",
+            options=["tumbling", "sliding", "running"],
+        )
+        self.window_size = self.add_attribute(
+            "window_size", IntTopic, 100, editor_type="int"
+        )
+
+    def init_node(self):
+        super().init_node()
+        self.ring: RingBuffer | None = None
+        self.n_in_window = 0
+        self.window.on_set += lambda _: self.reset()
+        self.window_size.on_set += lambda _: self.reset()
+        self.reset()
+
+    def reset(self):
+        self.ring = None
+        self.n_in_window = 0
+        self._reset()
+
+    def edge_activated(self, edge: Edge, port: InputPort):
+        if port == self.reset_port:
+            self.reset()
+            return
+        if port == self.in_port:
+            self.run(self.task, data=edge.get())
+
+    def task(self, data):
+        samples = to_samples(data)
+        window = self.window.get()
+        size = max(self.window_size.get(), 1)
+
+        if window == "running":
+            self._add(samples)
+            self._output(None)
+        elif window == "sliding":
+            if self.ring is None:
+                self.ring = RingBuffer(size)
+            evicted = self.ring.extend(samples)
+            self._add(samples)
+            self._remove(evicted)
+            self._output(self.ring.values() if self.needs_ring_buffer else None)
+        else:
+            # A batch may fill several windows
+            while len(samples) > 0:
+                take = size - self.n_in_window
+                self._add(samples[:take])
+                self.n_in_window += len(samples[:take])
+                samples = samples[take:]
+                if self.n_in_window == size:
+                    self._output(None)
+                    self.n_in_window = 0
+                    self._reset()
+
+    @abc.abstractmethod
+    def _add(self, samples: np.ndarray):
+        pass
+
+    def _remove(self, samples: np.ndarray):
+        pass
+
+    @abc.abstractmethod
+    def _reset(self):
+        pass
+
+    @abc.abstractmethod
+    def _output(self, window_samples: np.ndarray | None):
+        pass
+
+
+class WindowMeanNode(WindowAggregatorNode):
+    """
+    The mean of a stream of numbers over a window. See WindowAggregatorNode for the window modes.
+    """
+
+    category = "data/dynamics"
+
+    def build_node(self):
+        super().build_node()
+        self.label_topic.set("Window Mean")
+        self.out_port = self.add_out_port("mean")
+
+    def _reset(self):
+        self.moments = RunningMoments()
+
+    def _add(self, samples):
+        self.moments.add(samples)
+
+    def _remove(self, samples):
+        self.moments.remove(samples)
+
+    def _output(self, window_samples):
+        self.out_port.push(self.moments.mean)
+
+
+class WindowVarianceNode(WindowAggregatorNode):
+    """
+    The (population) variance and standard deviation of a stream of numbers over a window. See WindowAggregatorNode
+    for the window modes.
+    """
+
+    category = "data/dynamics"
+
+    def build_node(self):
+        super().build_node()
+        self.label_topic.set("Window Variance")
+        self.var_port = self.add_out_port("variance")
+        self.std_port = self.add_out_port("std")
+
+    def _reset(self):
+        self.moments = RunningMoments()
+
+    def _add(self, samples):
+        self.moments.add(samples)
+
+    def _remove(self, samples):
+        self.moments.remove(samples)
+
+    def _output(self, window_samples):
+        variance = self.moments.variance
+        self.var_port.push(variance)
+        self.std_port.push(math.sqrt(variance))
+
+
+class WindowMinMaxNode(WindowAggregatorNode):
+    """
+    The minimum and maximum of a stream of numbers over a window. See WindowAggregatorNode for the window modes.
+    """
+
+    category = "data/dynamics"
+
+    needs_ring_buffer = True
+
+    def build_node(self):
+        super().build_node()
+        self.label_topic.set("Window Min/Max")
+        self.min_port = self.add_out_port("min")
+        self.max_port = self.add_out_port("max")
+
+    def _reset(self):
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _add(self, samples):
+        if len(samples) > 0:
+            self.min = min(self.min, float(samples.min()))
+            self.max = max(self.max, float(samples.max()))
+
+    def _output(self, window_samples):
+        if window_samples is not None:
+            self.min_port.push(float(window_samples.min()))
+            self.max_port.push(float(window_samples.max()))
+            return
+        self.min_port.push(self.min)
+        self.max_port.push(self.max)
+
+
+class WindowQuantileNode(WindowAggregatorNode):
+    """
+    A quantile of a stream of numbers over a window, such as the median (q = 0.5). Tumbling and running windows are
+    estimated with a t-digest, so the memory used doesn't grow with the window. Sliding windows are exact.
+    """
+
+    category = "data/dynamics"
+
+    needs_ring_buffer = True
+
+    def build_node(self):
+        super().build_node()
+        self.label_topic.set("Window Quantile")
+        self.q = self.add_attribute("q", FloatTopic, 0.5, editor_type="float")
+        self.compression = self.add_attribute(
+            "compression", FloatTopic, 100, editor_type="float"
+        )
+        self.out_port = self.add_out_port("quantile")
+
+    def _reset(self):
+        self.digest = TDigest(self.compression.get())
+
+    def _add(self, samples):
+        if self.window.get() != "sliding":
+            self.digest.add(samples)
+
+    def _output(self, window_samples):
+        q = min(max(self.q.get(), 0), 1)
+        if window_samples is not None:
+            self.out_port.push(float(np.quantile(window_samples, q)))
+            return
+        self.out_port.push(self.digest.quantile(q))
@@ -1,5 +1,16 @@
-from grapycal import ListTopic, Node, ObjDictTopic, TextControl, Edge, InputPort
+from typing import Any, Callable
+
+from grapycal import (
+    ListTopic,
+    Node,
+    ObjDictTopic,
+    TextControl,
+    Edge,
+    InputPort,
+    StringTopic,
+)
 from .math import *
+from ..utils import Namespace
 
 
 class LambdaNode(Node):
@@ -15,6 +26,14 @@ class LambdaNode(Node):
     :outputs:
         - *outputs: You can add any number of outputs to the node.
 
+    Each expression is compiled once and recompiled only when its text or the inputs change.
+
+    With ``vectorize`` set to Yes, list and tuple inputs are converted to numpy arrays, so an expression like
+    ``x * 2 + 1`` is applied to the whole array in one call.
+
+    With ``namespace`` set to isolated, the expressions only see the variables listed in ``imports`` instead of all the
+    variables shared by the workspace.
+
     """
 
     category = "function"
@@ -30,6 +49,21 @@ class LambdaNode(Node):
             "input_args", ListTopic, editor_type="list"
         )
         self.outputs = self.add_attribute("outputs", ListTopic, editor_type="list")
+        self.vectorize = self.add_attribute(
+            "vectorize",
+            StringTopic,
+            "No",
+            editor_type="options",
+            options=["No", "Yes"],
+        )
+        self.namespace_mode = self.add_attribute(
+            "namespace",
+            StringTopic,
+            "shared",
+            editor_type="options",
+            options=["shared", "isolated"],
+        )
+        self.imports = self.add_attribute("imports", ListTopic, [], editor_type="list")
         self.css_classes.append("fit-content")
 
         if self.is_new:
@@ -45,6 +79,9 @@ class LambdaNode(Node):
                 self.on_output_added(out, -1)
 
     def init_node(self):
+        # output name -> ((expression, input args, globals id), compiled function)
+        self._compiled: dict[str, tuple[tuple, Callable]] = {}
+        self._namespace = Namespace(self.get_vars)
         self.input_args.add_validator(ListTopic.unique_validator)
         self.input_args.on_insert.add_auto(self.on_input_arg_added)
         self.input_args.on_pop.add_auto(self.on_input_arg_removed)
@@ -68,6 +105,7 @@ class LambdaNode(Node):
         new_control.label.set(f"{name} = ")
 
     def on_output_removed(self, name, position):
+        self._compiled.pop(name, None)
         self.remove_out_port(name)
         self.text_controls.pop(name)
         self.remove_control(name)
@@ -85,11 +123,40 @@ class LambdaNode(Node):
             if len(port.edges) == 0:
                 return
         arg_values = [port.get() for port in self.in_ports]
+        if self.vectorize.get() == "Yes":
+            arg_values = [self._to_array(value) for value in arg_values]
 
         def task():
+            globals_ = self._namespace.get(
+                self.namespace_mode.get() == "isolated", self.imports.get()
+            )
             for out_name, text_control in self.text_controls.get().items():
-                expr = f'lambda {",".join(self.input_args)}: {text_control.text.get()}'
-                y = eval(expr, self.get_vars())(*arg_values)
+                function = self._get_function(
+                    out_name, text_control.text.get(), globals_
+                )
+                y = function(*arg_values)
                 self.get_out_port(out_name).push(y)
 
         self.run(task)
+
+    def _get_function(self, out_name: str, expr: str, globals_: dict) -> Callable:
+        """
+        Returns the compiled lambda of an output, compiling it only if the expression, the input args or the
+        globals have changed since the last call.
+        """
+        key = (expr, tuple(self.input_args), id(globals_))
+        cached = self._compiled.get(out_name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        source = f"lambda {','.join(self.input_args)}: {expr}"
+        function = eval(compile(source, f"<lambda {out_name}>", "eval"), globals_)
+        self._compiled[out_name] = (key, function)
+        return function
+
+    @staticmethod
+    def _to_array(value: Any) -> Any:
+        if isinstance(value, (list, tuple)):
+            import numpy as np
+
+            return np.asarray(value)
+        return value
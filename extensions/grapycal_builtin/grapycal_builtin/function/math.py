@@ -1,5 +1,8 @@
 import math
-from grapycal import func, Node, param
+from grapycal import CacheConfig, func, Node, param
+
+# Most math funcs are cheaper than hashing their inputs, so the cache is off until turned on for a node
+OPT_IN_CACHE = CacheConfig(enabled_by_default=False)
 
 
 class MathBaseNode(Node):
@@ -10,7 +13,7 @@ class MathBaseNode(Node):
 class AddNode(MathBaseNode):
     label = "+"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=0, b=0):
         return a + b
 
@@ -18,7 +21,7 @@ class AddNode(MathBaseNode):
 class SubtractNode(MathBaseNode):
     label = "-"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=0, b=0):
         return a - b
 
@@ -26,7 +29,7 @@ class SubtractNode(MathBaseNode):
 class MultiplyNode(MathBaseNode):
     label = "*"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a * b
 
@@ -34,7 +37,7 @@ class MultiplyNode(MathBaseNode):
 class DivideNode(MathBaseNode):
     label = "/"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a / b
 
@@ -42,7 +45,7 @@ class DivideNode(MathBaseNode):
 class PowerNode(MathBaseNode):
     label = "**"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a**b
 
@@ -50,7 +53,7 @@ class PowerNode(MathBaseNode):
 class ModulusNode(MathBaseNode):
     label = "%"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a % b
 
@@ -58,13 +61,13 @@ class ModulusNode(MathBaseNode):
 class FloorDivideNode(MathBaseNode):
     label = "//"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a // b
 
 
 class AbsNode(MathBaseNode):
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1):
         return abs(a)
 
@@ -77,7 +80,7 @@ class RoundNode(MathBaseNode):
     def param(self, digits: int | None = 0):
         self.digits = digits
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1):
         return round(a, self.digits)
 
@@ -85,7 +88,7 @@ class RoundNode(MathBaseNode):
 class CeilNode(MathBaseNode):
     label = "⌈ ⌉"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1):
         return math.ceil(a)
 
@@ -93,7 +96,7 @@ class CeilNode(MathBaseNode):
 class FloorNode(MathBaseNode):
     label = "⌊ ⌋"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1):
         return math.floor(a)
 
@@ -101,7 +104,7 @@ class FloorNode(MathBaseNode):
 class GreaterThanNode(MathBaseNode):
     label = ">"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a > b
 
@@ -109,7 +112,7 @@ class GreaterThanNode(MathBaseNode):
 class GreaterThanEqualNode(MathBaseNode):
     label = ">="
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a >= b
 
@@ -117,7 +120,7 @@ class GreaterThanEqualNode(MathBaseNode):
 class LessThanNode(MathBaseNode):
     label = "<"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a < b
 
@@ -125,7 +128,7 @@ class LessThanNode(MathBaseNode):
 class LessThanEqualNode(MathBaseNode):
     label = "<="
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a <= b
 
@@ -133,7 +136,7 @@ class LessThanEqualNode(MathBaseNode):
 class EqualNode(MathBaseNode):
     label = "=="
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a == b
 
@@ -141,7 +144,7 @@ class EqualNode(MathBaseNode):
 class NotEqualNode(MathBaseNode):
     label = "!="
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a != b
 
@@ -149,7 +152,7 @@ class NotEqualNode(MathBaseNode):
 class AndNode(MathBaseNode):
     label = "and"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a and b
 
@@ -157,7 +160,7 @@ class AndNode(MathBaseNode):
 class OrNode(MathBaseNode):
     label = "or"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1, b=2):
         return a or b
 
@@ -165,7 +168,7 @@ class OrNode(MathBaseNode):
 class NotNode(MathBaseNode):
     label = "not"
 
-    @func(create_trigger_port=False)
+    @func(create_trigger_port=False, cache=OPT_IN_CACHE)
     def output(self, a=1):
         return not a
 
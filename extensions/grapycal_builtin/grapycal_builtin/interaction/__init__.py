@@ -1,4 +1,5 @@
 from grapycal import singletonNode, Node, main_store, StringTopic, ListTopic
+from grapycal.extension_api.utils import has_lib_checker
 import numpy as np
 import io
 from PIL import Image
@@ -7,15 +8,6 @@ from .printNode import *
 from .execNode import *
 from .image import *
 
-try:
-    import torch
-
-    HAS_TORCH = True
-    from torch import Tensor
-except ImportError:
-    HAS_TORCH = False
-    Tensor = None
-
 
 class LabelNode(Node):
     category = "interaction"
@@ -75,10 +67,12 @@ class WebcamNode(Node):
         img = Image.open(io.BytesIO(image_bytes))
         # comvert image to torch or numpy
         if self.format.get() == "torch":
-            if not HAS_TORCH:
+            if not has_lib_checker.has_lib("torch"):
                 self.print_exception(
                     "Torch is not installed. Please select numpy format instead."
                 )
+            import torch
+
             img = torch.from_numpy(np.array(img))
             img = img.permute(2, 0, 1).to(torch.float32) / 255
             if img.shape[0] == 4:
@@ -1,7 +1,10 @@
 import io
 import ast
+from types import CodeType
 from grapycal import ListTopic, Edge, InputPort, SourceNode, StringTopic, GenericTopic
 
+from ..utils import Namespace
+
 
 def separate_last_expr(code) -> tuple[ast.Module, ast.Expr | None]:
     stmts = list(ast.iter_child_nodes(ast.parse(code)))
@@ -17,31 +20,59 @@ def separate_last_expr(code) -> tuple[ast.Module, ast.Expr | None]:
         return ast.parse(code), None
 
 
+class CompiledCode:
+    """
+    Code compiled once for exec_() or aexec(), so running it again doesn't parse and compile it again.
+    """
+
+    def __init__(self, code: str, is_async: bool):
+        self.code = code
+        self.is_async = is_async
+        self._has_await: bool | None = None
+        rest, last_expr = separate_last_expr(code)
+        self.rest: CodeType | None = None
+        self.last_expr: CodeType | None = None
+        self.async_def: CodeType | None = None
+        if is_async:
+            self.async_def = _compile_async_def(rest, last_expr)
+            return
+        if rest.body:
+            self.rest = compile(rest, filename="<ast>", mode="exec")
+        if last_expr is not None:
+            self.last_expr = compile(
+                ast.Expression(body=last_expr.value), filename="<ast>", mode="eval"
+            )
+
+    def has_await(self) -> bool:
+        if self._has_await is None:
+            self._has_await = has_await(self.code)
+        return self._has_await
+
+
+def has_await(code: str) -> bool:
+    tree = ast.parse(code)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Await):
+            return True
+    return False
+
+
 # exec that prints correctly
-def exec_(code, globals=None, locals=None, print_=None):
-    # Separate the last expression from the rest of the code
-    rest, last_expr = separate_last_expr(code)
+def exec_(code: str | CompiledCode, globals=None, locals=None, print_=None):
+    if isinstance(code, str):
+        code = CompiledCode(code, is_async=False)
     # Execute the rest of the code
-    if rest.body:
-        exec(compile(rest, filename="<ast>", mode="exec"), globals, locals)
+    if code.rest is not None:
+        exec(code.rest, globals, locals)
     # Evaluate the last expression
-    if last_expr is not None:
-        last = eval(
-            compile(
-                ast.Expression(body=last_expr.value), filename="<ast>", mode="eval"
-            ),
-            globals,
-            locals,
-        )
+    if code.last_expr is not None:
+        last = eval(code.last_expr, globals, locals)
         if last is not None and print_ is not None:
             print_(last)
         return last
 
 
-async def aexec(code, globals_=None, locals_=None, print_=None):
-    # Separate the last expression from the rest of the code
-    rest, last_expr = separate_last_expr(code)
-
+def _compile_async_def(rest: ast.Module, last_expr: ast.Expr | None) -> CodeType:
     """
     create an ast that wrap rest and last_expr in an async function (add retyrn last_expr at the end of the function)
     async def __ex():
@@ -73,11 +104,18 @@ async def aexec(code, globals_=None, locals_=None, print_=None):
         type_ignores=[],
     )
     wrapped_code = ast.fix_missing_locations(wrapped_code)
+    return compile(wrapped_code, filename="<ast>", mode="exec")
+
+
+async def aexec(code: str | CompiledCode, globals_=None, locals_=None, print_=None):
+    if isinstance(code, str):
+        code = CompiledCode(code, is_async=True)
+    assert code.async_def is not None
 
     # Execute the wrapped code to get the function
     if locals_ is None:
         locals_ = {}
-    exec(compile(wrapped_code, filename="<ast>", mode="exec"), globals_, locals_)
+    exec(code.async_def, globals_, locals_)
     func = locals_["__ex"]
 
     # Execute the function
@@ -102,6 +140,10 @@ class ExecuteNode(SourceNode):
         - done: send out a signal when the statements are done
         - *outputs: You can add any variable of outputs to the node.
                     Click the (+) in the inspector to plus the name of the variable.
+
+    By default the code runs in the variables shared by the workspace. With ``namespace`` set to isolated, it runs in
+    the node's own variables instead: ``imports`` are copied from the shared variables before each run and
+    ``exports`` are copied back after it.
     """
 
     category = "interaction"
@@ -128,6 +170,15 @@ class ExecuteNode(SourceNode):
             options=["yes", "no"],
             init_value="yes",
         )
+        self.namespace_mode = self.add_attribute(
+            "namespace",
+            StringTopic,
+            "shared",
+            editor_type="options",
+            options=["shared", "isolated"],
+        )
+        self.imports = self.add_attribute("imports", ListTopic, [], editor_type="list")
+        self.exports = self.add_attribute("exports", ListTopic, [], editor_type="list")
         self.icon_path_topic.set("python")
 
         if self.is_new:
@@ -145,6 +196,10 @@ class ExecuteNode(SourceNode):
         self.outputs.on_insert.add_auto(self.add_output)
         self.outputs.on_pop.add_auto(self.pop_output)
         self.code_control.on_execute += lambda: self.run(self.task)
+        self._compiled: CompiledCode | None = None
+        self._namespace = Namespace(self.get_vars)
+        self.code_control.text.on_set += self._invalidate_compiled
+        self.is_async.on_set += self._invalidate_compiled
         self.is_async.on_set += lambda v: self.label_topic.set(
             "Execute" + (" (async)" if v else "")
         )
@@ -177,52 +232,62 @@ class ExecuteNode(SourceNode):
         else:
             self.run(self.sync_task)
 
-    async def async_task(self):
-        self.output_control.set("")
-        stmt = self.code_control.text.get()
+    def _invalidate_compiled(self, _=None):
+        self._compiled = None
+
+    def _get_compiled(self) -> CompiledCode:
+        """
+        Returns the compiled code, compiling it only after the code or the async toggle has changed.
+        """
+        code = self.code_control.text.get()
+        is_async = self.is_async.get()
+        compiled = self._compiled
+        if compiled is None or compiled.code != code or compiled.is_async != is_async:
+            compiled = self._compiled = CompiledCode(code, is_async)
+        return compiled
+
+    def _set_vars(self) -> dict:
+        vars_ = self._namespace.get(
+            self.namespace_mode.get() == "isolated", self.imports.get()
+        )
         for name in self.inputs:
             port = self.get_in_port(name)
             if port.is_all_ready():
-                self.get_vars().update({name: port.get()})
-        self.get_vars().update(
-            {
-                "print": self.print,
-                "self": self,
-            }
-        )
+                vars_[name] = port.get()
+        vars_["print"] = self.print
+        vars_["self"] = self
+        return vars_
+
+    def _push_outputs(self, vars_: dict, result):
+        self._namespace.export(self.exports.get())
+        self.out_port.push(result)
+        for name in self.outputs:
+            self.get_out_port(name).push(vars_[name])
+
+    async def async_task(self):
+        self.output_control.set("")
+        vars_ = self._set_vars()
         try:
-            result = await aexec(stmt, self.get_vars(), print_=self.print)
+            result = await aexec(self._get_compiled(), vars_, print_=self.print)
         except Exception as e:
             self.print_exception(e, -3)
             return
-        self.out_port.push(result)
-        for name in self.outputs:
-            self.get_out_port(name).push(self.get_vars()[name])
+        self._push_outputs(vars_, result)
 
     def has_await(self, code: str):
-        tree = ast.parse(code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Await):
-                return True
-        return False
+        compiled = self._compiled
+        if compiled is not None and compiled.code == code:
+            return compiled.has_await()
+        return has_await(code)
 
     def sync_task(self):
         self.output_control.set("")
         stmt = self.code_control.text.get()
-        for name in self.inputs:
-            port = self.get_in_port(name)
-            if port.is_all_ready():
-                self.get_vars().update({name: port.get()})
-        self.get_vars().update(
-            {
-                "print": self.print,
-                "self": self,
-            }
-        )
+        vars_ = self._set_vars()
         try:
             result = exec_(
-                stmt,
-                self.get_vars(),
+                self._get_compiled(),
+                vars_,
                 print_=self.print if self.print_last_expr.get() == "yes" else None,
             )
         except Exception as e:
@@ -233,9 +298,7 @@ class ExecuteNode(SourceNode):
                 return
             self.print_exception(e, -3)
             return
-        self.out_port.push(result)
-        for name in self.outputs:
-            self.get_out_port(name).push(self.get_vars()[name])
+        self._push_outputs(vars_, result)
 
     def print(self, *args, **kwargs):
         output = io.StringIO()
@@ -1,21 +1,9 @@
 import io
+import logging
+from collections import defaultdict
 from contextlib import contextmanager
-from typing import Generator, Literal, Tuple
-
-import matplotlib
-from matplotlib import pyplot as plt
-from matplotlib.axes import Axes
-from matplotlib.figure import Figure
-
-
-try:
-    import torch
-
-    HAS_TORCH = True
-    from torch import Tensor
-except ImportError:
-    HAS_TORCH = False
-    Tensor = None
+from threading import Condition, Lock, Thread
+from typing import TYPE_CHECKING, Callable, Generator, Literal, Tuple
 
 import numpy as np
 from numpy import ndarray
@@ -39,15 +27,42 @@ from grapycal import (
     SourceNode,
     func,
     GenericTopic,
+    is_torch_tensor,
 )
+from grapycal.extension_api.utils import has_lib_checker
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
+logger = logging.getLogger(__name__)
+
+_matplotlib_configured = False
 
-plt.style.use("dark_background")
-matplotlib.use("Agg")
-plt.ioff()
+
+def import_matplotlib():
+    """
+    Importing matplotlib takes a long time, so it is done when the first plot is drawn instead of when the extension
+    is imported.
+    """
+    global _matplotlib_configured
+    import matplotlib
+
+    if not _matplotlib_configured:
+        matplotlib.use("Agg")
+        from matplotlib import pyplot as plt
+
+        plt.style.use("dark_background")
+        plt.ioff()
+        _matplotlib_configured = True
+    return matplotlib
 
 
 @contextmanager
-def open_fig(equal=False) -> Generator[Tuple[Figure, Axes], None, None]:
+def open_fig(equal=False) -> Generator[Tuple["Figure", "Axes"], None, None]:
+    import_matplotlib()
+    from matplotlib import pyplot as plt
+
     fig = plt.figure()
     ax = fig.gca()
     ax.set_facecolor("black")
@@ -97,7 +112,7 @@ class ImageSourceNode(SourceNode):
 
     def format_validator(self, format, _):
         if "torch" in format:
-            if not HAS_TORCH:
+            if not has_lib_checker.has_lib("torch"):
                 return False
             return True
         if "numpy" in format:
@@ -122,6 +137,8 @@ class ImageSourceNode(SourceNode):
 
         # comvert image to torch or numpy
         if self.format.get() == "torch":
+            import torch
+
             img = torch.from_numpy(np.array(img))
             img = img.permute(2, 0, 1).to(torch.float32) / 255
             if self.channels == "gray scale":
@@ -156,6 +173,16 @@ class ImageSourceNode(SourceNode):
 
 
 class Renderer:
+    """
+    Draws on a persistent figure and encodes its canvas to jpg or png.
+
+    The figure is created without pyplot and the axes fill the whole canvas, so the output has exactly
+    ``width`` x ``height`` pixels. Artists are kept between renders, so callers can update them in place
+    (``set_data``, ``set_offsets`` ...) instead of redrawing everything.
+    """
+
+    dpi = 128
+
     def __init__(self, width: int, height: int):
         self._set_size(width, height)
 
@@ -168,11 +195,20 @@ class Renderer:
     def _set_size(self, width, height):
         self.width = width
         self.height = height
-        self.fig = plt.figure(
-            figsize=(width / 128 * 1.299, height / 128 * 1.299),
-            dpi=128,
-        )  # 1.299 makes pyplot outputs correctly
-        self.ax = self.fig.gca()
+        import_matplotlib()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=(width / self.dpi, height / self.dpi), dpi=self.dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_axes((0, 0, 1, 1))
+        self.ax.axis("off")
+        self.owner_state: dict = {}  # artists created by the current user of the renderer
+
+    def clear(self):
+        self.ax.clear()
+        self.ax.axis("off")
+        self.owner_state = {}
 
     def render(
         self,
@@ -181,26 +217,247 @@ class Renderer:
         format="jpg",
     ) -> io.BytesIO:
         if x_range is not None:
-            plt.xlim(x_range)
+            self.ax.set_xlim(x_range)
         if y_range is not None:
-            plt.ylim(y_range)
+            self.ax.set_ylim(y_range)
         buf = io.BytesIO()
-        self.ax.axis("off")
-        self.fig.savefig(
-            buf,
-            format=format,
-            bbox_inches="tight",
-            transparent=True,
-            pad_inches=0,
-            dpi=128,
-            facecolor=self.fig.get_facecolor(),
+        if not HAS_PIL:
+            self.fig.savefig(
+                buf, format=format, dpi=self.dpi, facecolor=self.fig.get_facecolor()
+            )
+            buf.seek(0)
+            return buf
+
+        # Encode the raw RGBA canvas directly. Much cheaper than savefig.
+        self.canvas.draw()
+        w, h = self.canvas.get_width_height()
+        img = Image.frombuffer(
+            "RGBA", (w, h), self.canvas.buffer_rgba(), "raw", "RGBA", 0, 1
         )
-        self.ax.clear()
+        if format == "png":
+            img.save(buf, format="PNG", compress_level=1)
+        else:
+            img.convert("RGB").save(buf, format="JPEG", quality=90)
         buf.seek(0)
         return buf
 
     def close(self):
-        plt.close(self.fig)
+        self.fig.clear()
+
+
+class RendererPool:
+    """
+    Keeps idle renderers by size, so plot nodes don't create a new figure every time they are created or resized.
+    """
+
+    def __init__(self, max_idle: int = 8):
+        self.max_idle = max_idle
+        self._idle: dict[tuple[int, int], list[Renderer]] = defaultdict(list)
+        self._n_idle = 0
+        self._lock = Lock()
+
+    def acquire(self, width: int, height: int) -> Renderer:
+        with self._lock:
+            idle = self._idle[(width, height)]
+            if len(idle) > 0:
+                self._n_idle -= 1
+                return idle.pop()
+        return Renderer(width, height)
+
+    def release(self, renderer: Renderer):
+        renderer.clear()
+        with self._lock:
+            if self._n_idle >= self.max_idle:
+                renderer.close()
+                return
+            self._idle[(renderer.width, renderer.height)].append(renderer)
+            self._n_idle += 1
+
+    def resize(self, renderer: Renderer | None, width: int, height: int) -> Renderer:
+        """
+        Returns a renderer of the given size, releasing the old one if its size is different.
+        """
+        if renderer is not None:
+            if renderer.width == width and renderer.height == height:
+                return renderer
+            self.release(renderer)
+        return self.acquire(width, height)
+
+
+renderer_pool = RendererPool()
+
+
+class RenderWorker:
+    """
+    Runs drawing and encoding jobs on a dedicated thread so plots don't block the runner.
+
+    Jobs are keyed by their owner (usually a node). If an owner submits a new job before its previous one
+    has started, the previous job is dropped, so a fast stream only renders its latest frame.
+    """
+
+    def __init__(self):
+        self._jobs: dict[
+            object, tuple[Callable[[], None], Callable[[Exception], None] | None]
+        ] = {}
+        self._cond = Condition()
+        self._thread: Thread | None = None
+
+    def submit(
+        self,
+        owner: object,
+        job: Callable[[], None],
+        exception_callback: Callable[[Exception], None] | None = None,
+    ):
+        with self._cond:
+            self._jobs.pop(owner, None)
+            self._jobs[owner] = (job, exception_callback)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="render", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while len(self._jobs) == 0:
+                    self._cond.wait()
+                owner = next(iter(self._jobs))
+                job, exception_callback = self._jobs.pop(owner)
+            try:
+                job()
+            except Exception as e:
+                if exception_callback is None:
+                    logger.exception(f"Render job of {owner} failed")
+                else:
+                    exception_callback(e)
+
+
+render_worker = RenderWorker()
+
+
+def parse_index(slice_string: str) -> tuple:
+    """
+    Turn a slice string like ``0,:,1:3`` into an index tuple that works for both numpy arrays and torch tensors.
+    """
+    index = eval(f"np.s_[{slice_string}]", {"np": np})
+    if not isinstance(index, tuple):
+        index = (index,)
+    return index
+
+
+def to_uint8_frame(
+    data, lut: np.ndarray, vmin: float | None = None, vmax: float | None = None
+) -> np.ndarray:
+    """
+    Convert [h,w] or [c,h,w] data to a [h,w,3] or [h,w,4] uint8 frame with vectorized ops.
+    2D data is normalized to [vmin,vmax] (its own range if not given) and colored with the lookup table.
+    Torch tensors are converted on their own device, so only the uint8 frame is copied to the CPU.
+    """
+    is_torch = is_torch_tensor(data)
+    if is_torch:
+        import torch
+
+    if data.ndim == 3 and data.shape[0] == 1:
+        data = data[0]
+
+    if data.ndim == 2:
+        if is_torch:
+            data = data.float()
+        else:
+            data = data.astype(np.float32)
+        lo = float(data.min()) if vmin is None else vmin
+        hi = float(data.max()) if vmax is None else vmax
+        scale = 255 / (hi - lo) if hi > lo else 0.0
+        if is_torch:
+            idx = ((data - lo) * scale).clamp_(0, 255).to(torch.uint8).cpu().numpy()
+        else:
+            data -= lo
+            data *= scale
+            idx = np.clip(data, 0, 255, out=data).astype(np.uint8)
+        return lut[idx]
+
+    if is_torch:
+        if data.is_floating_point():
+            data = (data.clamp(0, 1) * 255).to(torch.uint8)
+        elif data.dtype != torch.uint8:
+            data = data.clamp(0, 255).to(torch.uint8)
+        return data.permute(1, 2, 0).contiguous().cpu().numpy()
+
+    if np.issubdtype(data.dtype, np.floating):
+        data = (np.clip(data, 0, 1) * 255).astype(np.uint8)
+    elif data.dtype != np.uint8:
+        data = np.clip(data, 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(data.transpose(1, 2, 0))
+
+
+class ImageEncoder:
+    """
+    Encodes uint8 frames to jpg or png. Colormap lookup tables and the output buffer are reused across frames,
+    and a frame identical to the previous one is not encoded again.
+    """
+
+    def __init__(self):
+        self._luts: dict[str, np.ndarray] = {}
+        self._buf = io.BytesIO()
+        self._last_frame: np.ndarray | None = None
+        self._last_settings: tuple | None = None
+        self.last_encoded: bytes | None = None
+
+    def get_lut(self, cmap: str) -> np.ndarray:
+        if cmap not in self._luts:
+            colors = import_matplotlib().colormaps[cmap](np.linspace(0, 1, 256))[:, :3]
+            self._luts[cmap] = np.round(colors * 255).astype(np.uint8)
+        return self._luts[cmap]
+
+    def reset(self):
+        self._last_frame = None
+        self._last_settings = None
+        self.last_encoded = None
+
+    def encode(
+        self, frame: np.ndarray, format: str, size: tuple[int, int]
+    ) -> bytes | None:
+        """
+        Returns the encoded image, or None if the frame and settings are the same as the previous call.
+        """
+        settings = (format, size)
+        if (
+            self._last_frame is not None
+            and self._last_settings == settings
+            and self._last_frame.shape == frame.shape
+            and np.array_equal(self._last_frame, frame)
+        ):
+            return None
+        if self._last_frame is None or self._last_frame.shape != frame.shape:
+            self._last_frame = frame.copy()
+        else:
+            np.copyto(self._last_frame, frame)
+        self._last_settings = settings
+
+        img = fit_image(Image.fromarray(frame), size)
+        self._buf.seek(0)
+        self._buf.truncate()
+        if format == "png":
+            img.save(self._buf, format="PNG", compress_level=1)
+        else:
+            if img.mode == "RGBA":
+                img = img.convert("RGB")
+            img.save(self._buf, format="JPEG", quality=90)
+        self.last_encoded = self._buf.getvalue()
+        return self.last_encoded
+
+
+def fit_image(img: "Image.Image", size: tuple[int, int]) -> "Image.Image":
+    """
+    Resize the image to fit in size while keeping its aspect ratio. Upscaling keeps the pixels sharp like imshow does.
+    """
+    width, height = size
+    scale = min(width / img.width, height / img.height)
+    new_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    if new_size == img.size:
+        return img
+    resample = Image.Resampling.NEAREST if scale > 1 else Image.Resampling.BILINEAR
+    return img.resize(new_size, resample)
 
 
 class ShowImageNode(Node):
@@ -247,13 +504,22 @@ class ShowImageNode(Node):
         self.format = self.add_attribute(
             "format", StringTopic, "jpg", editor_type="options", options=["jpg", "png"]
         )
+        self.preprocess_on_device = self.add_attribute(
+            "preprocess on device", GenericTopic[bool], True, editor_type="toggle"
+        )
+
+    def init_node(self):
+        super().init_node()
+        # acquired lazily so preview nodes don't hold figures
+        self.renderer: Renderer | None = None
+        self.encoder = ImageEncoder()
+        # (shape, slice text) -> index. Streams of same-shaped frames only resolve the layout once.
+        self._index_cache: dict[tuple[tuple[int, ...], str], tuple] = {}
 
     @param()
     def param(self, width: int = 256, height: int = 256):
-        if hasattr(self, "renderer"):
-            self.renderer.set_size(width, height)
-        else:
-            self.renderer = Renderer(width, height)
+        self.width = width
+        self.height = height
 
     def find_valid_slice(self, data: np.ndarray) -> str | None:
         if data.ndim == 2:
@@ -285,63 +551,123 @@ class ShowImageNode(Node):
         return False
 
     def preprocess_data(self, data):
-        if HAS_TORCH and isinstance(data, torch.Tensor):
-            data = data.detach().cpu().numpy()
-
+        """
+        Slice the data to [h,w] or [c,h,w]. Torch tensors stay on their device if `preprocess on device` is enabled.
+        """
         if isinstance(data, list):
             data = np.array(
                 data
             )  # stack them into array to be compatible with the next if statement
 
-        if isinstance(data, np.ndarray):
-            # Ignore all dimensions with size 1 (except last 2 dimensions)
-            while data.ndim > 2 and data.shape[0] == 1:
-                data = data[0]
-            # Let user specify which image to display
-            slice_string = self.slice.text.get()
+        if is_torch_tensor(data):
+            data = data.detach()
+            if not self.preprocess_on_device.get() or not HAS_PIL:
+                data = data.cpu().numpy()
+        elif not isinstance(data, np.ndarray):
+            return data
 
-            unsliced_data = data
-            try:
-                data = eval(f"unsliced_data[{slice_string}]", globals(), locals())
-            except Exception:
-                self.slice.text.set(":")
-                pass
-            if data.ndim == 2:
-                pass
-            else:
-                slice_string = self.find_valid_slice(unsliced_data)
-                if slice_string is None:
-                    raise ValueError(f"Cannot display image with shape {data.shape}")
-                data = eval(f"unsliced_data[{slice_string}]", globals(), locals())
-                if not self.is_valid_image(data):
-                    raise ValueError(f"Cannot display image with shape {data.shape}")
-                self.slice.text.set(slice_string)
+        return data[self.get_index(tuple(data.shape))]
 
-        return data
+    def get_index(self, shape: tuple[int, ...]) -> tuple:
+        key = (shape, self.slice.text.get())
+        if key not in self._index_cache:
+            if len(self._index_cache) > 32:
+                self._index_cache.clear()
+            self._index_cache[key] = self.find_index(shape)
+        return self._index_cache[key]
+
+    def find_index(self, shape: tuple[int, ...]) -> tuple:
+        """
+        Decide which image to display for data of the given shape. Only the shape is needed, so a zero-size
+        placeholder array is sliced instead of the data.
+        """
+        data = np.broadcast_to(np.empty((), dtype=np.uint8), shape)
+        # Ignore all dimensions with size 1 (except last 2 dimensions)
+        n_squeezed = 0
+        while data.ndim > 2 and data.shape[0] == 1:
+            data = data[0]
+            n_squeezed += 1
+
+        # Let user specify which image to display
+        slice_string = self.slice.text.get()
+        unsliced_data = data
+        try:
+            index = parse_index(slice_string)
+            data = unsliced_data[index]
+        except Exception:
+            index = ()
+            slice_string = ":"
+
+        if data.ndim != 2:
+            slice_string = self.find_valid_slice(unsliced_data)
+            if slice_string is None:
+                raise ValueError(f"Cannot display image with shape {shape}")
+            index = parse_index(slice_string)
+            data = unsliced_data[index]
+            if not self.is_valid_image(data):
+                raise ValueError(f"Cannot display image with shape {shape}")
+
+        if slice_string != self.slice.text.get():
+            self.slice.text.set(slice_string)
+        return (0,) * n_squeezed + index
 
     @func()
     def img(self, data):
         data = self.preprocess_data(data)
-        # use plt to convert to jpg
 
+        if HAS_PIL:
+            frame = to_uint8_frame(
+                data,
+                self.encoder.get_lut(self.cmap.get()),
+                vmin=self.vmin.get() if self.use_vmin.get() else None,
+                vmax=self.vmax.get() if self.use_vmax.get() else None,
+            )
+            encoded = self.encoder.encode(
+                frame, self.format.get(), (self.width, self.height)
+            )
+            if encoded is not None:  # None means the frame didn't change
+                self.img_control.set(encoded)
+            return io.BytesIO(self.encoder.last_encoded)
+
+        # Without PIL, fall back to rendering with matplotlib
         # chw -> hwc
         if data.ndim == 3:
             data = data.transpose(1, 2, 0)
-        self.renderer.ax.imshow(
-            data,
-            cmap=self.cmap.get(),
-            vmin=self.vmin.get() if self.use_vmin.get() else None,
-            vmax=self.vmax.get() if self.use_vmax.get() else None,
-        )
+        self.renderer = renderer_pool.resize(self.renderer, self.width, self.height)
+        self.draw_image(data)
         buf = self.renderer.render(format=self.format.get())
         self.img_control.set(buf)
         return buf
 
+    def draw_image(self, data):
+        """
+        Update the image artist in place if the shape is unchanged. Otherwise, recreate it.
+        """
+        assert self.renderer is not None
+        vmin = self.vmin.get() if self.use_vmin.get() else None
+        vmax = self.vmax.get() if self.use_vmax.get() else None
+        image = self.renderer.owner_state.get("image")
+        if image is not None and image.get_array().shape == data.shape:
+            image.set_data(data)
+            image.set_cmap(self.cmap.get())
+            if data.ndim == 2:
+                image.set_clim(
+                    vmin if vmin is not None else data.min(),
+                    vmax if vmax is not None else data.max(),
+                )
+        else:
+            self.renderer.clear()
+            self.renderer.owner_state["image"] = self.renderer.ax.imshow(
+                data, cmap=self.cmap.get(), vmin=vmin, vmax=vmax
+            )
+
     def input_edge_removed(self, edge: Edge, port: InputPort):
+        self.encoder.reset()
         self.img_control.set(None)
 
     def destroy(self):
-        self.renderer.close()
+        if self.renderer is not None:
+            renderer_pool.release(self.renderer)
         return super().destroy()
 
 
@@ -354,12 +680,14 @@ class BarPlotNode(Node):
         self.img = self.add_image_control(name="img")
         self.in_port = self.add_in_port("data", 64, "")
 
+    def init_node(self):
+        super().init_node()
+        self.renderer: Renderer | None = None
+
     @param()
     def param(self, width: int = 256, height: int = 256):
-        if hasattr(self, "renderer"):
-            self.renderer.set_size(width, height)
-        else:
-            self.renderer = Renderer(width, height)
+        self.width = width
+        self.height = height
 
     def port_activated(self, port: InputPort):
         self.run(self.render, data=port.get())
@@ -367,18 +695,46 @@ class BarPlotNode(Node):
     def render(self, data):
         if isinstance(data, tuple):
             data = list(data)
-        data = to_numpy(data)
+        # copy the data because it's drawn later in the render thread
+        data = np.array(to_numpy(data), dtype=float)
         while data.ndim > 1 and data.shape[0] == 1:
             data = data[0]
         if data.ndim != 1:
             raise ValueError(f"Cannot plot with shape {data.shape}")
-        self.renderer.ax.bar(range(len(data)), data * 50)
+        render_worker.submit(
+            self,
+            lambda: self.draw(data * 50, self.width, self.height),
+            exception_callback=self.print_exception,
+        )
+
+    def draw(self, heights, width, height):
+        if self.is_destroyed():
+            return
+        self.renderer = renderer_pool.resize(self.renderer, width, height)
+        bars = self.renderer.owner_state.get("bars")
+        if bars is not None and len(bars) == len(heights):
+            for rect, h in zip(bars, heights):
+                rect.set_height(h)
+            self.renderer.ax.relim()
+            self.renderer.ax.autoscale_view()
+        else:
+            self.renderer.clear()
+            self.renderer.owner_state["bars"] = self.renderer.ax.bar(
+                range(len(heights)), heights
+            )
         buf = self.renderer.render()
-        self.img.set(buf)
+        if not self.is_destroyed():  # it may have been destroyed while drawing
+            self.img.set(buf)
         buf.close()
 
+    def _release_renderer(self):
+        if self.renderer is not None:
+            renderer_pool.release(self.renderer)
+            self.renderer = None
+
     def destroy(self):
-        self.renderer.close()
+        # Jobs run one at a time, so this runs after a draw in progress and releases the renderer it ended up with
+        render_worker.submit(self, self._release_renderer)
         return super().destroy()
 
 
@@ -392,12 +748,14 @@ class ScatterPlotNode(Node):
         self.slice = self.add_text_control(label="slice: ", name="slice", text=":")
         self.in_port = self.add_in_port("data", 64, "")
 
+    def init_node(self):
+        super().init_node()
+        self.renderer: Renderer | None = None
+
     @param()
     def param(self, width: int = 256, height: int = 256):
-        if hasattr(self, "renderer"):
-            self.renderer.set_size(width, height)
-        else:
-            self.renderer = Renderer(width, height)
+        self.width = width
+        self.height = height
 
     def edge_activated(self, edge: Edge, port: InputPort):
         if self.in_port.is_all_ready():
@@ -411,7 +769,7 @@ class ScatterPlotNode(Node):
         return None
 
     def preprocess_data(self, data):
-        if HAS_TORCH and isinstance(data, torch.Tensor):
+        if is_torch_tensor(data):
             data = data.detach().cpu().numpy()
 
         if isinstance(data, np.ndarray):
@@ -442,36 +800,64 @@ class ScatterPlotNode(Node):
     def update_image(self, data):
         if isinstance(data, list):
             data = np.array(data)
+        # copy the points because they are drawn later in the render thread
+        points: list[np.ndarray] = []
         for d in data:
             if len(d.shape) == 3:
                 for slice in d:
                     slice = self.preprocess_data(slice)
-                    self.renderer.ax.scatter(slice[:, 0], slice[:, 1], alpha=0.5)
+                    points.append(np.array(slice[:, :2], dtype=float))
             else:
                 d = self.preprocess_data(d)
-                self.renderer.ax.scatter(d[:, 0], d[:, 1], alpha=0.5)
+                points.append(np.array(d[:, :2], dtype=float))
+
+        render_worker.submit(
+            self,
+            lambda: self.draw(points, self.width, self.height),
+            exception_callback=self.print_exception,
+        )
 
+    def draw(self, points: list[np.ndarray], width, height):
+        if self.is_destroyed():
+            return
+        self.renderer = renderer_pool.resize(self.renderer, width, height)
+        collections = self.renderer.owner_state.get("collections")
+        if collections is not None and len(collections) == len(points):
+            for collection, p in zip(collections, points):
+                collection.set_offsets(p)
+        else:
+            self.renderer.clear()
+            self.renderer.owner_state["collections"] = [
+                self.renderer.ax.scatter(p[:, 0], p[:, 1], alpha=0.5) for p in points
+            ]
         buf = self.renderer.render((-4, 4), (-4, 4))
-        self.img.set(buf)
+        if not self.is_destroyed():  # it may have been destroyed while drawing
+            self.img.set(buf)
         buf.close()
 
     def input_edge_removed(self, edge: Edge, port: InputPort):
         self.img.set(None)
 
+    def _release_renderer(self):
+        if self.renderer is not None:
+            renderer_pool.release(self.renderer)
+            self.renderer = None
+
     def destroy(self):
-        self.renderer.close()
+        # Jobs run one at a time, so this runs after a draw in progress and releases the renderer it ended up with
+        render_worker.submit(self, self._release_renderer)
         return super().destroy()
 
 
 def to_list(data) -> list:
     if ndarray and isinstance(data, ndarray):
         data = data.tolist()
-    elif Tensor and isinstance(data, Tensor):
+    elif is_torch_tensor(data):
         data = data.detach().cpu().numpy().tolist()
     elif isinstance(data, list):
         if len(data) == 0:
             return []
-        elif Tensor and isinstance(data[0], Tensor):
+        elif is_torch_tensor(data[0]):
             data = [float(d.detach().cpu()) for d in data]  # type: ignore
         elif ndarray and isinstance(data[0], ndarray):
             data = [float(d) for d in data]
@@ -1,4 +1,8 @@
-from grapycal import SliderControl, InputPort, main_store, Node
+import threading
+import time
+from collections import deque
+
+from grapycal import SliderControl, InputPort, main_store, Node, StringTopic, param
 
 
 class ClockNode(Node):
@@ -31,3 +35,131 @@ class ClockNode(Node):
 
     def tick(self):
         self.tick_port.push(None)
+
+
+class PreciseClockNode(Node):
+    """
+    Ticks at `rate` Hz from a dedicated timer thread, for rates up to about 1 kHz.
+
+    The timer sleeps until `spin_ms` milliseconds before each deadline and then busy-waits for the rest, which is
+    precise but keeps a CPU core busy for that time. With `spin_ms` = 0 it only sleeps, which costs no CPU but is
+    late by the sleep precision of the OS (tens of microseconds to a millisecond). Deadlines don't drift.
+    Ticks are sent to the runner directly. If the runner hasn't handled the previous tick yet, or deadlines were
+    missed, the ticks are collapsed into one. The ``tick`` port outputs how many ticks it represents, normally 1.
+
+    The jitter (how late each tick fired) is shown in the ``stats`` attribute.
+    """
+
+    category = "procedural"
+
+    N_LATENESS_SAMPLES = 1000
+
+    def build_node(self):
+        self.label_topic.set("Precise Clock")
+        self.tick_port = self.add_out_port("tick")
+        self.stats = self.add_attribute(
+            "stats",
+            StringTopic,
+            "",
+            is_stateful=False,
+            editor_type="text",
+            restore_from=None,
+        )
+
+    def init_node(self):
+        self._lock = threading.Lock()
+        self._pending_ticks = 0
+        self._tick_scheduled = False
+        self._tick_generation = 0  # the runner generation when the tick was scheduled
+        self._n_ticks = 0
+        self._n_collapsed = 0
+        self._lateness: deque[float] = deque(maxlen=self.N_LATENESS_SAMPLES)
+        self._max_lateness = 0.0
+        self._stop_event = threading.Event()
+        if self.is_preview.get():
+            return
+        threading.Thread(
+            target=self._timer_loop, daemon=True, name=f"precise_clock_{self.get_id()}"
+        ).start()
+        main_store.clock.add_listener(self._update_stats, 1)
+
+    @param()
+    def param(self, rate: float = 100, spin_ms: float = 0.2):
+        self.interval = 1 / min(max(rate, 0.01), 10000)
+        self.spin_time = max(spin_ms, 0) / 1000
+
+    def _timer_loop(self):
+        next_time = time.perf_counter() + self.interval
+        while not self._stop_event.is_set():
+            remaining = next_time - time.perf_counter()
+            if remaining > self.spin_time:
+                self._stop_event.wait(remaining - self.spin_time)
+                continue
+            while time.perf_counter() < next_time:
+                time.sleep(0)  # yield the GIL while waiting for the deadline
+            interval = self.interval
+            lateness = time.perf_counter() - next_time
+            missed = int(lateness // interval)
+            next_time += (missed + 1) * interval
+            self._on_tick(1 + missed, lateness)
+
+    def _on_tick(self, count: int, lateness: float):
+        with self._lock:
+            self._n_ticks += count
+            self._lateness.append(lateness)
+            self._max_lateness = max(self._max_lateness, lateness)
+            self._pending_ticks += count
+            generation = main_store.runner.get_generation()
+            # If the runner dropped tasks since the tick was scheduled, it may never be delivered
+            if self._tick_scheduled and self._tick_generation == generation:
+                # The runner is behind, so these ticks go with the one already scheduled
+                self._n_collapsed += count
+                return
+            self._n_collapsed += count - 1
+            self._tick_scheduled = True
+            self._tick_generation = generation
+        self.run(self._deliver_tick)
+
+    def _deliver_tick(self):
+        with self._lock:
+            count = self._pending_ticks
+            self._pending_ticks = 0
+            self._tick_scheduled = False
+        # The count is 0 if another delivery, scheduled after the runner dropped tasks, took the ticks first
+        if count > 0:
+            self.tick_port.push(count)
+
+    def get_stats(self) -> dict:
+        """
+        The number of ticks, how many were collapsed into other ticks, and the lateness of recent ticks in seconds.
+        """
+        with self._lock:
+            lateness = sorted(self._lateness)
+            n_ticks = self._n_ticks
+            n_collapsed = self._n_collapsed
+            max_lateness = self._max_lateness
+        if len(lateness) == 0:
+            return {"ticks": n_ticks, "collapsed": n_collapsed}
+        return {
+            "ticks": n_ticks,
+            "collapsed": n_collapsed,
+            "mean_lateness": sum(lateness) / len(lateness),
+            "p99_lateness": lateness[min(int(len(lateness) * 0.99), len(lateness) - 1)],
+            "max_lateness": max_lateness,
+        }
+
+    def _update_stats(self):
+        stats = self.get_stats()
+        if "mean_lateness" not in stats:
+            return
+        self.stats.set(
+            f"{stats['ticks']} ticks, {stats['collapsed']} collapsed, jitter mean "
+            f"{stats['mean_lateness'] * 1000:.3f} ms, p99 {stats['p99_lateness'] * 1000:.3f} ms, "
+            f"max {stats['max_lateness'] * 1000:.3f} ms"
+        )
+
+    def destroy(self):
+        self._stop_event.set()
+        if not self.is_preview.get():
+            main_store.clock.remove_listener(self._update_stats)
+        return super().destroy()
@@ -1,6 +1,88 @@
-from typing import Iterable
+import itertools
+import random
+from typing import Any, Iterable, Iterator
+
+from grapycal import (
+    Node,
+    param,
+    Edge,
+    InputPort,
+    SourceNode,
+    StringTopic,
+    IntTopic,
+    is_torch_tensor,
+)
+from grapycal.extension_api.utils import has_lib_checker, is_numpy_array
+
+
+def _random_permutation(n: int):
+    """
+    A random order of the indices 0..n-1. With numpy it's a compact int array instead of n Python ints.
+    """
+    if has_lib_checker.has_lib("numpy"):
+        import numpy as np
+
+        return np.random.permutation(n)
+    return random.sample(range(n), n)
+
+
+def _take(sequence: Any, indices) -> Any:
+    if is_numpy_array(sequence):
+        return sequence[indices]
+    if is_torch_tensor(sequence):
+        import torch
 
-from grapycal import Node, param, Edge, InputPort, SourceNode, StringTopic
+        return sequence[torch.as_tensor(indices)]
+    return [sequence[i] for i in indices]
+
+
+def _iterate_sequence(sequence: Any, chunk_size: int, shuffle: bool) -> Iterator:
+    """
+    Iterates by indexing, so numpy arrays and torch tensors are not converted to lists. Chunks of arrays and tensors
+    are views when not shuffled.
+    """
+    n = len(sequence)
+    if not shuffle:
+        if chunk_size == 1:
+            for i in range(n):
+                yield sequence[i]
+        else:
+            for start in range(0, n, chunk_size):
+                yield sequence[start : start + chunk_size]
+        return
+
+    order = _random_permutation(n)
+    if chunk_size == 1:
+        for i in order:
+            yield sequence[int(i)]
+    else:
+        for start in range(0, n, chunk_size):
+            yield _take(sequence, order[start : start + chunk_size])
+
+
+def _is_indexable(iterable: Any) -> bool:
+    """
+    Whether indexing the iterable with 0..len-1 gives its items. Not true in general for objects with __len__ and
+    __getitem__, e.g. mappings or pandas objects, which are iterated with iter() instead.
+    """
+    return (
+        isinstance(iterable, (list, tuple, range))
+        or is_numpy_array(iterable)
+        or is_torch_tensor(iterable)
+    )
+
+
+def _iterate(iterable: Iterable, chunk_size: int, shuffle: bool) -> Iterator:
+    if _is_indexable(iterable):
+        return _iterate_sequence(iterable, chunk_size, shuffle)
+    if shuffle:
+        # Other iterables, such as generators, have to be materialized to be shuffled
+        iterable = list(iterable)
+        random.shuffle(iterable)
+    if chunk_size == 1:
+        return iter(iterable)
+    iterator = iter(iterable)
+    return iter(lambda: list(itertools.islice(iterator, chunk_size)), [])
 
 
 class ForNode(Node):
@@ -9,6 +91,10 @@ class ForNode(Node):
 
     Each item is pushed to the ``item`` port in order.
 
+    With ``chunk size`` larger than 1, chunks of items are pushed instead: slices of lists and tuples, views of numpy
+    arrays or torch tensors, and lists of items for other iterables. Arrays and tensors are iterated by indexing, so
+    they are never converted to lists.
+
     Equivalent to a for loop in Python.
     """
 
@@ -27,6 +113,9 @@ class ForNode(Node):
             init_value="No",
             options=["No", "Yes"],
         )
+        self.chunk_size = self.add_attribute(
+            "chunk size", IntTopic, editor_type="int", init_value=1
+        )
 
     def init_node(self):
         self.iterator: Iterable | None = None
@@ -36,12 +125,11 @@ class ForNode(Node):
 
     def task(self):
         iterable = self.iterable_port.get()
-        if self.shuffle.get() == "Yes":
-            import random
-
-            iterable = list(iterable)
-            random.shuffle(iterable)
-        self.iterator = iter(iterable)  # type: ignore
+        self.iterator = _iterate(
+            iterable,  # type: ignore
+            max(self.chunk_size.get(), 1),
+            self.shuffle.get() == "Yes",
+        )
         self.run(self.next, to_queue=False)
 
     def next(self):
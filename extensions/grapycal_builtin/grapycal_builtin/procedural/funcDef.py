@@ -1,7 +1,20 @@
+import contextvars
+import itertools
 from collections import defaultdict
-from typing import TYPE_CHECKING
-
-from grapycal import ListTopic, Node, StringTopic, Edge, InputPort, OutputPort
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable
+
+from grapycal import (
+    ListTopic,
+    Node,
+    StringTopic,
+    Edge,
+    InputPort,
+    OutputPort,
+    GenericTopic,
+    main_store,
+    run_inline,
+)
 
 from ..utils import find_next_valid_name
 
@@ -9,12 +22,49 @@ if TYPE_CHECKING:
     from grapycal_builtin import GrapycalBuiltin
 
 
+_call_ids = itertools.count()
+
+
+@dataclass
+class CallFrame:
+    """
+    One invocation of a graph-defined function.
+
+    The frame is held in a context variable while the function body runs. Node tasks run in a copy of the context of
+    the node that scheduled them, so the frame follows the data from the FuncInNode to the FuncOutNode. The result is
+    then routed to the caller of this invocation, even when several invocations are in flight or the function calls
+    itself.
+
+    The values arriving at the FuncOutNode are collected in the frame instead of being read from the edges later,
+    because the edges are shared by all invocations.
+    """
+
+    func_name: str
+    caller: "FuncCallNode"
+    # The context the call was made in. The result is pushed in it, so a recursive call returns into its parent frame.
+    context: contextvars.Context
+    call_id: int = field(default_factory=lambda: next(_call_ids))
+    done: bool = False
+    # Values that arrived at the FuncOutNode for this invocation, by port name
+    outputs: dict[str, Any] = field(default_factory=dict)
+
+
+current_frame: contextvars.ContextVar[CallFrame | None] = contextvars.ContextVar(
+    "current_frame", default=None
+)
+
+
 class FuncCallNode(Node):
     """
     A FuncCallNode represents a call to a specific function.
     Once you assign a function name to the FuncCallNode, Grapycal will search for a FuncInNode and a FuncOutNode existing
     in the workspace with the same function name. Then, its ports will be updated accroding to the function
     definition.
+
+    With ``inline`` on, the whole function body runs in a single runner task, with the nodes in it running one after
+    another instead of scheduling a task each (see run_inline). This is faster for small functions called often.
+    Loops in the body and recursive calls run in that task too, without growing the Python stack. The body is
+    resolved once and resolved again only after the graph changes.
     """
 
     ext: "GrapycalBuiltin"
@@ -32,6 +82,9 @@ class FuncCallNode(Node):
         self.expose_attribute(
             self.shape_topic, editor_type="options", options=["normal", "simple"]
         )
+        self.inline = self.add_attribute(
+            "inline", GenericTopic[bool], False, editor_type="toggle"
+        )
 
         # manually restore in_ports and out_ports
         if not self.is_new:
@@ -48,6 +101,8 @@ class FuncCallNode(Node):
         self.func_name.on_set.add_auto(self.on_func_name_changed_auto)
         self.ext.func_def_manager.calls.append(self.func_name.get(), self)
         self.label_topic.set(f" {self.func_name.get()}")
+        # (graph version, FuncInNode, FuncOutNode) -> the inline call, or None if the function can't be inlined
+        self._inline_cache: tuple[tuple, Callable | None] | None = None
 
     def on_func_name_changed(self, old, new):
         self.label_topic.set(f" {new}")
@@ -107,24 +162,80 @@ class FuncCallNode(Node):
             if not port.is_all_ready():
                 return
 
-        self.run(self.end_function, to_queue=False)
-        self.run(self.start_function, to_queue=False)
+        # Read the inputs now, since another invocation may overwrite them before the task runs
+        inputs = {port.name.get(): port.get() for port in self.in_ports}
+        frame = CallFrame(self.func_name.get(), self, contextvars.copy_context())
+        if self.inline.get():
+            inline_call = self._get_inline_call()
+            if inline_call is not None:
+                self.run(inline_call, to_queue=False, frame=frame, inputs=inputs)
+                return
+        # Pushed to the stack first, so it runs after the body and produces the result or the missing output error
+        self.run(self.end_function, to_queue=False, frame=frame)
+        self.run(self.start_function, to_queue=False, frame=frame, inputs=inputs)
 
-    def start_function(self):
+    def start_function(self, frame: CallFrame, inputs: dict):
         if self.is_destroyed():
             return
-        inputs = {}
-        for port in self.in_ports:
-            inputs[port.name.get()] = port.get()
-
-        self.ext.func_def_manager.ins[self.func_name.get()].start_function(inputs)
+        if frame.func_name not in self.ext.func_def_manager.ins:
+            return
+        token = current_frame.set(frame)
+        try:
+            self.ext.func_def_manager.ins[frame.func_name].start_function(inputs)
+        finally:
+            current_frame.reset(token)
 
-    def end_function(self):
+    def end_function(self, frame: CallFrame):
         if self.is_destroyed():
             return
-        if self.func_name.get() not in self.ext.func_def_manager.outs:
+        if frame.func_name not in self.ext.func_def_manager.outs:
             return  # assume its intended to be a void function
-        self.ext.func_def_manager.outs[self.func_name.get()].end_function(self)
+        self.ext.func_def_manager.outs[frame.func_name].end_function(frame)
+
+    def _get_inline_call(self) -> Callable[[CallFrame, dict], None] | None:
+        name = self.func_name.get()
+        func_in = self.ext.func_def_manager.ins.get(name)
+        func_out = self.ext.func_def_manager.outs.get(name)
+        key = (main_store.graph_version, func_in, func_out)
+        if self._inline_cache is None or self._inline_cache[0] != key:
+            self._inline_cache = (key, self._compile_inline(func_in, func_out))
+        return self._inline_cache[1]
+
+    def _compile_inline(
+        self, func_in: "FuncInNode | None", func_out: "FuncOutNode | None"
+    ) -> Callable[[CallFrame, dict], None] | None:
+        """
+        Makes a callable that runs the function body in the current task. Returns None if the body can't be
+        inlined because the FuncOutNode is not reachable from the FuncInNode, so a result would never come.
+        """
+        if func_in is None or func_out is None:
+            return None
+        if func_out not in _downstream(func_in):
+            return None
+
+        def inline_call(frame: CallFrame, inputs: dict):
+            if self.is_destroyed() or func_in.is_destroyed():
+                return
+
+            def body():
+                token = current_frame.set(frame)
+                try:
+                    func_in.start_function(inputs)
+                finally:
+                    current_frame.reset(token)
+
+            def check_outputs():
+                # The whole body has run, so outputs that didn't arrive never will
+                if not func_out.is_destroyed():
+                    func_out.end_function(frame)
+
+            # Exceptions are reported on this node, instead of stopping the other tasks of the inline run
+            run_inline(
+                lambda: self._run_directly(body),
+                on_done=lambda: self._run_directly(check_outputs),
+            )
+
+        return inline_call
 
     def push_result(self, result: dict):
         for key, value in result.items():
@@ -135,6 +246,23 @@ class FuncCallNode(Node):
         return super().destroy()
 
 
+def _downstream(source: Node) -> set[Node]:
+    """
+    Returns the nodes reachable from source through edges, including source.
+    """
+    visited = {source}
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        for port in node.out_ports:
+            for edge in port.edges:
+                head = edge.get_head().node
+                if head not in visited:
+                    visited.add(head)
+                    stack.append(head)
+    return visited
+
+
 class FuncInNode(Node):
     ext: "GrapycalBuiltin"
     category = "function"
@@ -282,6 +410,8 @@ class FuncOutNode(Node):
 
         if not self.is_preview.get():
             self.ext.func_def_manager.add_out(self.func_name.get(), self)
+        # (graph version, FuncInNode) -> names of the outputs fed by the function body
+        self._body_outputs_cache: tuple[tuple, set[str]] | None = None
 
     def post_create(self):
         if not self.is_preview.get():
@@ -315,16 +445,58 @@ class FuncOutNode(Node):
             for call in self.ext.func_def_manager.calls.get(self.func_name.get()):
                 call.update_output_ports()
 
-    def end_function(self, caller: FuncCallNode):
-        for port in self.in_ports:
-            if not port.is_all_ready():
-                self.print_exception(
-                    RuntimeError(f"Output data missing for {port.name.get()}")
-                )
-                return
-        result = {key: self.get_in_port(key).get() for key in self.ins.get()}
-        caller.push_result(result)
+    def edge_activated(self, edge: Edge, port: InputPort):
+        frame = current_frame.get()
+        if frame is None or frame.done or frame.func_name != self.func_name.get():
+            return  # not activated by a call to this function
+        frame.outputs[port.name.get()] = edge.get()
+        for key in self._get_body_outputs():
+            if key not in frame.outputs:
+                return  # wait for the value of this invocation
+        self.end_function(frame)
+
+    def end_function(self, frame: CallFrame):
+        """
+        Pushes the result of the invocation to its caller, or reports the outputs that didn't arrive.
+
+        Called when the outputs fed by the function body have arrived, or after the body has run. The other outputs
+        are read from their controls or edges, like the body would have read them.
+        """
+        if frame.done:
+            return
+        frame.done = True
+        body_outputs = self._get_body_outputs()
+        for key in self.ins.get():
+            if key in frame.outputs:
+                continue
+            port = self.get_in_port(key)
+            if key not in body_outputs and port.is_all_ready():
+                # From a control or from outside the body
+                frame.outputs[key] = port.get()
+                continue
+            self.print_exception(RuntimeError(f"Output data missing for {key}"))
+            return
+        result = {key: frame.outputs[key] for key in self.ins.get()}
         self.flash_running_indicator()
+        if not frame.caller.is_destroyed():
+            frame.context.run(frame.caller.push_result, result)
+
+    def _get_body_outputs(self) -> set[str]:
+        """
+        Returns the names of the outputs with an edge from the function body, i.e. from the FuncInNode or the nodes
+        downstream of it. Only these carry a value for each invocation.
+        """
+        func_in = self.ext.func_def_manager.ins.get(self.func_name.get())
+        key = (main_store.graph_version, func_in)
+        if self._body_outputs_cache is None or self._body_outputs_cache[0] != key:
+            body = _downstream(func_in) if func_in is not None else set()
+            names = set()
+            for name in self.ins.get():
+                for edge in self.get_in_port(name).edges:
+                    if edge.get_tail().node in body:
+                        names.add(name)
+            self._body_outputs_cache = (key, names)
+        return self._body_outputs_cache[1]
 
     def destroy(self):
         if not self.is_preview.get():
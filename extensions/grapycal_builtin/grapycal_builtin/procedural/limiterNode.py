@@ -1,14 +1,48 @@
 import time
 from threading import Lock
+from typing import Any
 
-from grapycal import Node, param, Edge, InputPort, ClockTrait
+from grapycal import Node, param, Edge, InputPort, main_store
+
+
+class TokenBucket:
+    """
+    Allows on average `rate` events per second, with bursts of up to `capacity` events. Tokens are refilled from
+    monotonic timestamps when they are taken, so no periodic refill is needed.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.last_time = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.last_time) * self.rate
+        )
+        self.last_time = now
+
+    def try_take(self, now: float) -> bool:
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self, now: float) -> float:
+        self._refill(now)
+        return max(1 - self.tokens, 0) / self.rate
 
 
 class LimiterNode(Node):
-    category = "procedural"
+    """
+    Reduces the rate of a stream. The latest value is pushed every `reduce_factor` inputs, or when `time_span`
+    seconds have passed since the last push. Set either one to 0 to disable it. The time span is timed by the
+    workspace clock, which has a resolution of 1 ms.
+    """
 
-    def define_traits(self):
-        return ClockTrait(self.tick, 0.1)
+    category = "procedural"
 
     def build_node(self):
         super().build_node()
@@ -23,6 +57,7 @@ class LimiterNode(Node):
         self.lock = Lock()
         self.counter = 0
         self.last_push_time = 0
+        self.timer_scheduled = False
 
     @param()
     def param(self, reduce_factor: int = 10, time_span: float = 0.2):
@@ -35,28 +70,273 @@ class LimiterNode(Node):
             self.counter += 1
             self.has_value = True
 
-            if self.reduce_factor == 0:
+            push = self.reduce_factor != 0 and self.counter >= self.reduce_factor
+            if push:
+                value = self._take_value()
+            elif self.time_span != 0 and not self.timer_scheduled:
+                # Instead of polling, wake up exactly when the time span has passed
+                self.timer_scheduled = True
+                delay = self.last_push_time + self.time_span - time.monotonic()
+                main_store.clock.call_later(self.on_timer, delay)
+        if push:
+            self.out_port.push(value)
+
+    def _take_value(self):
+        value = self.value
+        self.counter = 0
+        self.last_push_time = time.monotonic()
+        self.has_value = False
+        self.value = None
+        return value
+
+    def on_timer(self):
+        with self.lock:
+            self.timer_scheduled = False
+            if not self.has_value or self.time_span == 0:
                 return
-            if self.counter == self.reduce_factor:
-                self.counter = 0
-                self.last_push_time = time.time()
-                self.has_value = False
-                self.out_port.push(self.value)
-                self.value = None
-
-    def tick(self):
-        if not self.has_value:
+            delay = self.last_push_time + self.time_span - time.monotonic()
+            if delay > 0:
+                # pushed by reduce_factor in the meantime
+                self.timer_scheduled = True
+                main_store.clock.call_later(self.on_timer, delay)
+                return
+            value = self._take_value()
+        self.out_port.push(value)
+
+    def destroy(self):
+        main_store.clock.remove_listener(self.on_timer)
+        return super().destroy()
+
+
+class TokenBucketGate:
+    """
+    The leading/trailing logic of TokenBucketNode, without the clock, so it can be driven with any timestamps.
+
+    offer() and fire() return whether a value is pushed now, and the delay after which fire() should be called, or
+    None if no call is needed.
+    """
+
+    def __init__(self, bucket: TokenBucket, leading: bool, trailing: bool):
+        self.bucket = bucket
+        self.leading = leading
+        self.trailing = trailing
+        self.pending = None
+        self.has_pending = False
+        self.timer_scheduled = False
+
+    def offer(self, value, now: float) -> tuple[bool, float | None]:
+        if self.leading and not self.has_pending and self.bucket.try_take(now):
+            return True, None
+        if not self.trailing:
+            return False, None
+        self.pending = value
+        self.has_pending = True
+        if self.timer_scheduled:
+            return False, None
+        self.timer_scheduled = True
+        delay = self.bucket.time_until_token(now)
+        if not self.leading:
+            # The first value of a burst waits for one full interval
+            delay = max(delay, 1 / self.bucket.rate)
+        return False, delay
+
+    def fire(self, now: float) -> tuple[bool, Any, float | None]:
+        """
+        Returns whether the pending value is pushed, the value, and the delay of the next call.
+        """
+        self.timer_scheduled = False
+        if not self.has_pending:
+            return False, None, None
+        if not self.bucket.try_take(now):
+            self.timer_scheduled = True
+            return False, None, self.bucket.time_until_token(now)
+        value = self.pending
+        self.pending = None
+        self.has_pending = False
+        return True, value, None
+
+
+class Debouncer:
+    """
+    The logic of DebounceNode, without the clock. offer() and fire() are used like in TokenBucketGate.
+    """
+
+    def __init__(self, wait: float, leading: bool, trailing: bool):
+        self.wait = wait
+        self.leading = leading
+        self.trailing = trailing
+        self.pending = None
+        self.has_pending = False
+        self.in_burst = False
+        self.deadline = 0.0
+
+    def offer(self, value, now: float) -> tuple[bool, float | None]:
+        # Only the deadline moves on each value. The timer checks it when it fires, so a fast stream doesn't add a
+        # timer per value.
+        self.deadline = now + self.wait
+        push = self.leading and not self.in_burst
+        if not push and self.trailing:
+            self.pending = value
+            self.has_pending = True
+        if self.in_burst:
+            return push, None
+        self.in_burst = True
+        return push, self.wait
+
+    def fire(self, now: float) -> tuple[bool, Any, float | None]:
+        delay = self.deadline - now
+        if delay > 0:
+            return False, None, delay
+        self.in_burst = False
+        if not self.has_pending:
+            return False, None, None
+        value = self.pending
+        self.pending = None
+        self.has_pending = False
+        return True, value, None
+
+
+class TokenBucketNode(Node):
+    """
+    Base class of nodes that pass a stream through a token bucket.
+
+    With `leading`, a value is pushed immediately if a token is available. With `trailing`, the latest value that
+    couldn't be pushed is kept and pushed as soon as a token is available, so the last value of a burst is never lost.
+    Values that are neither pushed nor kept are dropped.
+
+    Trailing values are pushed by the workspace clock, which has a resolution of 1 ms.
+    """
+
+    category = "hidden"
+
+    def build_node(self):
+        super().build_node()
+        self.shape_topic.set("simple")
+        self.in_port = self.add_in_port("in", display_name="")
+        self.out_port = self.add_out_port("out", display_name="")
+
+    def init_node(self):
+        # The gate is set by the param of the subclass, which is called before init_node()
+        self.lock = Lock()
+
+    def set_gate(self, rate: float, capacity: float, leading: bool, trailing: bool):
+        bucket = TokenBucket(max(rate, 1e-9), capacity)
+        if not hasattr(self, "gate"):
+            self.gate = TokenBucketGate(bucket, leading, trailing)
             return
-        if self.time_span == 0:
+        # Keep the pending value when the params change
+        self.gate.bucket = bucket
+        self.gate.leading = leading
+        self.gate.trailing = trailing
+
+    def edge_activated(self, edge: Edge, port: InputPort):
+        value = edge.get()
+        with self.lock:
+            push, delay = self.gate.offer(value, time.monotonic())
+            if delay is not None:
+                main_store.clock.call_later(self.on_timer, delay)
+        if push:
+            self.out_port.push(value)
+
+    def on_timer(self):
+        with self.lock:
+            push, value, delay = self.gate.fire(time.monotonic())
+            if delay is not None:
+                main_store.clock.call_later(self.on_timer, delay)
+        if push:
+            self.out_port.push(value)
+
+    def destroy(self):
+        main_store.clock.remove_listener(self.on_timer)
+        return super().destroy()
+
+
+class RateLimiterNode(TokenBucketNode):
+    """
+    Lets through at most `rate` values per second on average, with bursts of up to `burst` values.
+    Trailing values are pushed by the workspace clock, which has a resolution of 1 ms.
+    """
+
+    category = "procedural"
+
+    def build_node(self):
+        super().build_node()
+        self.label_topic.set("Rate Limiter")
+
+    @param()
+    def param(
+        self,
+        rate: float = 10,
+        burst: int = 1,
+        leading: bool = True,
+        trailing: bool = True,
+    ):
+        self.set_gate(rate, burst, leading, trailing)
+
+
+class ThrottleNode(TokenBucketNode):
+    """
+    Lets through at most one value every `interval` seconds. Trailing values are pushed by the workspace clock, which
+    has a resolution of 1 ms, so intervals much shorter than that are not exact.
+    """
+
+    category = "procedural"
+
+    def build_node(self):
+        super().build_node()
+        self.label_topic.set("Throttle")
+
+    @param()
+    def param(self, interval: float = 0.1, leading: bool = True, trailing: bool = True):
+        self.set_gate(1 / max(interval, 1e-9), 1, leading, trailing)
+
+
+class DebounceNode(Node):
+    """
+    Waits until the stream has been quiet for `wait` seconds. With `trailing`, the last value is pushed then. With
+    `leading`, the first value of each burst is pushed immediately.
+
+    The wait is timed by the workspace clock, which has a resolution of 1 ms.
+    """
+
+    category = "procedural"
+
+    def build_node(self):
+        super().build_node()
+        self.label_topic.set("Debounce")
+        self.shape_topic.set("simple")
+        self.in_port = self.add_in_port("in", display_name="")
+        self.out_port = self.add_out_port("out", display_name="")
+
+    def init_node(self):
+        self.lock = Lock()
+
+    @param()
+    def param(self, wait: float = 0.2, leading: bool = False, trailing: bool = True):
+        if not hasattr(self, "debouncer"):
+            self.debouncer = Debouncer(wait, leading, trailing)
             return
+        self.debouncer.wait = wait
+        self.debouncer.leading = leading
+        self.debouncer.trailing = trailing
 
+    def edge_activated(self, edge: Edge, port: InputPort):
+        value = edge.get()
         with self.lock:
-            if (
-                self.value is not None
-                and time.time() - self.last_push_time > self.time_span
-            ):
-                self.counter = 0
-                self.last_push_time = time.time()
-                self.has_value = False
-                self.out_port.push(self.value)
-                self.value = None
+            push, delay = self.debouncer.offer(value, time.monotonic())
+            if delay is not None:
+                main_store.clock.call_later(self.on_timer, delay)
+        if push:
+            self.out_port.push(value)
+
+    def on_timer(self):
+        with self.lock:
+            push, value, delay = self.debouncer.fire(time.monotonic())
+            if delay is not None:
+                main_store.clock.call_later(self.on_timer, delay)
+        if push:
+            self.out_port.push(value)
+
+    def destroy(self):
+        main_store.clock.remove_listener(self.on_timer)
+        return super().destroy()
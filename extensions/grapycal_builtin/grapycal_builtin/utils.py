@@ -1,4 +1,4 @@
-from typing import Iterable
+from typing import Any, Callable, Iterable
 from typing import Dict
 from typing import List
 from typing import TypeVar
@@ -77,3 +77,37 @@ def find_next_valid_name(name: str, invalids: Iterable[str]):
         if new_name not in invalids:
             return new_name
         number += 1
+
+
+class Namespace:
+    """
+    The variables a node runs its code against.
+
+    When shared, it's the variables of the running module, like a notebook. When isolated, the node has its own small
+    dict: the names in ``imports`` are copied in from the shared variables before each run, and export() copies the
+    names in ``exports`` back. Isolated nodes don't write to each other's variables, so they can run in parallel.
+    """
+
+    def __init__(self, get_shared_vars: Callable[[], Dict[str, Any]]):
+        self._get_shared_vars = get_shared_vars
+        self._own: Dict[str, Any] | None = None
+
+    def get(self, isolated: bool, imports: Iterable[str] = ()) -> Dict[str, Any]:
+        if not isolated:
+            self._own = None
+            return self._get_shared_vars()
+        if self._own is None:
+            self._own = {}
+        shared = self._get_shared_vars()
+        for name in imports:
+            if name in shared:
+                self._own[name] = shared[name]
+        return self._own
+
+    def export(self, exports: Iterable[str]):
+        if self._own is None:
+            return
+        shared = self._get_shared_vars()
+        for name in exports:
+            if name in self._own:
+                shared[name] = self._own[name]
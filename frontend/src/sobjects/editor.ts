@@ -53,6 +53,8 @@ export class Editor extends CompSObject{
 
     running_nodes: ObjSetTopic = this.getAttribute('running_nodes',ObjSetTopic);
     runningChanged = new ActionDict<SObject,[boolean]>();
+    profileChanged = new ActionDict<string,[any]>(); // node id -> stats from the node profiler
+    private profiledNodeIds = new Set<string>();
 
     protected onStart(): void {
         this.slashCommandMenu = new SlashCommandMenu(this)
@@ -82,6 +84,7 @@ export class Editor extends CompSObject{
         this.link(this.eventDispatcher.onDragEnd,this.onDragEnd)
         this.link(this.running_nodes.onAppend, (node:Node)=>this.runningChanged.invoke(node,true))
         this.link(this.running_nodes.onRemove, (node:Node)=>this.runningChanged.invoke(node,false))
+        this.link(Workspace.instance.nodeProfileTopic.onSet, this.onNodeProfile)
         this.link(GlobalEventDispatcher.instance.onKeyDown.slice('ctrl c'),this.copy)
         this.link(GlobalEventDispatcher.instance.onKeyDown.slice('ctrl x'),this.cut)
         this.link(GlobalEventDispatcher.instance.onKeyDown.slice('Delete'),this.delete)
@@ -102,6 +105,20 @@ export class Editor extends CompSObject{
         return this.running_nodes.has(node)
     }
 
+    /**
+     * The topic is only published while the node profiler runs, and once when it stops. Only the nodes in this or the
+     * previous profile are notified, so the nodes that never ran cost nothing.
+     */
+    private onNodeProfile(profile: Map<string,any>){
+        for(let id of this.profiledNodeIds){
+            if(!profile.has(id)) this.profileChanged.invoke(id, undefined)
+        }
+        this.profiledNodeIds = new Set(profile.keys())
+        for(let [id, stats] of profile){
+            this.profileChanged.invoke(id, stats)
+        }
+    }
+
     private lastUpdatePortNearMouse = 0
     private mouseMove(e: MouseEvent){
         // If there's performance issues, maybe optimize this
@@ -58,7 +58,7 @@ export class Node extends CompSObject implements IControlHost {
     
     public moved: Action<[]> = new Action();
 
-    protected readonly templates: {[key: string]: string} = {
+    public static readonly templates: {[key: string]: string} = {
     normal: 
         `<div class="node normal-node" slot="default">
             
@@ -191,6 +191,8 @@ export class Node extends CompSObject implements IControlHost {
             }) 
 
             if (this.editor.isRunning(this)) this.htmlItem.baseElement.classList.add('running')
+
+            this.link(this.editor.profileChanged.slice(this.id), this.setProfile)
         }
 
 
@@ -379,32 +381,71 @@ export class Node extends CompSObject implements IControlHost {
     }
 
     setIcon(path: string){
-        fetchWithCache('svg/list.txt')
-        .then(list => {
-            if(list.replaceAll('\r','').split('\n').indexOf(path) != -1){
-                this.setIconFromSvg(`svg/${path}.svg`)
+        Node.loadIcon(this.htmlItem.getElByClass('node-label') as HTMLDivElement, path)
+        .then(svgEl => {
+            if(svgEl == null) return
+            this.link2(svgEl,'click',() => {
+                this.emit('icon_clicked')
+            })
+            if(path == 'task'){
+                // change cursor to pointer
+                svgEl.style.cursor = 'pointer'
             }
+            this.moved.invoke()
         })
     }
 
-    setIconFromSvg(path: string){
-        const base = (this.htmlItem.getElByClass('node-label') as HTMLDivElement)
-        // load svg from url
-        // the reason not using img tag is because its tint color cannot be changed by css
-        fetchWithCache(path)
+    /**
+     * Colors the node by its share of the wall time of the busiest node in the last node profile, and shows its stats.
+     * The stats are from NodeProfiler.get_summary() in the backend, or undefined if the node is not in the profile.
+     */
+    private setProfile(stats: any){
+        const baseElement = this.htmlItem.baseElement as HTMLElement
+        if(stats === undefined){
+            baseElement.classList.remove('profiled')
+            baseElement.style.removeProperty('--profile-heat')
+            baseElement.removeAttribute('data-profile')
+            baseElement.removeAttribute('title')
+            return
+        }
+        const wallMs = stats.wall_time * 1000
+        baseElement.classList.add('profiled')
+        baseElement.style.setProperty('--profile-heat', stats.heat.toFixed(3))
+        baseElement.setAttribute('data-profile', `${stats.calls} calls, ${wallMs.toFixed(1)} ms`)
+        baseElement.setAttribute('title',
+            `calls: ${stats.calls}\n` +
+            `wall: ${wallMs.toFixed(1)} ms (max ${(stats.max_wall_time * 1000).toFixed(1)} ms)\n` +
+            `cpu: ${(stats.cpu_time * 1000).toFixed(1)} ms\n` +
+            `queue wait: ${(stats.queue_wait * 1000).toFixed(1)} ms\n` +
+            `exceptions: ${stats.exceptions}`
+        )
+    }
+
+    /**
+     * Prepend the icon svg/{path}.svg to the base element if it exists. Also used by the node library.
+     */
+    public static loadIcon(base: HTMLElement, path: string): Promise<SVGElement|null>{
+        return fetchWithCache('svg/list.txt')
+        .then(list => {
+            if(list.replaceAll('\r','').split('\n').indexOf(path) == -1) return null
+            // load svg from url
+            // the reason not using img tag is because its tint color cannot be changed by css
+            return fetchWithCache(`svg/${path}.svg`)
+        })
         .then(svg => {
+            if(svg == null) return null
             // skip if node-icon already exists. Not sure why this is necessary
-            if(base.querySelector('.node-icon') != null) return
+            if(base.querySelector('.node-icon') != null) return null
             let t = document.createElement('template')
             t.innerHTML = svg
-            let svgEl = null;
+            let svgEl: SVGElement = null;
             for(let child of t.content.childNodes){
                 if(child instanceof SVGElement){
                     svgEl = child
                     break
                 }
             }
-            if(svgEl == null) return
+            if(svgEl == null) return null
             base.prepend(svgEl)
             for(let dec of svgEl.querySelectorAll('path,rect,g')){
                 // if fill is black, change it to currentColor
@@ -415,15 +456,8 @@ export class Node extends CompSObject implements IControlHost {
                 }
             }
             svgEl.classList.add('node-icon')
-            this.link2(svgEl,'click',() => {
-                this.emit('icon_clicked')
-            })
-            if(path == 'svg/task.svg'){
-                // change cursor to pointer
-                svgEl.style.cursor = 'pointer'
-            }
-            this.moved.invoke()
-        })   
+            return svgEl
+        })
     }
 
     onParentChangedTo(newParent: SObject): void {
@@ -445,7 +479,7 @@ export class Node extends CompSObject implements IControlHost {
     }
 
     reshape(shape: string) {
-        this.applyTemplate(this.templates[shape])
+        this.applyTemplate(Node.templates[shape])
         this.eventDispatcher.setEventElement(as(this.htmlItem.baseElement, HTMLElement))
         this.mouseOverDetector.eventElement = this.htmlItem.baseElement
         
@@ -5,6 +5,7 @@ import { as } from '../utils'
 import { print } from '../devUtils'
 import { ExtensionsSetting } from '../ui_utils/extensionsSettings'
 import { Workspace } from './workspace'
+import { NodePreview } from '../ui_utils/nodePreview'
 
 export class NodeLibrary extends CompSObject {
     protected get template(): string {return`
@@ -20,12 +21,40 @@ export class NodeLibrary extends CompSObject {
     `}
 
     private items: HtmlItem[] = []
+    private previews = new Map<string, NodePreview>()
     hierarchy: HierarchyNode = new HierarchyNode('', '',true);
     tabs = new Map<HTMLButtonElement, HTMLDivElement>();
     sidebarContainer: HTMLDivElement;
     onStart() {
         this.mount(Workspace.instance.leftSidebar)
         this.hierarchy.mount(this)
+
+        // The backend publishes the preview of each node type in node_types instead of creating preview nodes
+        const nodeTypesTopic = Workspace.instance.nodeTypesTopic
+        for(let [name, nodeType] of nodeTypesTopic.getValue()){
+            this.setPreview(name, nodeType)
+        }
+        this.link(nodeTypesTopic.onAdd, this.setPreview)
+        this.link(nodeTypesTopic.onChangeValue, this.setPreview)
+        this.link(nodeTypesTopic.onPop, this.removePreview)
+    }
+
+    private setPreview(name: string, nodeType: any) {
+        this.removePreview(name)
+        if(nodeType.preview == null) return
+        const preview = new NodePreview(name, nodeType.category, nodeType.description, nodeType.preview, (nodeType: string) => {
+            this.emit('spawn', {node_type: nodeType, client_id: this.objectsync.clientId})
+        })
+        this.previews.set(name, preview)
+        this.addItem(preview.htmlItem, preview.category)
+    }
+
+    private removePreview(name: string) {
+        const preview = this.previews.get(name)
+        if(preview === undefined) return
+        this.previews.delete(name)
+        this.removeItem(preview.htmlItem, preview.category)
+        preview.destroy()
     }
 
     addItem(htmlItem: HtmlItem, path: string) {
@@ -22,6 +22,7 @@ export class Workspace extends CompSObject{
     readonly main_editor = this.getAttribute('main_editor', ObjectTopic<Editor>)
     readonly nodeTypesTopic = this.objectsync.getTopic('node_types',DictTopic<string,any>)
     readonly slashCommandsTopic = this.objectsync.getTopic('slash_commands',DictTopic<string,any>)
+    readonly nodeProfileTopic = this.objectsync.getTopic('node_profile',DictTopic<string,any>)
 
     protected get template(): string { return `
         <div spellcheck="false" class="full-width full-height" style="display: flex; ">
@@ -0,0 +1,89 @@
+import { soundManager } from "../app"
+import { Componentable } from "../component/componentable"
+import { Node } from "../sobjects/node"
+
+export type PortPreviewInfo = {
+    name: string
+    display_name: string
+    is_param: boolean
+}
+
+// Produced by Node.get_preview_info() in the backend
+export type NodePreviewInfo = {
+    label: string
+    shape: string
+    icon_path: string
+    css_classes: string[]
+    in_ports: PortPreviewInfo[]
+    out_ports: PortPreviewInfo[]
+}
+
+/**
+ * A node type in the node library. It is drawn from the preview info of the node type instead of a node instance, so
+ * the backend doesn't have to build a node of every type. Dragging it asks the backend to create the node.
+ */
+export class NodePreview extends Componentable {
+    private labelDiv: HTMLDivElement
+
+    constructor(readonly nodeType: string, readonly category: string, description: string, info: NodePreviewInfo, spawn: (nodeType: string) => void) {
+        super()
+        const shape = info.shape in Node.templates ? info.shape : 'normal'
+        this.htmlItem.applyTemplate(Node.templates[shape])
+        this.labelDiv = this.htmlItem.getRefs().get('labelDiv') as HTMLDivElement
+        this.labelDiv.innerText = info.label
+
+        const baseElement = this.htmlItem.baseElement as HTMLElement
+        baseElement.classList.add('node-preview')
+        baseElement.setAttribute('title', description)
+        for (let className of Node.getCssClassesFromCategory(category)) {
+            baseElement.classList.add(className)
+        }
+        for (let className of info.css_classes) {
+            baseElement.classList.add(className)
+        }
+        if (shape == 'round') {
+            baseElement.style.minWidth = 'unset'
+        }
+
+        for (let port of info.in_ports) {
+            this.addPort(port, port.is_param ? 'param_input_port' : 'input_port', true)
+        }
+        for (let port of info.out_ports) {
+            this.addPort(port, 'output_port', false)
+        }
+        if (info.in_ports.some(port => !port.is_param)) baseElement.classList.add('has-visible-input')
+        if (info.in_ports.some(port => port.is_param)) baseElement.classList.add('has-visible-param')
+        if (info.out_ports.length > 0) baseElement.classList.add('has-visible-output')
+
+        if (info.icon_path != '') {
+            Node.loadIcon(this.htmlItem.getElByClass('node-label') as HTMLDivElement, info.icon_path)
+        }
+
+        this.eventDispatcher.setEventElement(baseElement)
+        this.link2(baseElement, 'mousedown', () => {
+            soundManager.playClick()
+        })
+        this.link(this.eventDispatcher.onMouseOver, () => {
+            baseElement.classList.add('hover')
+        })
+        this.link(this.eventDispatcher.onMouseLeave, () => {
+            baseElement.classList.remove('hover')
+        })
+        this.link(this.eventDispatcher.onDragStart, () => {
+            spawn(this.nodeType)
+        })
+    }
+
+    private addPort(port: PortPreviewInfo, slot: string, isInput: boolean) {
+        // The same structure as Port, without the control
+        const element = document.createElement('div')
+        element.classList.add('port')
+        const label = document.createElement('div')
+        label.classList.add('port-label')
+        label.innerText = port.display_name
+        const knob = document.createElement('div')
+        knob.classList.add('port-knob', isInput ? 'in-port' : 'out-port')
+        element.append(label, knob)
+        this.htmlItem.getSlot(slot).append(element)
+    }
+}